@@ -0,0 +1,383 @@
+import base64
+
+import numpy as np
+import pandas as pd
+
+# Null bitmaps are np.packbits(mask, bitorder='little'), base64 encoded:
+# bit i of byte i // 8 is set when row i of the window is null.
+NULL_ENCODING = 'base64-packbits-lsb'
+
+
+def column_group(series):
+    """Chart grouping used by the frontend column pickers"""
+    if pd.api.types.is_numeric_dtype(series):
+        return 'Numerical'
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        return 'Date/Time'
+    return 'Categorical'
+
+
+def encode_null_bitmap(mask):
+    if not mask.any():
+        return None
+    return base64.b64encode(np.packbits(mask, bitorder='little').tobytes()).decode('ascii')
+
+
+def encode_column(series):
+    """Encode one column as a dense value array plus a null bitmap.
+    Null slots hold a type-appropriate placeholder (0, False or '')."""
+    mask = series.isna().to_numpy()
+    if pd.api.types.is_bool_dtype(series):
+        values = series.to_numpy(dtype=bool, na_value=False)
+    elif pd.api.types.is_integer_dtype(series) and not mask.any():
+        values = series.to_numpy(dtype=np.int64)
+    elif pd.api.types.is_numeric_dtype(series):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        # Infinity is not valid JSON, so report it as missing
+        mask = mask | ~np.isfinite(values)
+        values = np.where(mask, 0.0, values)
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        values = np.where(mask, '', series.dt.strftime('%Y-%m-%dT%H:%M:%S').to_numpy(dtype=object, na_value=''))
+    else:
+        values = np.where(mask, '', series.to_numpy(dtype=object))
+    return {
+        'name': series.name,
+        'dtype': series.dtype.name,
+        'group': column_group(series),
+        'values': values.tolist(),
+        'nulls': encode_null_bitmap(mask)
+    }
+
+
+def encode_columnar(df, columns=None, offset=0, limit=None):
+    """Return a row window of the selected columns in columnar form"""
+    columns = list(df.columns) if not columns else columns
+    total_rows = len(df)
+    offset = max(0, min(offset, total_rows))
+    end = total_rows if limit is None else min(total_rows, offset + limit)
+    window = df.iloc[offset:end]
+    return {
+        'total_rows': total_rows,
+        'offset': offset,
+        'row_count': end - offset,
+        'has_more': end < total_rows,
+        'null_encoding': NULL_ENCODING,
+        'columns': [encode_column(window[col]) for col in columns]
+    }
+
+
+# Chart aggregation ----------------------------------------------------------
+
+CATEGORY_CHARTS = {'bar', 'horizontalBar', 'pie', 'donut'}
+GROUPED_CHARTS = {'groupedBar', 'stackedBar'}
+AGGREGATIONS = {'sum': 'sum', 'average': 'mean', 'count': 'count'}
+AGGREGATION_LABELS = {'sum': 'Sum', 'average': 'Average', 'count': 'Count'}
+MAX_HISTOGRAM_BINS = 200
+
+
+def _as_numeric(series):
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype('float64')
+    return pd.to_numeric(series, errors='coerce')
+
+
+def _sort_and_limit(result, sort_order, top):
+    """Order a label -> value Series by value and keep the first `top` entries"""
+    if sort_order in ('asc', 'desc'):
+        result = result.sort_values(ascending=sort_order == 'asc', kind='stable')
+    if top:
+        result = result.head(top)
+    return result
+
+
+def _split_category_numeric(df, columns):
+    """Pick (category, numeric) from a two-column selection, as the chart pickers do"""
+    first, second = columns[0], columns[1]
+    if column_group(df[first]) == 'Categorical' and column_group(df[second]) == 'Numerical':
+        return first, second
+    if column_group(df[second]) == 'Categorical' and column_group(df[first]) == 'Numerical':
+        return second, first
+    return first, second
+
+
+def _series_payload(result, label):
+    return {
+        'labels': [str(label_value) for label_value in result.index],
+        'datasets': [{'label': label, 'data': result.tolist()}]
+    }
+
+
+def _group_by_category(values, keys):
+    """Group values by one or more key Series in order of first appearance.
+    Categorical keys only yield the categories present in the rows, so
+    compacted frames don't chart categories whose rows were removed."""
+    return values.groupby(keys, sort=False, observed=True)
+
+
+def _aggregate_by_category(df, columns, aggregation, sort_order, top):
+    if len(columns) == 1:
+        col = columns[0]
+        result = _group_by_category(df[col], df[col]).size()
+        return _series_payload(_sort_and_limit(result, sort_order, top), f"{col} count")
+
+    cat_col, num_col = _split_category_numeric(df, columns)
+    keys = df[cat_col]
+    values = _as_numeric(df[num_col])
+    valid = keys.notna() & values.notna()
+    result = _group_by_category(values[valid], keys[valid]).agg(AGGREGATIONS[aggregation])
+    label = f"{num_col} ({AGGREGATION_LABELS[aggregation]})"
+    return _series_payload(_sort_and_limit(result, sort_order, top), label)
+
+
+def _aggregate_grouped(df, columns, aggregation, sort_order, top):
+    if len(columns) != 3:
+        raise ValueError('Grouped and stacked bars need two category columns and one numeric column')
+    group_col, stack_col, num_col = columns
+    outer = df[group_col]
+    inner = df[stack_col]
+    values = _as_numeric(df[num_col])
+    valid = outer.notna() & inner.notna() & values.notna()
+    outer, inner, values = outer[valid], inner[valid], values[valid]
+
+    table = (
+        _group_by_category(values, [outer, inner])
+        .agg(AGGREGATIONS[aggregation])
+        .unstack(fill_value=0)
+    )
+    # Rank outer groups by their total, like the top-N filter in the chart builder
+    totals = _group_by_category(values, outer).sum().reindex(table.index)
+    order = _sort_and_limit(totals, sort_order, top).index
+    table = table.loc[order]
+    return {
+        'labels': [str(label) for label in table.index],
+        'datasets': [
+            {'label': str(stack_value), 'data': table[stack_value].tolist()}
+            for stack_value in table.columns
+        ]
+    }
+
+
+def _histogram(df, columns, sort_order, top, bins=None):
+    col = columns[0]
+    values = _as_numeric(df[col]).to_numpy()
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return {'labels': [], 'datasets': [{'label': col, 'data': []}]}
+    if not bins:
+        bins = min(20, max(5, int(np.ceil(np.sqrt(len(values))))))
+    bins = min(int(bins), MAX_HISTOGRAM_BINS)
+    counts, edges = np.histogram(values, bins=bins)
+    labels = [f"{edges[i]:.1f} - {edges[i + 1]:.1f}" for i in range(len(counts))]
+    result = _sort_and_limit(pd.Series(counts, index=labels), sort_order, top)
+    payload = _series_payload(result, col)
+    payload['bin_edges'] = edges.tolist()
+    return payload
+
+
+def aggregate_chart(df, chart_type, columns, aggregation='sum', sort_order='none', top=None, bins=None):
+    """Reduce the dataset to the series a chart needs.
+    Returns a Chart.js-style {'labels', 'datasets'} dict without styling."""
+    if not columns:
+        raise ValueError('At least one column is required')
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Unknown columns: {', '.join(missing)}")
+    if aggregation not in AGGREGATIONS:
+        raise ValueError(f"Unsupported aggregation type: {aggregation}")
+
+    if chart_type in CATEGORY_CHARTS:
+        payload = _aggregate_by_category(df, columns, aggregation, sort_order, top)
+    elif chart_type in GROUPED_CHARTS:
+        payload = _aggregate_grouped(df, columns, aggregation, sort_order, top)
+    elif chart_type == 'histogram':
+        payload = _histogram(df, columns, sort_order, top, bins)
+    else:
+        raise ValueError(f"Unsupported chart type for aggregation: {chart_type}")
+    payload['type'] = chart_type
+    return payload
+
+
+# Correlation ------------------------------------------------------------------
+
+CORRELATION_METHODS = ('pearson', 'spearman')
+
+
+def _pairwise_pearson(values):
+    """Pearson correlation of every column pair using pairwise-complete rows.
+
+    values is an (n_rows, n_cols) float array with NaN for missing cells. All
+    pairwise sums come from a handful of matrix products, so the whole matrix
+    costs one pass instead of one pass per pair.
+    """
+    valid = np.isfinite(values)
+    # Centering by the column mean doesn't change r but keeps the sums well conditioned
+    present = valid.sum(axis=0)
+    col_sums = np.where(valid, values, 0.0).sum(axis=0)
+    col_means = np.divide(col_sums, present, out=np.zeros_like(col_sums), where=present > 0)
+    centered = np.where(valid, values - col_means, 0.0)
+    mask = valid.astype(np.float64)
+
+    counts = mask.T @ mask
+    sum_x = centered.T @ mask          # [i, j]: sum of column i over rows where i and j are both present
+    sum_xx = (centered ** 2).T @ mask
+    sum_xy = centered.T @ centered
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sum_xy - sum_x * sum_x.T / counts
+        var_x = sum_xx - sum_x ** 2 / counts
+        var_y = var_x.T
+        corr = cov / np.sqrt(var_x * var_y)
+    corr[(counts < 2) | ~np.isfinite(corr)] = np.nan
+    return np.clip(corr, -1.0, 1.0), counts.astype(np.int64)
+
+
+def _pairwise_spearman(values):
+    """Spearman correlation of every column pair, ranking each pair over its shared rows.
+
+    All columns are ranked once and correlated with the Pearson kernel. That
+    is exact for pairs whose columns are missing the same rows; only pairs
+    where one column has values the other lacks are re-ranked on their own.
+    """
+    ranks = pd.DataFrame(values).rank(method='average').to_numpy(dtype=np.float64, na_value=np.nan)
+    matrix, counts = _pairwise_pearson(ranks)
+    valid = np.isfinite(values)
+    present = valid.sum(axis=0)
+    partial = np.triu((counts < present[:, None]) | (counts < present[None, :]), 1) & (counts >= 2)
+    for i, j in zip(*np.nonzero(partial)):
+        shared = valid[:, i] & valid[:, j]
+        pair_ranks = pd.DataFrame(values[shared][:, [i, j]]).rank(method='average').to_numpy(dtype=np.float64)
+        matrix[i, j] = matrix[j, i] = _pairwise_pearson(pair_ranks)[0][0, 1]
+    return matrix, counts
+
+
+def correlation_matrix(df, method='pearson'):
+    """Full correlation matrix over every numeric column, from pairwise-complete rows.
+    Returns {'columns', 'matrix', 'observations'} with NumPy arrays."""
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unsupported correlation method: {method}")
+    numeric = df.select_dtypes(include=['number'])
+    columns = list(numeric.columns)
+    values = numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+    # Infinite values don't take part, as in DataFrame.corr()
+    values = np.where(np.isfinite(values), values, np.nan)
+
+    if method == 'spearman':
+        matrix, counts = _pairwise_spearman(values)
+    else:
+        matrix, counts = _pairwise_pearson(values)
+    return {'columns': columns, 'matrix': matrix, 'observations': counts}
+
+
+def slice_correlation(result, columns=None):
+    """Select a column subset from a cached correlation_matrix() result"""
+    all_columns = result['columns']
+    if not columns:
+        columns = all_columns
+    position = {col: i for i, col in enumerate(all_columns)}
+    missing = [col for col in columns if col not in position]
+    if missing:
+        raise ValueError(f"Not numeric or unknown columns: {', '.join(missing)}")
+    idx = [position[col] for col in columns]
+    matrix = result['matrix'][np.ix_(idx, idx)]
+    return {
+        'columns': list(columns),
+        'matrix': [[None if np.isnan(v) else float(v) for v in row] for row in matrix],
+        'observations': result['observations'][np.ix_(idx, idx)].tolist()
+    }
+
+
+# Scatter downsampling -------------------------------------------------------
+
+SCATTER_MODES = ('auto', 'lttb', 'density')
+MAX_SCATTER_POINTS = 20000
+MAX_DENSITY_BINS = 200
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling.
+
+    x must be sorted. Returns the indices of `threshold` points that keep the
+    visual shape of the series: first and last points are always kept and
+    each bucket contributes the point forming the largest triangle with the
+    previously selected point and the mean of the next bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket boundaries for the n - 2 interior points, in integer arithmetic so
+    # float rounding never moves a boundary
+    edges = 1 + np.arange(threshold - 1, dtype=np.int64) * (n - 2) // (threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        area = np.abs(
+            (x[prev] - avg_x) * (bucket_y - y[prev]) - (x[prev] - bucket_x) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(area))
+        selected[i + 1] = prev
+    return selected
+
+
+def scatter_points(df, x_col, y_col, mode='auto', max_points=2000, bins=50):
+    """Bounded-size scatter payload for two numeric columns.
+
+    mode 'lttb' keeps at most max_points points chosen by shape-preserving
+    downsampling, 'density' returns non-empty cells of a bins x bins 2D
+    histogram, and 'auto' returns every point when there are few enough.
+    """
+    for col in (x_col, y_col):
+        if col not in df.columns:
+            raise ValueError(f"Unknown column: {col}")
+    if mode not in SCATTER_MODES:
+        raise ValueError(f"Unsupported scatter mode: {mode}")
+    try:
+        max_points = max(3, min(int(max_points), MAX_SCATTER_POINTS))
+        bins = max(1, min(int(bins), MAX_DENSITY_BINS))
+    except (TypeError, ValueError):
+        raise ValueError('max_points and bins must be integers')
+
+    x = _as_numeric(df[x_col]).to_numpy()
+    y = _as_numeric(df[y_col]).to_numpy()
+    valid = np.isfinite(x) & np.isfinite(y)
+    x, y = x[valid], y[valid]
+    total = len(x)
+
+    if mode == 'density':
+        counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins) if total else (np.zeros((0, 0)), [], [])
+        xi, yi = np.nonzero(counts)
+        x_centers = (np.asarray(x_edges[:-1]) + np.asarray(x_edges[1:])) / 2
+        y_centers = (np.asarray(y_edges[:-1]) + np.asarray(y_edges[1:])) / 2
+        return {
+            'mode': 'density',
+            'total_points': total,
+            'x_edges': np.asarray(x_edges).tolist(),
+            'y_edges': np.asarray(y_edges).tolist(),
+            'cells': [
+                {'x': float(x_centers[i]), 'y': float(y_centers[j]), 'count': int(counts[i, j])}
+                for i, j in zip(xi, yi)
+            ]
+        }
+
+    order = np.argsort(x, kind='stable')
+    x, y = x[order], y[order]
+    if mode == 'auto' and total <= max_points:
+        keep = np.arange(total)
+    else:
+        keep = lttb_indices(x, y, max_points)
+    return {
+        'mode': 'lttb' if len(keep) < total else 'all',
+        'total_points': total,
+        'returned_points': int(len(keep)),
+        'x': x[keep].tolist(),
+        'y': y[keep].tolist()
+    }
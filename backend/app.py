@@ -1,22 +1,81 @@
-from flask import Flask, request, jsonify, session, send_from_directory, send_file
+from flask import Flask, request, jsonify, session, send_from_directory, send_file, g
 import pandas as pd
 import os
 import json
 from datetime import timedelta
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 import traceback
-import numpy as np
 import warnings
 import io
-from jinja2 import Template
-from playwright.sync_api import sync_playwright
-import zipfile
+import base64
+from jinja2 import Environment, FileSystemLoader
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataset_cache import DatasetCache
+from dataset_registry import DatasetRegistry
+from dataset_store import (columnar_available, display_ext, display_name, is_columnar, materialize_original,
+                           read_columnar, read_dataset as read_dataset_file)
+from excel_ingest import list_sheets
+from profiler import (column_outlier_positions, encode_ranges, json_records, preview_records, sample_profile,
+                      sample_rows)
+from dtype_inference import infer_column_dtype
+from worker_pool import JobCancelled, JobTimeout, PoolBusy, WorkerCrashed, WorkerPool
+import instrumentation
+from instrumentation import Metrics, SamplingProfiler, stage
+from http_encoding import FastJSONProvider, compress_response, etag_matches
+import pool_tasks
+from pdf_renderer import PdfRenderer, RendererBusy
+from export_jobs import ExportCancelled, ExportJobQueue
+from chart_images import ASSET_URL_PREFIX, ChartImageStore
+from export_stream import iter_csv_chunks, iter_file_chunks, stream_zip
+from analysis_engine import (aggregate_chart, column_group, correlation_matrix, encode_columnar,
+                             scatter_points, slice_correlation)
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)  # orjson when installed; NumPy/pandas values encoded directly
 app.secret_key = 'your-secret-key'
 app.permanent_session_lifetime = timedelta(minutes=10)
 app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10MB limit
+app.config['MAX_CONTENT_LENGTH'] = 4 * 1024 * 1024 * 1024  # 4GB limit
+app.config['UPLOAD_STREAM_CHUNK_BYTES'] = 1024 * 1024  # Block size when writing streamed uploads to disk
+app.config['INGEST_CHUNKED_MIN_BYTES'] = 50 * 1024 * 1024  # CSV/JSON uploads from this size are ingested in chunks
+app.config['INGEST_CHUNK_ROWS'] = 100000
+app.config['EXCEL_CHUNK_ROWS'] = 50000  # Rows parsed per block when streaming an .xlsx sheet
+app.config['DUPLICATE_INDEX_MAX_BYTES'] = 256 * 1024 * 1024  # Cached row hashes per dataset version
+app.config['QUALITY_SAMPLE_ROWS'] = 20000  # Rows sampled for the fast /cleaning report
+app.config['REPORT_REFINE_WORKERS'] = 1  # Background threads computing exact reports after a fast one
+app.config['DATASET_CACHE_MAX_BYTES'] = 512 * 1024 * 1024  # Memory budget for parsed DataFrames
+app.config['DATASET_MAX_IDLE_SECONDS'] = 2 * 60 * 60  # Datasets unused this long are deleted with their artifacts
+app.config['DATASET_MAX_COUNT'] = 200  # Beyond this many datasets the least recently used is deleted
+app.config['STORE_RAW_COLUMNAR'] = False  # Also convert uploads to Parquet so later reads skip text parsing
+app.config['COMPACT_DTYPES'] = True  # Store uploads as Parquet with downcast integers and categorical strings
+app.config['ANALYSIS_PAGE_DEFAULT_ROWS'] = 5000
+app.config['ANALYSIS_PAGE_MAX_ROWS'] = 100000
+app.config['OUTLIER_PAGE_MAX_ROWS'] = 10000
+app.config['PDF_RENDER_WORKERS'] = 2  # Warm Chromium instances kept for PDF export
+app.config['PDF_RENDERS_PER_CONTEXT'] = 50  # Recycle a browser context after this many renders
+app.config['PDF_RENDER_QUEUE_SIZE'] = 16
+app.config['PDF_RENDER_TIMEOUT'] = 60  # Seconds
+app.config['EXPORT_JOB_WORKERS'] = 2  # Concurrent background exports
+app.config['EXPORT_JOB_HISTORY'] = 64  # Finished exports kept for reuse
+app.config['EXPORT_CSV_CHUNK_ROWS'] = 50000  # Rows encoded per chunk when streaming CSV into a ZIP
+app.config['CHART_IMAGE_STORE_MAX_BYTES'] = 64 * 1024 * 1024  # Base64 chart images kept for repeat exports
+app.config['WORKER_PROCESSES'] = min(4, os.cpu_count() or 1)  # Processes for ingestion, profiling and cleaning; 0 runs them in the request thread
+app.config['WORKER_QUEUE_SIZE'] = 16  # Jobs waiting for a worker before requests get a 503
+app.config['WORKER_JOB_TIMEOUT'] = 300  # Seconds
+app.config['WORKER_DATASET_CACHE_MAX_BYTES'] = 256 * 1024 * 1024  # Parsed DataFrames kept by each worker process
+app.config['SERVER_TIMING_HEADER'] = True  # Send per-stage timings in a Server-Timing response header
+app.config['SLOW_REQUEST_SECONDS'] = 2.0  # Requests slower than this are logged with their stage timings
+app.config['PROFILE_SLOW_REQUESTS'] = False  # Sample request stacks and keep flame data for slow requests
+app.config['PROFILE_SAMPLE_INTERVAL'] = 0.005  # Seconds
+app.config['PROFILE_FOLDER'] = 'profiles'  # Folded stacks of slow requests, for flamegraph.pl or speedscope
+app.config['COMPRESS_RESPONSES'] = True  # gzip/brotli (if installed) JSON and text responses the client accepts
+app.config['COMPRESS_MIN_BYTES'] = 1024
+app.config['COMPRESS_GZIP_LEVEL'] = 4
+app.config['COMPRESS_BROTLI_QUALITY'] = 4
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 CORS(app, resources={r"/*": {"origins": "http://localhost:5173"}}, supports_credentials=True)
@@ -24,13 +83,274 @@ CORS(app, resources={r"/*": {"origins": "http://localhost:5173"}}, supports_cred
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'csv', 'xlsx', 'xls', 'json'}
 
+# Parsed DataFrames shared across requests, keyed by path + mtime + size
+dataset_cache = DatasetCache(max_bytes=app.config['DATASET_CACHE_MAX_BYTES'])
+# Session dataset ID -> raw file, cleaned versions and cached artifacts
+dataset_registry = DatasetRegistry(
+    app.config['UPLOAD_FOLDER'],
+    max_datasets=app.config['DATASET_MAX_COUNT'],
+    max_idle_seconds=app.config['DATASET_MAX_IDLE_SECONDS'],
+    on_remove=lambda record: release_dataset(record)
+)
+# Long-lived Chromium pool for PDF export, started on first use
+pdf_renderer = PdfRenderer(
+    workers=app.config['PDF_RENDER_WORKERS'],
+    renders_per_context=app.config['PDF_RENDERS_PER_CONTEXT'],
+    queue_size=app.config['PDF_RENDER_QUEUE_SIZE'],
+    render_timeout=app.config['PDF_RENDER_TIMEOUT']
+)
+# Background exports, deduplicated by dataset version + options
+export_jobs = ExportJobQueue(
+    max_workers=app.config['EXPORT_JOB_WORKERS'],
+    max_jobs=app.config['EXPORT_JOB_HISTORY'],
+    on_evict=lambda job: remove_export_artifact(job)
+)
+# CPU-heavy dataset work runs in worker processes, handed file paths rather than DataFrames.
+# When this file is run as a script, each worker imports it again as __mp_main__; the objects
+# created at module level start their threads on first use, so that import has no side effects
+# beyond creating UPLOAD_FOLDER.
+worker_pool = WorkerPool(
+    workers=app.config['WORKER_PROCESSES'],
+    queue_size=app.config['WORKER_QUEUE_SIZE'],
+    job_timeout=app.config['WORKER_JOB_TIMEOUT'],
+    initializer=pool_tasks.init_worker,
+    initargs=(
+        app.config['WORKER_DATASET_CACHE_MAX_BYTES'],
+        app.config['EXCEL_CHUNK_ROWS'],
+        app.config['DUPLICATE_INDEX_MAX_BYTES']
+    ),
+    preload=['pool_tasks']
+)
+# Jobs run inline (and the duplicate queries served here) share the app's frame cache
+pool_tasks.configure(dataset_cache, app.config['EXCEL_CHUNK_ROWS'], app.config['DUPLICATE_INDEX_MAX_BYTES'])
+# Exact quality reports computed in the background after a fast (sampled) one
+report_refiner = ThreadPoolExecutor(max_workers=app.config['REPORT_REFINE_WORKERS'], thread_name_prefix='report-refine')
+report_refine_lock = threading.Lock()
+# Chart images uploaded with exports, keyed by content hash
+chart_images = ChartImageStore(max_bytes=app.config['CHART_IMAGE_STORE_MAX_BYTES'])
+# Request, stage and cache metrics served at /metrics; component stats are read on each scrape
+metrics = Metrics()
+metrics.add_collector('dataset_cache', dataset_cache.stats, 'Parsed dataset cache')
+metrics.add_collector('dataset_registry', dataset_registry.stats, 'Uploaded datasets')
+metrics.add_collector('worker_pool', worker_pool.stats, 'Worker process pool')
+metrics.add_collector('export_jobs', export_jobs.stats, 'Background export jobs')
+metrics.add_collector('pdf_renderer', pdf_renderer.stats, 'PDF renderer')
+metrics.add_collector('chart_images', chart_images.stats, 'Chart image store')
+# Started on the first profiled request when PROFILE_SLOW_REQUESTS is on
+sampling_profiler = SamplingProfiler(interval=app.config['PROFILE_SAMPLE_INTERVAL'])
+# Report templates are compiled once and recompiled only when the file changes.
+# Autoescaping stays off to render exactly like the plain jinja2.Template did.
+report_env = Environment(
+    loader=FileSystemLoader(os.path.join(app.root_path, 'templates')),
+    auto_reload=True
+)
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def read_dataset(filepath):
+    """Parse a dataset file from disk based on its extension"""
+    return read_dataset_file(filepath, app.config['EXCEL_CHUNK_ROWS'])
+
+def load_dataset(filepath, columns=None):
+    """Return the parsed dataset, reusing the cached DataFrame when the file is unchanged.
+    With columns, a columnar file that isn't cached yet is read for just those columns
+    (unknown ones are left out). The returned frame is shared, so copy it before modifying."""
+    with stage('load_dataset') as current:
+        if columns and is_columnar(filepath):
+            cached = dataset_cache.peek(filepath)
+            return current.set_shape(cached if cached is not None else read_columnar(filepath, columns))
+        return current.set_shape(dataset_cache.get(filepath, read_dataset))
+
+def get_current_dataset():
+    """Return the registry record for this session's dataset, or None"""
+    return dataset_registry.get(session.get('dataset_id'))
+
+def get_dtype_cache(record, version=None):
+    """Per-version dict of dtype inference verdicts, shared by /cleaning and /clean-data"""
+    cache = dataset_registry.get_artifact(record.dataset_id, 'dtype_inference', version=version)
+    if cache is None:
+        cache = {}
+        dataset_registry.set_artifact(record.dataset_id, 'dtype_inference', cache, version=version)
+    return cache
+
+def pool_error_response(e):
+    """Error response for a worker pool job that was refused or didn't finish"""
+    if isinstance(e, PoolBusy):
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '5'}
+    if isinstance(e, JobTimeout):
+        return jsonify({'error': f'Processing took too long: {str(e)}'}), 504
+    if isinstance(e, JobCancelled):
+        return jsonify({'error': 'Processing was cancelled because the dataset was replaced'}), 409
+    return jsonify({'error': f'Processing failed: {str(e)}'}), 500
+
+POOL_ERRORS = (PoolBusy, JobTimeout, JobCancelled, WorkerCrashed)
+
+def dataset_etag(record, *parts):
+    """Strong ETag for a response determined by the dataset version and `parts`
+    (the query, which report, ...). A new upload or cleaned version changes it."""
+    key = '\0'.join([record.version_tag, request.path] + [str(part) for part in parts])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+
+def not_modified(etag):
+    """304 response if the client already holds this ETag's representation, otherwise None"""
+    matched = etag_matches(request.if_none_match, etag)
+    if matched is None:
+        return None
+    response = cacheable(app.response_class(status=304), matched)
+    response.vary.add('Accept-Encoding')
+    return response
+
+def cacheable(response, etag):
+    """Tag a response for revalidation: browsers keep it but check the ETag before reuse"""
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add('Cookie')  # The dataset comes from the session
+    return response
+
+def remove_dataset(dataset_id):
+    """Delete a dataset's files and drop its parsed frames from the cache"""
+    return dataset_registry.remove(dataset_id)
+
+def release_dataset(record):
+    """Stop work on a dataset that is being removed (reset, replaced or evicted while idle)"""
+    worker_pool.cancel(record.dataset_id)
+    export_jobs.discard_dataset(record.dataset_id)
+    for path in record.all_paths:
+        dataset_cache.invalidate(path)
+
+@app.before_request
+def evict_idle_datasets():
+    dataset_registry.evict_idle()
+
+@app.before_request
+def start_request_trace():
+    g.trace = instrumentation.Trace()
+    g.trace_token = instrumentation.activate(g.trace)
+    metrics.request_started()
+    if app.config['PROFILE_SLOW_REQUESTS']:
+        g.profile = sampling_profiler.start()
+
+@app.after_request
+def finish_request_trace(response):
+    """Record the request's timings, add the Server-Timing header and keep flame data if it was slow"""
+    trace = g.get('trace')
+    if trace is None:
+        return response
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    seconds = trace.elapsed()
+    slow = seconds >= app.config['SLOW_REQUEST_SECONDS']
+    metrics.observe_request(endpoint, request.method, response.status_code, trace, slow=slow)
+    if app.config['SERVER_TIMING_HEADER']:
+        response.headers['Server-Timing'] = instrumentation.server_timing(trace)
+    profile = g.pop('profile', None)
+    stacks = sampling_profiler.stop(profile) if profile is not None else None
+    if slow:
+        stages = ', '.join(f"{s.name}={s.seconds:.3f}s" + (f" ({s.rows}x{s.columns})" if s.rows is not None else '')
+                           for s in trace.stages)
+        app.logger.warning(f"Slow request {request.method} {endpoint}: {seconds:.3f}s [{stages}]")
+        if stacks:
+            path = os.path.join(
+                app.config['PROFILE_FOLDER'],
+                f"{time.strftime('%Y%m%d-%H%M%S')}-{request.method}-{endpoint.strip('/').replace('/', '_') or 'root'}.folded"
+            )
+            instrumentation.write_folded(stacks, path)
+            app.logger.warning(f"Flame data for the slow request written to {path}")
+    return response
+
+@app.after_request
+def compress(response):
+    """Compress JSON and text bodies (runs before finish_request_trace, so it is timed)"""
+    if app.config['COMPRESS_RESPONSES']:
+        compress_response(
+            response,
+            request.accept_encodings,
+            min_bytes=app.config['COMPRESS_MIN_BYTES'],
+            gzip_level=app.config['COMPRESS_GZIP_LEVEL'],
+            brotli_quality=app.config['COMPRESS_BROTLI_QUALITY']
+        )
+    return response
+
+@app.teardown_request
+def end_request_trace(exc):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        sampling_profiler.stop(profile)  # after_request didn't run
+    token = g.pop('trace_token', None)
+    if token is not None:
+        instrumentation.deactivate(token)
+        metrics.request_finished()
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Request, stage, cache and pool metrics in the Prometheus text format"""
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
 @app.route('/', methods=['GET'])
 def home():
     return 'Backend is running! Use the frontend to upload files.'
 
+def create_upload_record(filename):
+    """Replace any dataset this session uploaded before with a new, empty dataset folder"""
+    if session.get('dataset_id'):
+        remove_dataset(session['dataset_id'])
+    return dataset_registry.create(filename)
+
+def ingest_upload(record):
+    """Convert a saved upload for internal use. Large CSV/JSON files are converted to Parquet
+    chunk by chunk and their quality profile is kept, so /cleaning never loads them whole.
+    The first sheet of a workbook is parsed once and kept as Parquet. With worker processes
+    every upload is kept as Parquet, which workers read back through a memory map.
+    With COMPACT_DTYPES it is stored with compact dtypes and the memory saved is kept."""
+    filepath = record.raw_path
+    if is_columnar(filepath):
+        return  # Already converted (e.g. a sheet picked with /upload/sheet)
+    compact = app.config['COMPACT_DTYPES']
+    try:
+        record.raw_path, ingested, compaction = worker_pool.run(
+            pool_tasks.ingest_dataset,
+            filepath,
+            app.config['STORE_RAW_COLUMNAR'] or app.config['WORKER_PROCESSES'] > 0 or compact,
+            app.config['INGEST_CHUNKED_MIN_BYTES'],
+            app.config['INGEST_CHUNK_ROWS'],
+            compact,
+            tag=record.dataset_id
+        )
+        if ingested is not None:
+            dataset_registry.set_artifact(record.dataset_id, 'ingest_profile', ingested)
+        store_compaction(record, compaction)
+    except Exception:
+        # Keep the upload as-is; parse errors are reported when it is opened
+        app.logger.warning(f"Ingestion of {filepath} failed: {traceback.format_exc()}")
+
+def store_compaction(record, compaction):
+    if compaction is None:
+        return
+    dataset_registry.set_artifact(record.dataset_id, 'dtype_compaction', compaction, version=0)
+    app.logger.info(
+        f"Compacted {record.filename}: {compaction['memory_before'] / 1024 / 1024:.2f} MB -> "
+        f"{compaction['memory_after'] / 1024 / 1024:.2f} MB in memory"
+    )
+
+def finish_upload(record):
+    filepath = os.path.join(record.folder, record.filename)
+    ingest_upload(record)
+
+    # Store file path in session
+    session['dataset_id'] = record.dataset_id
+    session['dataset_path'] = filepath
+    session['filename'] = record.filename
+    session.pop('cleaned_filename', None)  # Invalidate previous cleaned file
+
+    return jsonify({
+        'message': 'File uploaded successfully', 
+        'filename': record.filename,
+        'filepath': filepath,
+        'dataset_id': record.dataset_id,
+        'dtype_compaction': dataset_registry.get_artifact(record.dataset_id, 'dtype_compaction', version=0)
+    }), 200
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
     try:
@@ -48,123 +368,396 @@ def upload_file():
         if not allowed_file(uploaded_file.filename):
             return jsonify({'error': 'File type not allowed. Please upload CSV, Excel, or JSON files only.'}), 400
         
-        # Save file
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], uploaded_file.filename)
-        uploaded_file.save(filepath)
-        
-        # Store file path in session
-        session['dataset_path'] = filepath
-        session['filename'] = uploaded_file.filename
-        session.pop('cleaned_filename', None)  # Invalidate previous cleaned file
-        
-        return jsonify({
-            'message': 'File uploaded successfully', 
-            'filename': uploaded_file.filename,
-            'filepath': filepath
-        }), 200
+        # Save file into its own dataset folder
+        record = create_upload_record(uploaded_file.filename)
+        with stage('save'):
+            uploaded_file.save(record.raw_path)
+        return finish_upload(record)
         
     except Exception as e:
         app.logger.error(f"Upload error: {str(e)}")
         return jsonify({'error': 'Upload failed. Please try again.'}), 500
 
+@app.route('/upload/stream', methods=['PUT'])
+def upload_stream():
+    """Upload a file as the raw request body (query: filename). The body is written to disk
+    in blocks as it arrives, without multipart parsing or a temporary copy."""
+    record = None
+    try:
+        filename = os.path.basename(request.args.get('filename', ''))
+        if filename == '':
+            return jsonify({'error': 'No file selected'}), 400
+        if not allowed_file(filename):
+            return jsonify({'error': 'File type not allowed. Please upload CSV, Excel, or JSON files only.'}), 400
+
+        record = create_upload_record(filename)
+        chunk_bytes = app.config['UPLOAD_STREAM_CHUNK_BYTES']
+        with stage('save'), open(record.raw_path, 'wb') as f:
+            while True:
+                chunk = request.stream.read(chunk_bytes)
+                if not chunk:
+                    break
+                f.write(chunk)
+        if os.path.getsize(record.raw_path) == 0:
+            remove_dataset(record.dataset_id)
+            return jsonify({'error': 'Uploaded file is empty'}), 400
+        return finish_upload(record)
+
+    except RequestEntityTooLarge:
+        if record is not None:
+            remove_dataset(record.dataset_id)
+        raise
+    except Exception as e:
+        app.logger.error(f"Upload error: {str(e)}")
+        return jsonify({'error': 'Upload failed. Please try again.'}), 500
+
+def current_workbook(record):
+    """Path of the uploaded workbook behind a dataset, or None if the upload isn't Excel"""
+    if record is None or record.filename.rsplit('.', 1)[-1].lower() not in ('xls', 'xlsx'):
+        return None
+    return os.path.join(record.folder, record.filename)
+
+@app.route('/upload/sheets', methods=['GET'])
+def upload_sheets():
+    """Sheets of the uploaded workbook with their used-range size, read without loading cells"""
+    try:
+        record = get_current_dataset()
+        workbook = current_workbook(record)
+        if workbook is None:
+            return jsonify({'error': 'The current dataset is not an Excel workbook'}), 400
+        sheets = list_sheets(workbook)
+        selected = dataset_registry.get_artifact(record.dataset_id, 'excel_sheet', version=0)
+        return jsonify({
+            'filename': record.filename,
+            'sheets': sheets,
+            'selected': selected if selected is not None else (sheets[0]['name'] if sheets else None)
+        }), 200
+    except Exception as e:
+        app.logger.error(traceback.format_exc())
+        return jsonify({'error': f'Failed to read workbook: {str(e)}'}), 500
+
+@app.route('/upload/sheet', methods=['POST'])
+def select_sheet():
+    """Use another sheet of the uploaded workbook as the dataset (body: {"sheet": name}).
+    The sheet is parsed once and stored as Parquet. It replaces the current dataset,
+    so cleaned versions of the previous sheet are discarded."""
+    try:
+        record = get_current_dataset()
+        workbook = current_workbook(record)
+        if workbook is None:
+            return jsonify({'error': 'The current dataset is not an Excel workbook'}), 400
+        sheet = (request.json or {}).get('sheet')
+        if sheet not in [s['name'] for s in list_sheets(workbook)]:
+            return jsonify({'error': f'Unknown sheet: {sheet}'}), 400
+        if not columnar_available():
+            return jsonify({'error': 'Selecting a sheet requires pyarrow'}), 400
+
+        new_record = dataset_registry.create(record.filename)
+        try:
+            columnar_path, compaction = worker_pool.run(
+                pool_tasks.convert_sheet,
+                workbook,
+                sheet,
+                new_record.raw_path,
+                app.config['COMPACT_DTYPES'],
+                tag=new_record.dataset_id
+            )
+        except POOL_ERRORS as e:
+            remove_dataset(new_record.dataset_id)
+            return pool_error_response(e)
+        except Exception as e:
+            remove_dataset(new_record.dataset_id)
+            return jsonify({'error': f'Could not read sheet {sheet}: {str(e)}'}), 400
+        os.replace(workbook, new_record.raw_path)
+        new_record.raw_path = columnar_path
+        dataset_registry.set_artifact(new_record.dataset_id, 'excel_sheet', sheet, version=0)
+        store_compaction(new_record, compaction)
+        remove_dataset(record.dataset_id)
+        return finish_upload(new_record)
+    except Exception as e:
+        app.logger.error(traceback.format_exc())
+        return jsonify({'error': f'Failed to select sheet: {str(e)}'}), 500
+
 @app.route('/cleaning', methods=['GET'])
 def cleaning_page():
+    """Data quality report for the current dataset version.
+    Query params: mode ('exact' or 'fast'; fast estimates from a row sample and attaches
+    error bounds), refine (with mode=fast, compute the exact report in the background)."""
     try:
-        # Get the latest file in the uploads directory
-        upload_folder = app.config['UPLOAD_FOLDER']
-        files = [os.path.join(upload_folder, f) for f in os.listdir(upload_folder) 
-                if os.path.isfile(os.path.join(upload_folder, f))]
-        
-        if not files:
+        # Get the current version of this session's dataset
+        record = get_current_dataset()
+        if record is None:
             return jsonify({'error': 'No files uploaded yet'}), 400
+
+        mode = request.args.get('mode', 'exact')
+        if mode not in ('exact', 'fast'):
+            return jsonify({'error': 'mode must be exact or fast'}), 400
         
-        filepath = max(files, key=os.path.getctime)
-        filename = os.path.basename(filepath)
-        
-        # Load dataset based on file extension
-        ext = filepath.split('.')[-1].lower()
+        filepath = record.current_path
+        filename = display_name(filepath)
+        version = record.version
+
+        # Exact reports never change for a version, so a client holding one revalidates with a 304
+        etag = dataset_etag(record, 'quality_report')
+        # An exact report (computed earlier or refined in the background) is served as soon as it exists
+        refined = dataset_registry.get_artifact(record.dataset_id, 'quality_report', version=version)
+        if refined is not None:
+            count_report_lookup(True)
+            cached = not_modified(etag)
+            return cached if cached is not None else cacheable(jsonify(refined), etag)
+
+        # Large uploads were profiled chunk by chunk at ingestion, so their exact report needs no load
+        ingested = dataset_registry.get_artifact(record.dataset_id, 'ingest_profile', version=version) is not None
         
+        if mode == 'fast' and not ingested:
+            # Load dataset based on file extension
+            try:
+                df = load_dataset(filepath)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            except Exception as e:
+                app.logger.error(traceback.format_exc())
+                return jsonify({'error': f'Error loading dataset: {str(e)}'}), 500
+
+            if len(df) > app.config['QUALITY_SAMPLE_ROWS']:
+                with stage('sampled_report'):
+                    report = sampled_quality_report(df, filename, app.config['QUALITY_SAMPLE_ROWS'])
+                if request.args.get('refine') in ('1', 'true'):
+                    start_report_refinement(record)
+                    report['refinement'] = report_refinement_status(record)
+                return jsonify(report), 200
+
+        # Generate comprehensive data quality report (profiled in a worker process)
         try:
-            if ext == 'csv':
-                try:
-                    df = pd.read_csv(filepath, encoding='utf-8-sig')
-                except UnicodeDecodeError:
-                    df = pd.read_csv(filepath, encoding='latin1')
-            elif ext in ['xls', 'xlsx']:
-                df = pd.read_excel(filepath)
-            elif ext == 'json':
-                df = pd.read_json(filepath, orient='records')
-            else:
-                return jsonify({'error': 'Unsupported file format'}), 400
-        except Exception as e:
-            app.logger.error(traceback.format_exc())
-            return jsonify({'error': f'Error loading dataset: {str(e)}'}), 500
+            report = exact_quality_report(record, filepath, filename, version)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if 'error' in report:
+            return jsonify(report), 200  # Not kept, so not cacheable either
+        return cacheable(jsonify(report), etag)
 
-        # Generate comprehensive data quality report
-        report = data_quality_report(df, filename)
-        return jsonify(report), 200
-        
+    except POOL_ERRORS as e:
+        return pool_error_response(e)
     except Exception as e:
         app.logger.error(traceback.format_exc())
         return jsonify({'error': f'Failed to generate report: {str(e)}'}), 500
 
+def start_report_refinement(record):
+    """Compute the exact report for the current version in the background, once per version"""
+    with report_refine_lock:
+        if dataset_registry.get_artifact(record.dataset_id, 'quality_report_refinement') is not None:
+            return
+        version = record.version
+        future = report_refiner.submit(refine_quality_report, record, version, record.current_path)
+        dataset_registry.set_artifact(record.dataset_id, 'quality_report_refinement', future, version=version)
+
+def refine_quality_report(record, version, filepath):
+    exact_quality_report(record, filepath, display_name(filepath), version)
+
+def exact_quality_report(record, filepath, filename, version):
+    """Exact report for one dataset version, computed once and kept as its 'quality_report'
+    artifact. The profile behind it is kept too, as the base for the next version's report.
+    Uploads profiled during chunked ingestion are reported from that profile without a load."""
+    report = dataset_registry.get_artifact(record.dataset_id, 'quality_report', version=version)
+    if instrumentation.current_trace() is not None:  # Background refinements aren't lookups
+        count_report_lookup(report is not None)
+    if report is not None:
+        return report
+    dtype_cache = get_dtype_cache(record, version)
+    ingested = dataset_registry.get_artifact(record.dataset_id, 'ingest_profile', version=version)
+    if ingested is not None:
+        with stage('ingested_report'):
+            report = ingested_quality_report(filepath, ingested, filename, dtype_cache)
+        store_quality_report(record, version, report, ingested['profile'])
+        return report
+    result = worker_pool.run(pool_tasks.profile_dataset, filepath, dict(dtype_cache), tag=record.dataset_id)
+    dtype_cache.update(result['dtype_cache'])
+    report = quality_report(
+        lambda: result['profile'], lambda: result['preview'], lambda: result['suggested_dtypes'], filename
+    )
+    store_quality_report(record, version, report, result['profile'])
+    return report
+
+def count_report_lookup(hit):
+    metrics.increment('quality_report_cache_total', 'Exact quality report lookups by result',
+                      result='hit' if hit else 'miss')
+
+def store_quality_report(record, version, report, profile):
+    if 'error' in report:
+        return  # A failed report is recomputed next time
+    dataset_registry.set_artifact(record.dataset_id, 'quality_profile', profile, version=version)
+    dataset_registry.set_artifact(record.dataset_id, 'quality_report', report, version=version)
+
+def report_refinement_status(record):
+    future = dataset_registry.get_artifact(record.dataset_id, 'quality_report_refinement')
+    if future is None:
+        return {'status': 'none'}
+    if not future.done():
+        return {'status': 'running' if future.running() else 'queued'}
+    if future.exception() is not None:
+        return {'status': 'failed', 'error': str(future.exception())}
+    return {'status': 'done'}
+
+@app.route('/cleaning/refinement', methods=['GET'])
+def cleaning_refinement():
+    """Progress of the background exact report; fetch /cleaning again once it is done"""
+    record = get_current_dataset()
+    if record is None:
+        return jsonify({'error': 'No files uploaded yet'}), 400
+    return jsonify(report_refinement_status(record)), 200
+
+@app.route('/cleaning/outliers', methods=['GET'])
+def cleaning_outliers():
+    """Page through the outlier rows of one column for one method.
+    Query params: column, method (winsorizing|iqr|zscore), offset, limit,
+    format ('indices' for row labels or 'ranges' for [start, stop) row positions)."""
+    try:
+        record = get_current_dataset()
+        if record is None:
+            return jsonify({'error': 'No files uploaded yet'}), 400
+
+        column = request.args.get('column')
+        method = request.args.get('method')
+        encoding = request.args.get('format', 'indices')
+        if method not in ('winsorizing', 'iqr', 'zscore'):
+            return jsonify({'error': 'method must be winsorizing, iqr or zscore'}), 400
+        if encoding not in ('indices', 'ranges'):
+            return jsonify({'error': 'format must be indices or ranges'}), 400
+        try:
+            offset = max(0, int(request.args.get('offset', 0)))
+            limit = min(max(1, int(request.args.get('limit', 1000))), app.config['OUTLIER_PAGE_MAX_ROWS'])
+        except ValueError:
+            return jsonify({'error': 'offset and limit must be integers'}), 400
+
+        df = load_dataset(record.current_path, columns=[column])
+        if column not in df.columns or not pd.api.types.is_numeric_dtype(df[column]):
+            return jsonify({'error': f'Unknown or non-numeric column: {column}'}), 400
+
+        positions = column_outlier_positions(df[column], method)
+        if encoding == 'ranges':
+            items = encode_ranges(positions)
+        else:
+            items = positions
+        page = items[offset:offset + limit]
+        return jsonify({
+            'column': column,
+            'method': method,
+            'format': encoding,
+            'count': int(len(positions)),
+            'total_items': len(items),
+            'offset': offset,
+            'limit': limit,
+            'has_more': offset + limit < len(items),
+            'items': df.index[page].tolist() if encoding == 'indices' else page
+        }), 200
+    except Exception as e:
+        app.logger.error(traceback.format_exc())
+        return jsonify({'error': f'Failed to load outliers: {str(e)}'}), 500
+
+@app.route('/cleaning/duplicates', methods=['GET'])
+def cleaning_duplicates():
+    """Page through the duplicated rows of the current dataset version.
+    Query params: columns (repeatable; all columns when absent), keep (first|last|none,
+    as in DataFrame.duplicated), offset, limit, format ('indices' or 'ranges')."""
+    try:
+        record = get_current_dataset()
+        if record is None:
+            return jsonify({'error': 'No files uploaded yet'}), 400
+
+        columns = request.args.getlist('columns') or None
+        keep = request.args.get('keep', 'first')
+        encoding = request.args.get('format', 'indices')
+        if keep not in ('first', 'last', 'none'):
+            return jsonify({'error': 'keep must be first, last or none'}), 400
+        if encoding not in ('indices', 'ranges'):
+            return jsonify({'error': 'format must be indices or ranges'}), 400
+        try:
+            offset = max(0, int(request.args.get('offset', 0)))
+            limit = min(max(1, int(request.args.get('limit', 1000))), app.config['OUTLIER_PAGE_MAX_ROWS'])
+        except ValueError:
+            return jsonify({'error': 'offset and limit must be integers'}), 400
+
+        df = load_dataset(record.current_path)
+        unknown = [col for col in columns or [] if col not in df.columns]
+        if unknown:
+            return jsonify({'error': f'Unknown columns: {", ".join(unknown)}'}), 400
+
+        # Subset checks combine cached per-column hashes, so the frame is hashed at most once
+        index = pool_tasks.duplicate_index(record.current_path, df)
+        positions = index.positions(columns, keep=False if keep == 'none' else keep)
+        items = encode_ranges(positions) if encoding == 'ranges' else positions
+        page = items[offset:offset + limit]
+        return jsonify({
+            'columns': columns or df.columns.tolist(),
+            'keep': keep,
+            'format': encoding,
+            'count': int(len(positions)),
+            'total_items': len(items),
+            'offset': offset,
+            'limit': limit,
+            'has_more': offset + limit < len(items),
+            'items': df.index[page].tolist() if encoding == 'indices' else page
+        }), 200
+    except Exception as e:
+        app.logger.error(traceback.format_exc())
+        return jsonify({'error': f'Failed to load duplicates: {str(e)}'}), 500
+
 @app.route('/clean-data', methods=['POST'])
 def clean_data():
     try:
-        # Get the latest file
-        upload_folder = app.config['UPLOAD_FOLDER']
-        files = [os.path.join(upload_folder, f) for f in os.listdir(upload_folder) 
-                if os.path.isfile(os.path.join(upload_folder, f))]
-        
-        if not files:
+        # Get the current version of this session's dataset
+        record = get_current_dataset()
+        if record is None:
             return jsonify({'error': 'No files uploaded yet'}), 400
         
-        filepath = max(files, key=os.path.getctime)
-        filename = os.path.basename(filepath)
+        filepath = record.current_path
+        filename = display_name(filepath)
+        version = record.version
         
-        # Load dataset
-        ext = filepath.split('.')[-1].lower()
-        if ext == 'csv':
-            try:
-                df = pd.read_csv(filepath, encoding='utf-8-sig')
-            except UnicodeDecodeError:
-                df = pd.read_csv(filepath, encoding='latin1')
-        elif ext in ['xls', 'xlsx']:
-            df = pd.read_excel(filepath)
-        elif ext == 'json':
-            df = pd.read_json(filepath, orient='records')
-        else:
+        ext = display_ext(filepath)
+        if ext not in ALLOWED_EXTENSIONS:
             return jsonify({'error': 'Unsupported file format'}), 400
 
         # Get cleaning configuration
         config = request.json
-        original_shape = df.shape
-
-        # --- BEFORE REPORT ---
-        before_report = data_quality_report(df, filename)
-        before_dtypes = df.dtypes.apply(lambda x: x.name).to_dict()
 
-        # Apply cleaning operations
-        df_cleaned = apply_cleaning_operations(df.copy(), config)
+        # --- BEFORE REPORT --- (normally already computed by /cleaning for this version)
+        with stage('before_report'):
+            before_report = exact_quality_report(record, filepath, filename, version)
 
-        # Save cleaned dataset
+        # Apply cleaning operations and save the cleaned dataset in a worker process
+        # (as Parquet when available; converted back only on download)
         cleaned_filename = f"cleaned_{filename}"
-        cleaned_filepath = os.path.join(upload_folder, cleaned_filename)
-        
-        if ext == 'csv':
-            df_cleaned.to_csv(cleaned_filepath, index=False)
-        elif ext in ['xls', 'xlsx']:
-            df_cleaned.to_excel(cleaned_filepath, index=False)
-        elif ext == 'json':
-            df_cleaned.to_json(cleaned_filepath, orient='records')
+        result = worker_pool.run(
+            pool_tasks.clean_dataset,
+            filepath,
+            config,
+            os.path.join(record.folder, cleaned_filename),
+            dict(get_dtype_cache(record, version)),
+            dataset_registry.get_artifact(record.dataset_id, 'quality_profile', version=version),
+            tag=record.dataset_id
+        )
+        cleaned_filepath = result['path']
+        dataset_cache.invalidate(cleaned_filepath)
         
+        cleaned_version = dataset_registry.add_cleaned_version(record.dataset_id, cleaned_filepath).version
         session['cleaned_filename'] = cleaned_filename  # Track cleaned file for current session
 
-        # --- AFTER REPORT ---
-        after_report = data_quality_report(df_cleaned, cleaned_filename)
-        after_dtypes = df_cleaned.dtypes.apply(lambda x: x.name).to_dict()
-        print('DEBUG: df_cleaned.dtypes after cleaning:', df_cleaned.dtypes)
-        print('DEBUG: after_report["suggested_dtypes"]:', after_report.get('suggested_dtypes'))
+        # Dtype verdicts of the columns the plan left alone carry over to the new version
+        get_dtype_cache(record, version).update(result['before_dtype_cache'])
+        get_dtype_cache(record, cleaned_version).update(result['dtype_cache'])
+
+        # --- AFTER REPORT --- (only the columns and rows the plan touched were profiled again)
+        with stage('after_report'):
+            after_report = quality_report(
+                lambda: result['profile'], lambda: result['preview'], lambda: result['suggested_dtypes'],
+                cleaned_filename
+            )
+            store_quality_report(record, cleaned_version, after_report, result['profile'])
+        before_dtypes = result['before_dtypes']
+        after_dtypes = result['after_dtypes']
+        app.logger.debug(f"Dtypes after cleaning: {after_dtypes}")
+        app.logger.debug(f"Suggested dtypes after cleaning: {after_report.get('suggested_dtypes')}")
 
         # --- DATA TYPE CHANGES ---
         dtype_changes = {}
@@ -222,148 +815,49 @@ def clean_data():
             'cleaned_filename': cleaned_filename
         }), 200
     
+    except POOL_ERRORS as e:
+        return pool_error_response(e)
     except Exception as e:
         app.logger.error(traceback.format_exc())
         return jsonify({'error': f'Failed to apply data cleaning: {str(e)}'}), 500
 
-def apply_cleaning_operations(df, config):
-    """Apply data cleaning operations based on configuration"""
-    
-    # Handle duplicates
-    if config.get('duplicates') == 'delete':
-        df = df.drop_duplicates()
-    
-    # Handle null values
-    nulls_config = config.get('nulls', {})
-    for column, null_action in nulls_config.items():
-        if column in df.columns:
-            action = null_action.get('action')
-            if action == 'delete_row':
-                df = df.dropna(subset=[column])
-            elif action == 'delete_column':
-                df = df.drop(columns=[column])
-            elif action == 'fill':
-                fill_method = null_action.get('fillMethod', 'specific')
-                fill_value = null_action.get('fillValue', '')
-                if fill_method == 'specific':
-                    df[column] = df[column].fillna(fill_value)
-                elif fill_method == 'mean':
-                    df[column] = df[column].fillna(df[column].mean())
-                elif fill_method == 'median':
-                    df[column] = df[column].fillna(df[column].median())
-                elif fill_method == 'mode':
-                    mode_val = df[column].mode()
-                    df[column] = df[column].fillna(mode_val.iloc[0] if not mode_val.empty else fill_value)
-                elif fill_method == 'forward':
-                    df[column] = df[column].fillna(method='ffill')
-                elif fill_method == 'backward':
-                    df[column] = df[column].fillna(method='bfill')
-    
-    # Handle data type conversions
-    data_types_config = config.get('dataTypes', {})
-    for column, action in data_types_config.items():
-        if column in df.columns and action == 'convert':
-            suggested_type = get_suggested_dtype(df[column])
-            if suggested_type:
-                try:
-                    if suggested_type == 'numeric':
-                        df[column] = pd.to_numeric(df[column], errors='coerce')
-                    elif suggested_type == 'datetime':
-                        df[column] = pd.to_datetime(df[column], errors='coerce')
-                except:
-                    pass  # Keep original type if conversion fails
-                print(df.dtypes)
-
-    # Handle outlier cleaning
-    outlier_config = config.get('outliers', {})
-    for column, outlier_action in outlier_config.items():
-        if column in df.columns and pd.api.types.is_numeric_dtype(df[column]):
-            method = outlier_action.get('method', 'none')
-            action = outlier_action.get('action', 'none')
-            col_data = df[column]
-            if method == 'none' or action == 'none':
-                continue
-            if action == 'remove':
-                if method == 'winsorizing':
-                    q05 = col_data.quantile(0.05)
-                    q95 = col_data.quantile(0.95)
-                    mask = (col_data >= q05) & (col_data <= q95)
-                    df = df[mask]
-                elif method == 'iqr':
-                    q1 = col_data.quantile(0.25)
-                    q3 = col_data.quantile(0.75)
-                    iqr = q3 - q1
-                    iqr_low = q1 - 1.5 * iqr
-                    iqr_high = q3 + 1.5 * iqr
-                    mask = (col_data >= iqr_low) & (col_data <= iqr_high)
-                    df = df[mask]
-                elif method == 'zscore':
-                    mean = col_data.mean()
-                    std = col_data.std()
-                    if std > 0:
-                        z_scores = (col_data - mean) / std
-                        mask = z_scores.abs() <= 3
-                        df = df[mask]
-            elif action == 'cap':
-                if method == 'winsorizing':
-                    q05 = col_data.quantile(0.05)
-                    q95 = col_data.quantile(0.95)
-                    df[column] = col_data.clip(lower=q05, upper=q95)
-                elif method == 'iqr':
-                    q1 = col_data.quantile(0.25)
-                    q3 = col_data.quantile(0.75)
-                    iqr = q3 - q1
-                    iqr_low = q1 - 1.5 * iqr
-                    iqr_high = q3 + 1.5 * iqr
-                    df[column] = col_data.clip(lower=iqr_low, upper=iqr_high)
-                elif method == 'zscore':
-                    mean = col_data.mean()
-                    std = col_data.std()
-                    if std > 0:
-                        df[column] = col_data.clip(lower=mean - 3*std, upper=mean + 3*std)
-    
-    return df
+def get_suggested_dtype(series, cache=None):
+    """Suggested dtype ('boolean', 'numeric', 'datetime') for a column, or None"""
+    return infer_column_dtype(series, cache)['suggested']
 
-def get_suggested_dtype(series):
-    # 1. Check for boolean dtype
-    if series.dtype == 'bool':
-        return None  # Already boolean, no suggestion needed
-    else:
-        # 2. Check for only two unique values (excluding NaN)
-        unique_vals = series.dropna().unique()
-        if len(unique_vals) == 2:
-            bool_sets = [
-                {True, False},
-                {1, 0},
-                {'yes', 'no'},
-                {'Yes', 'No'},
-                {'true', 'false'},
-                {'True', 'False'},
-                {'Y', 'N'},
-                {'y', 'n'}
-            ]
-            unique_set = set(unique_vals)
-            for bset in bool_sets:
-                if unique_set == bset:
-                    return 'boolean'
-    # 3. Check for numeric
-    if pd.api.types.is_numeric_dtype(series):
-        return None  # Already numeric, no suggestion needed
-    try:
-        pd.to_numeric(series)
-        return 'numeric'
-    except:
-        # 4. Check for datetime
-        try:
-            pd.to_datetime(series)
-            if not pd.api.types.is_datetime64_any_dtype(series):
-                return 'datetime'
-        except:
-            return None
-    return None
-
-def data_quality_report(df, filename):
-    """Generate a comprehensive data quality report"""
+def sampled_quality_report(df, filename, sample_size):
+    """Fast report estimated from a uniform row sample, with a 95% interval for every estimate"""
+    sample = sample_rows(df, sample_size)
+    profile, bounds = sample_profile(sample, len(df))
+
+    def suggest_dtypes():
+        # Verdicts from sampled values aren't exact, so they stay out of the per-version cache
+        return {col: get_suggested_dtype(sample[col]) for col in sample.columns}
+
+    report = quality_report(lambda: profile, lambda: preview_records(df), suggest_dtypes, filename)
+    report['approximate'] = True
+    report['sample_rows'] = len(sample)
+    report['confidence'] = 0.95
+    report['error_bounds'] = bounds
+    return report
+
+def ingested_quality_report(filepath, ingested, filename, dtype_cache):
+    """Quality report for a dataset profiled during chunked ingestion.
+    Dtype suggestions read one column at a time from the columnar file."""
+    def suggest_dtypes():
+        suggestions = {}
+        for col in ingested['columns']:
+            cached = dtype_cache.get(col)
+            if cached is not None:
+                suggestions[col] = cached['suggested']
+            else:
+                suggestions[col] = get_suggested_dtype(read_columnar(filepath, [col])[col], dtype_cache)
+        return suggestions
+
+    return quality_report(lambda: ingested['profile'], lambda: ingested['preview'], suggest_dtypes, filename)
+
+def quality_report(get_profile, get_preview, get_suggested_dtypes, filename):
+    """Assemble the report from a profile, preview rows and per-column dtype suggestions"""
     report = {
         'filename': filename,
         'dataset_info': {},
@@ -378,86 +872,38 @@ def data_quality_report(df, filename):
     }
 
     try:
+        profile = get_profile()
+
         # Basic dataset info
         report['dataset_info'] = {
-            'rows': len(df),
-            'columns': len(df.columns),
-            'memory_usage': f"{df.memory_usage(deep=True).sum() / 1024 / 1024:.2f} MB"
+            'rows': profile['rows'],
+            'columns': profile['columns'],
+            'memory_usage': f"{profile['memory_bytes'] / 1024 / 1024:.2f} MB"
         }
 
-        # Preview data (first 5 rows) with NaN replaced by None
-        preview_df = df.head().replace({np.nan: None})
-        report['preview'] = preview_df.to_dict(orient="records")
+        report['preview'] = get_preview()
 
         # Null values analysis
-        nulls = df.isnull().sum()
-        report['nulls'] = nulls[nulls > 0].to_dict()
+        report['nulls'] = profile['null_counts']
         
         # Calculate null percentage
-        total_cells = len(df) * len(df.columns)
-        null_percentage = (df.isnull().sum().sum() / total_cells) * 100 if total_cells > 0 else 0
+        total_cells = profile['rows'] * profile['columns']
+        null_percentage = (profile['total_nulls'] / total_cells) * 100 if total_cells > 0 else 0
 
         # Duplicate analysis
-        duplicate_count = int(df.duplicated().sum())
+        duplicate_count = profile['duplicates']
         report['duplicates'] = duplicate_count
-        duplicate_percentage = (duplicate_count / len(df)) * 100 if len(df) > 0 else 0
+        duplicate_percentage = (duplicate_count / profile['rows']) * 100 if profile['rows'] > 0 else 0
 
         # Data type suggestions
-        suggested_dtypes = {}
-        for col in df.columns:
-            suggested_type = get_suggested_dtype(df[col])
-            if suggested_type:
-                suggested_dtypes[col] = suggested_type
+        suggested_dtypes = {
+            col: suggested_type for col, suggested_type in get_suggested_dtypes().items() if suggested_type
+        }
         report['suggested_dtypes'] = suggested_dtypes
 
-        # Statistical summary for numeric columns
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        if len(numeric_cols) > 0:
-            numeric_df = df[numeric_cols]
-            report['statistical_summary'] = {
-                'mean': numeric_df.mean().to_dict(),
-                'std': numeric_df.std().to_dict(),
-                'min': numeric_df.min().to_dict(),
-                'max': numeric_df.max().to_dict(),
-                'median': numeric_df.median().to_dict()
-            }
-
-            # Outlier detection for each numeric column
-            for col in numeric_cols:
-                col_data = df[col].dropna()
-                outlier_info = {}
-                # Winsorizing (outside 5th/95th percentiles)
-                q05 = col_data.quantile(0.05)
-                q95 = col_data.quantile(0.95)
-                winsor_idx = col_data[(col_data < q05) | (col_data > q95)].index.tolist()
-                outlier_info['winsorizing'] = {
-                    'count': len(winsor_idx),
-                    'indices': winsor_idx
-                }
-                # IQR method
-                q1 = col_data.quantile(0.25)
-                q3 = col_data.quantile(0.75)
-                iqr = q3 - q1
-                iqr_low = q1 - 1.5 * iqr
-                iqr_high = q3 + 1.5 * iqr
-                iqr_idx = col_data[(col_data < iqr_low) | (col_data > iqr_high)].index.tolist()
-                outlier_info['iqr'] = {
-                    'count': len(iqr_idx),
-                    'indices': iqr_idx
-                }
-                # Z-score method (|z| > 3)
-                mean = col_data.mean()
-                std = col_data.std()
-                if std > 0:
-                    z_scores = (col_data - mean) / std
-                    z_idx = z_scores[abs(z_scores) > 3].index.tolist()
-                else:
-                    z_idx = []
-                outlier_info['zscore'] = {
-                    'count': len(z_idx),
-                    'indices': z_idx
-                }
-                report['outliers'][col] = outlier_info
+        # Statistical summary and outlier detection for numeric columns
+        report['statistical_summary'] = profile['statistical_summary']
+        report['outliers'] = profile['outliers']
 
         # Quality metrics
         report['quality_metrics'] = {
@@ -492,12 +938,21 @@ def health_check():
         'status': 'healthy',
         'message': 'Backend is running',
         'upload_folder': app.config['UPLOAD_FOLDER'],
-        'files_count': len(os.listdir(app.config['UPLOAD_FOLDER']))
+        'files_count': len(os.listdir(app.config['UPLOAD_FOLDER'])),
+        'datasets_count': len(dataset_registry),
+        'dataset_registry': dataset_registry.stats(),
+        'dataset_cache': dataset_cache.stats(),
+        'pdf_renderer': pdf_renderer.stats(),
+        'worker_pool': worker_pool.stats(),
+        'export_jobs': export_jobs.stats(),
+        'chart_images': chart_images.stats(),
+        'requests': metrics.stats()
     }), 200
 
 @app.errorhandler(413)
 def too_large(e):
-    return jsonify({'error': 'File too large. Maximum size is 10MB.'}), 413
+    max_mb = app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+    return jsonify({'error': f'File too large. Maximum size is {max_mb}MB.'}), 413
 
 @app.errorhandler(500)
 def internal_error(e):
@@ -507,270 +962,504 @@ def internal_error(e):
 def analysis_metadata():
     """Return column names, dtypes, grouped types, and preview from the latest cleaned dataset if available, otherwise from the raw uploaded dataset."""
     try:
-        upload_folder = app.config['UPLOAD_FOLDER']
-        uploaded_filename = session.get('filename')
-        cleaned_filename = session.get('cleaned_filename')
-        print('DEBUG /analysis: session[filename]=', uploaded_filename)
-        print('DEBUG /analysis: session[cleaned_filename]=', cleaned_filename)
-        expected_cleaned_filename = f"cleaned_{uploaded_filename}"
-        use_cleaned = cleaned_filename == expected_cleaned_filename
-        print('DEBUG /analysis: expected_cleaned_filename=', expected_cleaned_filename)
-        print('DEBUG /analysis: use_cleaned=', use_cleaned)
-        if not uploaded_filename:
+        record = get_current_dataset()
+        if record is None:
             return jsonify({'error': 'No uploaded file found. Please upload a dataset first.'}), 400
 
         # Prefer the latest cleaned file if available
-        cleaned_files = [
-            f for f in os.listdir(upload_folder)
-            if f.startswith('cleaned_') and f.endswith(uploaded_filename)
-        ]
-        if cleaned_files:
-            # Pick the one with the most 'cleaned_' prefixes (i.e., the longest name)
-            cleaned_files.sort(key=lambda x: x.count('cleaned_'), reverse=True)
-            analysis_filepath = os.path.join(upload_folder, cleaned_files[0])
-            print('DEBUG /analysis: using latest cleaned file:', cleaned_files[0])
-        else:
-            analysis_filepath = os.path.join(upload_folder, uploaded_filename)
-            print('DEBUG /analysis: using original file:', uploaded_filename)
-        print('DEBUG /analysis: analysis_filepath=', analysis_filepath)
+        analysis_filepath = record.current_path
 
         if not os.path.exists(analysis_filepath):
             return jsonify({'error': 'Analysis file not found. Please upload a dataset first.'}), 400
 
-        ext = analysis_filepath.split('.')[-1].lower()
-        if ext == 'csv':
-            df = pd.read_csv(analysis_filepath)
-        elif ext in ['xls', 'xlsx']:
-            df = pd.read_excel(analysis_filepath)
-        elif ext == 'json':
-            df = pd.read_json(analysis_filepath, orient='records')
-        else:
-            return jsonify({'error': 'Unsupported file format'}), 400
+        etag = dataset_etag(record)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+
+        try:
+            df = load_dataset(analysis_filepath)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
         # Group columns by type
-        columns = []
-        for col in df.columns:
-            dtype = df[col].dtype.name
-            if pd.api.types.is_numeric_dtype(df[col]):
-                group = 'Numerical'
-            elif pd.api.types.is_datetime64_any_dtype(df[col]):
-                group = 'Date/Time'
-            else:
-                group = 'Categorical'
-            columns.append({'name': col, 'dtype': dtype, 'group': group})
+        columns = [
+            {'name': col, 'dtype': df[col].dtype.name, 'group': column_group(df[col])}
+            for col in df.columns
+        ]
 
-        preview = df.head().replace({np.nan: None}).to_dict(orient='records')
-        data = df.replace({np.nan: None}).to_dict(orient='records')
-        return jsonify({
-            'filename': os.path.basename(analysis_filepath),
-            'columns': columns,
-            'preview': preview,
-            'data': data
-        }), 200
+        with stage('encode'):
+            response = jsonify({
+                'filename': display_name(analysis_filepath),
+                'columns': columns,
+                'preview': preview_records(df),
+                'data': json_records(df)
+            })
+        return cacheable(response, etag)
     except Exception as e:
         app.logger.error(traceback.format_exc())
         return jsonify({'error': f'Failed to load analysis metadata: {str(e)}'}), 500
 
+@app.route('/analysis/data', methods=['GET'])
+def analysis_data():
+    """Return a window of rows for the requested columns in columnar form.
+    Query params: columns (repeatable, defaults to all), offset, limit."""
+    try:
+        record = get_current_dataset()
+        if record is None:
+            return jsonify({'error': 'No uploaded file found. Please upload a dataset first.'}), 400
 
-@app.route('/export', methods=['POST'])
-def export_report():
+        etag = dataset_etag(record, list(request.args.items(multi=True)))
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+
+        columns = request.args.getlist('columns')
+        df = load_dataset(record.current_path, columns=columns)
+        missing = [col for col in columns if col not in df.columns]
+        if missing:
+            return jsonify({'error': f"Unknown columns: {', '.join(missing)}"}), 400
+
+        try:
+            offset = int(request.args.get('offset', 0))
+            limit = int(request.args.get('limit', app.config['ANALYSIS_PAGE_DEFAULT_ROWS']))
+        except ValueError:
+            return jsonify({'error': 'offset and limit must be integers'}), 400
+        if offset < 0 or limit < 1:
+            return jsonify({'error': 'offset must be >= 0 and limit must be >= 1'}), 400
+        limit = min(limit, app.config['ANALYSIS_PAGE_MAX_ROWS'])
+
+        payload = encode_columnar(df, columns, offset, limit)
+        payload['filename'] = display_name(record.current_path)
+        payload['dataset_version'] = record.version_tag
+        payload['limit'] = limit
+        return cacheable(jsonify(payload), etag)
+    except Exception as e:
+        app.logger.error(traceback.format_exc())
+        return jsonify({'error': f'Failed to load analysis data: {str(e)}'}), 500
+
+@app.route('/analysis/aggregate', methods=['POST'])
+def analysis_aggregate():
+    """Compute the reduced series for a bar/pie/grouped/stacked/histogram chart on the server"""
     try:
-        import datetime
-        data = request.json
-        
-        # Extract options from request
-        report_title = data.get('reportTitle', 'EDA Report')
-        report_format = data.get('reportFormat', 'html')
-        # Accept both camelCase and snake_case for included_sections
-        included_sections = data.get('included_sections') or data.get('includedSections', {})
-        charts = data.get('charts', [])
-        download_cleaned = data.get('downloadCleaned', False)
-        project_name = data.get('projectName', '')
-        author_name = data.get('authorName', '')
-        final_insights = data.get('finalInsights', '')
-
-        # Find latest cleaned file for stats
-        upload_folder = app.config['UPLOAD_FOLDER']
-        files = [os.path.join(upload_folder, f) for f in os.listdir(upload_folder)
-                 if os.path.isfile(os.path.join(upload_folder, f)) and f.startswith('cleaned_')]
-        if files:
-            cleaned_filepath = max(files, key=os.path.getctime)
-            ext = cleaned_filepath.split('.')[-1].lower()
-            if ext == 'csv':
-                df = pd.read_csv(cleaned_filepath)
-            elif ext in ['xls', 'xlsx']:
-                df = pd.read_excel(cleaned_filepath)
-            elif ext == 'json':
-                df = pd.read_json(cleaned_filepath, orient='records')
-            else:
-                df = pd.DataFrame()
-            file_size = f"{os.path.getsize(cleaned_filepath)/1024/1024:.2f} MB"
-        else:
+        record = get_current_dataset()
+        if record is None:
+            return jsonify({'error': 'No uploaded file found. Please upload a dataset first.'}), 400
+
+        spec = request.json or {}
+        try:
+            top = int(spec['filterTop']) if spec.get('filterTop') not in (None, '') else None
+        except (TypeError, ValueError):
+            return jsonify({'error': 'filterTop must be an integer'}), 400
+        columns = spec.get('columns')
+        if not isinstance(columns, list) or not columns or not all(isinstance(col, str) for col in columns):
+            return jsonify({'error': 'columns must be a list of column names'}), 400
+
+        # Unknown names are reported by aggregate_chart
+        df = load_dataset(record.current_path, columns=columns)
+        try:
+            chart = aggregate_chart(
+                df,
+                spec.get('type'),
+                columns,
+                aggregation=spec.get('aggregationType', 'sum'),
+                sort_order=spec.get('sortOrder', 'none'),
+                top=top,
+                bins=spec.get('bins')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        chart['dataset_version'] = record.version_tag
+        return jsonify(chart), 200
+    except Exception as e:
+        app.logger.error(traceback.format_exc())
+        return jsonify({'error': f'Failed to aggregate chart data: {str(e)}'}), 500
+
+@app.route('/analysis/correlation', methods=['GET'])
+def analysis_correlation():
+    """Correlation matrix for the selected numeric columns (query: columns, method).
+    The full matrix is computed once per dataset version and sliced per request."""
+    try:
+        record = get_current_dataset()
+        if record is None:
+            return jsonify({'error': 'No uploaded file found. Please upload a dataset first.'}), 400
+
+        method = request.args.get('method', 'pearson')
+        artifact_name = f"correlation:{method}"
+        result = dataset_registry.get_artifact(record.dataset_id, artifact_name)
+        cached = result is not None
+        try:
+            if not cached:
+                result = correlation_matrix(load_dataset(record.current_path), method)
+                dataset_registry.set_artifact(record.dataset_id, artifact_name, result)
+            payload = slice_correlation(result, request.args.getlist('columns'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        payload['method'] = method
+        payload['cached'] = cached
+        payload['dataset_version'] = record.version_tag
+        return jsonify(payload), 200
+    except Exception as e:
+        app.logger.error(traceback.format_exc())
+        return jsonify({'error': f'Failed to compute correlation: {str(e)}'}), 500
+
+@app.route('/analysis/scatter', methods=['GET'])
+def analysis_scatter():
+    """Downsampled (LTTB) or 2D-binned scatter data for two numeric columns.
+    Query params: x, y, mode (auto|lttb|density), max_points, bins."""
+    try:
+        record = get_current_dataset()
+        if record is None:
+            return jsonify({'error': 'No uploaded file found. Please upload a dataset first.'}), 400
+
+        axes = [request.args.get('x'), request.args.get('y')]
+        df = load_dataset(record.current_path, columns=[col for col in axes if col])
+        try:
+            payload = scatter_points(
+                df,
+                request.args.get('x'),
+                request.args.get('y'),
+                mode=request.args.get('mode', 'auto'),
+                max_points=request.args.get('max_points', 2000),
+                bins=request.args.get('bins', 50)
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        payload['dataset_version'] = record.version_tag
+        return jsonify(payload), 200
+    except Exception as e:
+        app.logger.error(traceback.format_exc())
+        return jsonify({'error': f'Failed to load scatter data: {str(e)}'}), 500
+
+
+class ExportError(Exception):
+    """An export step failed with a message meant for the user"""
+
+def build_export(record, data, progress=None):
+    """Render the report (and optionally the cleaned dataset) described by the export options.
+    Returns (body, download_name, mimetype) where body is bytes, or an iterator of
+    bytes chunks for ZIP exports. progress(percent, stage) is called as the export
+    moves through its stages."""
+    import datetime
+    progress = progress or (lambda percent, stage: None)
+
+    # Extract options from request
+    data = data or {}
+    report_title = data.get('reportTitle', 'EDA Report')
+    report_format = data.get('reportFormat', 'html')
+    # Accept both camelCase and snake_case for included_sections
+    included_sections = data.get('included_sections') or data.get('includedSections', {})
+    charts = data.get('charts', [])
+    download_cleaned = data.get('downloadCleaned', False)
+    project_name = data.get('projectName', '')
+    author_name = data.get('authorName', '')
+    final_insights = data.get('finalInsights', '')
+
+    # Latest cleaned file of this session's dataset for stats
+    progress(10, 'Loading dataset')
+    cleaned_filepath = record.cleaned_path if record is not None else None
+    if cleaned_filepath:
+        try:
+            df = load_dataset(cleaned_filepath)
+        except ValueError:
             df = pd.DataFrame()
-            file_size = '-'
-
-        # Overview
-        total_rows = len(df)
-        total_columns = len(df.columns)
-        num_numerical = len([c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])])
-        num_boolean = len([c for c in df.columns if df[c].dtype == 'bool'])
-        num_categorical = len([c for c in df.columns if df[c].dtype == 'object'])
-        num_datetime = len([c for c in df.columns if pd.api.types.is_datetime64_any_dtype(df[c])])
-
-        # Data Quality Summary
-        missing_values = f"{df.isnull().sum().sum()} ({(df.isnull().sum().sum()/(len(df)*len(df.columns))*100 if len(df)*len(df.columns) else 0):.2f}%)" if not df.empty else '0 (0.00%)'
-        nulls = df.isnull().sum()
-        nulls_dict = nulls[nulls > 0].to_dict()
-        duplicates = df.duplicated().sum() if not df.empty else 0
-        # Dummy dtype fixes (should be provided by frontend or computed)
-        dtype_fixes = data.get('dtypeFixes', [])
-
-        # Cleaning Summary
-        cleaning_actions = data.get('cleaningActions', [])
-        cleaning_table = data.get('cleaning_table', [])
-
-        # Outlier Detection Summary
-        outlier_table = data.get('outlierTable', [])
-
-        # Charts (visualisations)
-        charts_data = []
-        for chart in charts:
-            chart_info = {
-                'title': chart.get('title', ''),
-                'type': chart.get('type', ''),
-                'columns': ', '.join(chart.get('columns', [])) if chart.get('columns') else '',
-                'insight': chart.get('insight', ''),
-                'image_base64': chart.get('image_base64', ''),
-                'filter': chart.get('filter', ''),
-                'sort': chart.get('sort', '')
-            }
-            # Add aggregation type if applicable
-            if chart.get('aggregationType') and chart.get('type') in ['bar', 'horizontalBar', 'groupedBar', 'stackedBar', 'pie', 'donut']:
-                chart_info['aggregationType'] = chart.get('aggregationType')
-            charts_data.append(chart_info)
-
-        # Date & Time of Export
-        export_datetime = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-        # 1. Generate HTML report using Jinja2 template
-        with open('templates/eda_report_template.html', 'r', encoding='utf-8') as f:
-            html_template = f.read()
-        template = Template(html_template)
-        context = dict(
-            title=report_title,
-            export_datetime=export_datetime,
-            project_name=project_name,
-            author_name=author_name,
-            total_rows=total_rows,
-            total_columns=total_columns,
-            file_size=file_size,
-            num_numerical=num_numerical,
-            num_boolean=num_boolean,
-            num_categorical=num_categorical,
-            num_datetime=num_datetime,
-            missing_values=missing_values,
-            nulls=nulls_dict,
-            duplicates=duplicates,
-            dtype_fixes=dtype_fixes,
-            cleaning_actions=cleaning_actions,
-            cleaning_table=cleaning_table,
-            outlier_table=outlier_table,
-            charts=charts_data,
-            final_insights=final_insights,
-            included_sections=included_sections  # <-- always pass this
-        )
-        html_content = template.render(**context)
+        file_size = f"{os.path.getsize(cleaned_filepath)/1024/1024:.2f} MB"
+    else:
+        df = pd.DataFrame()
+        file_size = '-'
 
-        # 2. Prepare report file (HTML or PDF)
-        report_bytes = None
-        report_filename = None
-        if report_format == 'pdf':
-            try:
-                # Generate PDF using Playwright
-                with sync_playwright() as p:
-                    browser = p.chromium.launch()
-                    page = browser.new_page()
-                    page.set_content(html_content)
-                    pdf_bytes = page.pdf(format='A4', print_background=True)
-                    browser.close()
-                
-                report_bytes = pdf_bytes
-                report_filename = f"{report_title}.pdf"
-                report_mimetype = 'application/pdf'
-            except Exception as e:
-                return jsonify({'error': f'PDF generation failed: {str(e)}'}), 500
+    # Overview
+    total_rows = len(df)
+    total_columns = len(df.columns)
+    num_numerical = len([c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])])
+    num_boolean = len([c for c in df.columns if df[c].dtype == 'bool'])
+    # Text columns may be stored as str or category rather than object (see dtype_compaction)
+    num_categorical = len([
+        c for c in df.columns
+        if pd.api.types.is_object_dtype(df[c]) or pd.api.types.is_string_dtype(df[c])
+        or isinstance(df[c].dtype, pd.CategoricalDtype)
+    ])
+    num_datetime = len([c for c in df.columns if pd.api.types.is_datetime64_any_dtype(df[c])])
+
+    # Data Quality Summary
+    missing_values = f"{df.isnull().sum().sum()} ({(df.isnull().sum().sum()/(len(df)*len(df.columns))*100 if len(df)*len(df.columns) else 0):.2f}%)" if not df.empty else '0 (0.00%)'
+    nulls = df.isnull().sum()
+    nulls_dict = nulls[nulls > 0].to_dict()
+    duplicates = pool_tasks.duplicate_index(cleaned_filepath, df).count() if not df.empty else 0
+    # Dummy dtype fixes (should be provided by frontend or computed)
+    dtype_fixes = data.get('dtypeFixes', [])
+
+    # Cleaning Summary
+    cleaning_actions = data.get('cleaningActions', [])
+    cleaning_table = data.get('cleaning_table', [])
+
+    # Outlier Detection Summary
+    outlier_table = data.get('outlierTable', [])
+
+    # Charts (visualisations). PDF renders fetch stored images by URL instead of inlining them.
+    charts_data = []
+    pdf_assets = {}
+    for chart in charts:
+        image_id = chart.get('image_id')
+        image_base64 = chart.get('image_base64', '')
+        if image_id:
+            image_base64 = chart_images.get(image_id)
+            if image_base64 is None:
+                raise ExportError('A chart image is no longer available. Please export again.')
+        if image_id and report_format == 'pdf':
+            image_src = f"{ASSET_URL_PREFIX}{image_id}.png"
+            if image_src not in pdf_assets:
+                pdf_assets[image_src] = (base64.b64decode(image_base64), 'image/png')
+        else:
+            image_src = f"data:image/png;base64,{image_base64}"
+        chart_info = {
+            'title': chart.get('title', ''),
+            'type': chart.get('type', ''),
+            'columns': ', '.join(chart.get('columns', [])) if chart.get('columns') else '',
+            'insight': chart.get('insight', ''),
+            'image_base64': image_base64,
+            'image_src': image_src,
+            'filter': chart.get('filter', ''),
+            'sort': chart.get('sort', '')
+        }
+        # Add aggregation type if applicable
+        if chart.get('aggregationType') and chart.get('type') in ['bar', 'horizontalBar', 'groupedBar', 'stackedBar', 'pie', 'donut']:
+            chart_info['aggregationType'] = chart.get('aggregationType')
+        charts_data.append(chart_info)
+
+    # Date & Time of Export
+    export_datetime = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    # 1. Generate HTML report using Jinja2 template
+    progress(40, 'Rendering report')
+    template = report_env.get_template('eda_report_template.html')
+    context = dict(
+        title=report_title,
+        export_datetime=export_datetime,
+        project_name=project_name,
+        author_name=author_name,
+        total_rows=total_rows,
+        total_columns=total_columns,
+        file_size=file_size,
+        num_numerical=num_numerical,
+        num_boolean=num_boolean,
+        num_categorical=num_categorical,
+        num_datetime=num_datetime,
+        missing_values=missing_values,
+        nulls=nulls_dict,
+        duplicates=duplicates,
+        dtype_fixes=dtype_fixes,
+        cleaning_actions=cleaning_actions,
+        cleaning_table=cleaning_table,
+        outlier_table=outlier_table,
+        charts=charts_data,
+        final_insights=final_insights,
+        included_sections=included_sections  # <-- always pass this
+    )
+    html_content = template.render(**context)
+
+    # 2. Prepare report file (HTML or PDF)
+    report_bytes = None
+    report_filename = None
+    if report_format == 'pdf':
+        progress(60, 'Generating PDF')
+        try:
+            # Generate PDF with the warm Playwright pool
+            pdf_bytes = pdf_renderer.render(html_content, assets=pdf_assets)
+            report_bytes = pdf_bytes
+            report_filename = f"{report_title}.pdf"
+            report_mimetype = 'application/pdf'
+        except RendererBusy:
+            raise
+        except Exception as e:
+            raise ExportError(f'PDF generation failed: {str(e)}')
+    else:
+        report_bytes = html_content.encode('utf-8')
+        report_filename = f"{report_title}.html"
+        report_mimetype = 'text/html'
+
+    # 3. Return as a streamed ZIP if the cleaned dataset (as CSV) is requested too.
+    # A cleaned CSV is streamed from its file on disk (written once per version if stored as
+    # Parquet); other formats are encoded in row chunks.
+    if download_cleaned and not df.empty:
+        progress(80, 'Packaging cleaned dataset')
+        stem, ext = os.path.splitext(display_name(cleaned_filepath))
+        if ext.lower() == '.csv':
+            cleaned_chunks = iter_file_chunks(materialize_original(cleaned_filepath))
         else:
-            report_bytes = html_content.encode('utf-8')
-            report_filename = f"{report_title}.html"
-            report_mimetype = 'text/html'
-
-        # 3. Optionally, prepare cleaned dataset as CSV
-        cleaned_csv_bytes = None
-        cleaned_csv_filename = None
-        if download_cleaned and not df.empty:
-            buf = io.StringIO()
-            df.to_csv(buf, index=False)
-            cleaned_csv_bytes = buf.getvalue().encode('utf-8')
-            cleaned_csv_filename = os.path.basename(cleaned_filepath)
-
-        # 4. Return as ZIP if both report and CSV are requested
-        if download_cleaned and cleaned_csv_bytes:
-            zip_buf = io.BytesIO()
-            with zipfile.ZipFile(zip_buf, 'w') as zf:
-                zf.writestr(report_filename, report_bytes)
-                if cleaned_csv_filename is not None:
-                    zf.writestr(cleaned_csv_filename, cleaned_csv_bytes)
-            zip_buf.seek(0)
+            cleaned_chunks = iter_csv_chunks(df, app.config['EXPORT_CSV_CHUNK_ROWS'])
+        members = [(report_filename, report_bytes), (f"{stem}.csv", cleaned_chunks)]
+        return stream_zip(members), f"{report_title}_export.zip", 'application/zip'
+
+    return report_bytes, report_filename, report_mimetype
+
+def intern_chart_images(data):
+    """Move inline chart images into the image store so the export refers to them by ID.
+    Returns (options, missing_image_ids); raises ValueError for malformed images."""
+    data = dict(data or {})
+    charts = []
+    missing = []
+    for chart in data.get('charts', []):
+        chart = dict(chart)
+        image_base64 = chart.pop('image_base64', '')
+        if image_base64:
+            chart['image_id'] = chart_images.put(image_base64)
+        elif chart.get('image_id') and chart['image_id'] not in chart_images:
+            missing.append(chart['image_id'])
+        charts.append(chart)
+    data['charts'] = charts
+    return data, missing
+
+def missing_images_response(missing):
+    return jsonify({
+        'error': 'Some chart images are no longer stored. Please send them again.',
+        'missing_image_ids': missing
+    }), 409
+
+@app.route('/export', methods=['POST'])
+def export_report():
+    try:
+        try:
+            data, missing = intern_chart_images(request.json)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if missing:
+            return missing_images_response(missing)
+        body, download_name, mimetype = build_export(get_current_dataset(), data)
+        if isinstance(body, bytes):
             return send_file(
-                zip_buf,
-                mimetype='application/zip',
+                io.BytesIO(body),
+                mimetype=mimetype,
                 as_attachment=True,
-                download_name=f"{report_title}_export.zip"
+                download_name=download_name
             )
-
-        # 5. Otherwise, return just the report
-        return send_file(
-            io.BytesIO(report_bytes),
-            mimetype=report_mimetype,
-            as_attachment=True,
-            download_name=report_filename
-        )
-    
+        # Chunked response: the archive is built while it is being sent
+        response = app.response_class(body, mimetype=mimetype)
+        response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+        return response
+    except RendererBusy as e:
+        return jsonify({'error': str(e)}), 503
+    except ExportError as e:
+        return jsonify({'error': str(e)}), 500
     except Exception as e:
         app.logger.error(f"Export error: {traceback.format_exc()}")
         return jsonify({'error': f'Failed to generate report: {str(e)}'}), 500
 
+def export_cache_key(record, data):
+    """Identical options on the same dataset version produce the same export"""
+    version = record.version_tag if record is not None else None
+    payload = json.dumps({'version': version, 'options': data}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def remove_export_artifact(job):
+    if job.result and os.path.exists(job.result['path']):
+        os.remove(job.result['path'])
+
+@app.route('/export/jobs', methods=['POST'])
+def create_export_job():
+    """Start a background export. Identical requests reuse the finished artifact."""
+    try:
+        record = get_current_dataset()
+        if record is None:
+            return jsonify({'error': 'No uploaded file found. Please upload a dataset first.'}), 400
+        try:
+            data, missing = intern_chart_images(request.json)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if missing:
+            return missing_images_response(missing)
+
+        def check_dataset():
+            # A dataset reset or replaced meanwhile has had its folder deleted; writing the
+            # export would recreate it with files nothing cleans up
+            if dataset_registry.get(record.dataset_id) is not record:
+                raise ExportCancelled('The dataset was removed before the export finished')
+
+        def run(job):
+            check_dataset()
+            body, download_name, mimetype = build_export(record, data, job.update)
+            check_dataset()
+            export_folder = os.path.join(record.folder, 'exports')
+            try:
+                os.mkdir(export_folder)  # Not makedirs: the dataset folder must still exist
+            except FileExistsError:
+                pass
+            except FileNotFoundError:
+                raise ExportCancelled('The dataset was removed before the export finished')
+            path = os.path.join(export_folder, job.job_id)
+            with open(path, 'wb') as f:
+                for chunk in ([body] if isinstance(body, bytes) else body):
+                    f.write(chunk)
+            return {'path': path, 'download_name': download_name, 'mimetype': mimetype}
+
+        job, reused = export_jobs.submit(export_cache_key(record, data), record.dataset_id, run)
+        return jsonify(dict(job.to_dict(), cached=reused)), 202
+    except Exception as e:
+        app.logger.error(f"Export job error: {traceback.format_exc()}")
+        return jsonify({'error': f'Failed to start export: {str(e)}'}), 500
+
+def get_session_export_job(job_id):
+    """Export job by ID, only if it belongs to this session's dataset"""
+    job = export_jobs.get(job_id)
+    if job is None or job.dataset_id != session.get('dataset_id'):
+        return None
+    return job
+
+@app.route('/export/jobs/<job_id>', methods=['GET'])
+def export_job_status(job_id):
+    job = get_session_export_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Export job not found.'}), 404
+    return jsonify(job.to_dict()), 200
+
+@app.route('/export/jobs/<job_id>/download', methods=['GET'])
+def download_export_job(job_id):
+    job = get_session_export_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Export job not found.'}), 404
+    if job.status == 'failed':
+        return jsonify({'error': job.error}), 500
+    if job.status != 'done':
+        return jsonify(job.to_dict()), 409
+    if not os.path.exists(job.result['path']):
+        return jsonify({'error': 'Export file is no longer available.'}), 410
+    return send_file(
+        os.path.abspath(job.result['path']),
+        mimetype=job.result['mimetype'],
+        as_attachment=True,
+        download_name=job.result['download_name']
+    )
+
 
 @app.route('/reset', methods=['POST'])
 def reset():
+    # Delete only this session's dataset so other users keep theirs
+    dataset_id = session.get('dataset_id')
     session.clear()
-    # Optionally, delete all files in the uploads folder
-    upload_folder = app.config['UPLOAD_FOLDER']
-    for f in os.listdir(upload_folder):
-        file_path = os.path.join(upload_folder, f)
-        if os.path.isfile(file_path):
-            os.remove(file_path)
+    if dataset_id:
+        remove_dataset(dataset_id)
     return jsonify({'message': 'Session and uploads reset.'}), 200
 
 @app.route('/download-cleaned', methods=['GET'])
 def download_cleaned():
-    upload_folder = app.config['UPLOAD_FOLDER']
-    # List all files for debugging
-    print("Files in upload folder:", os.listdir(upload_folder))
-    # Find latest cleaned file (filename starts with 'cleaned_')
-    files = [os.path.join(upload_folder, f) for f in os.listdir(upload_folder)
-             if os.path.isfile(os.path.join(upload_folder, f)) and f.startswith('cleaned_')]
-    if not files:
+    # Latest cleaned version of this session's dataset
+    record = get_current_dataset()
+    if record is None or record.cleaned_path is None:
         return jsonify({'error': 'No cleaned files found.'}), 404
-    cleaned_filepath = max(files, key=os.path.getctime)
+    # Internal Parquet versions are converted to the upload's format here, once per version
+    cleaned_filepath = materialize_original(record.cleaned_path)
     # Remove all cleaned_ prefixes for download
     original_name = os.path.basename(cleaned_filepath)
     base_name = original_name
     while base_name.startswith('cleaned_'):
         base_name = base_name[len('cleaned_'):]
     download_name = f"cleaned_{base_name}"
+    # Served straight from disk in blocks by the WSGI file wrapper
     return send_file(
-        cleaned_filepath,
+        os.path.abspath(cleaned_filepath),
         as_attachment=True,
         download_name=download_name
     )
@@ -0,0 +1,13 @@
+"""Benchmarks for ingestion, profiling, cleaning, analysis and export.
+
+Run from the backend directory:
+
+    python -m benchmarks                      # default synthetic scales + bundled datasets
+    python -m benchmarks --quick              # one small scale, a smoke run
+    python -m benchmarks --scale 500000x20:numeric --only clean/
+    python -m benchmarks --save-baseline      # store this run as the baseline
+
+Each run writes machine-readable results (benchmarks/results/latest.json by
+default) and, when a baseline exists, compares against it and exits with
+status 1 on time or memory regressions.
+"""
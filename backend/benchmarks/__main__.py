@@ -0,0 +1,133 @@
+import argparse
+import glob
+import os
+import shutil
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import app as app_module  # noqa: E402
+from benchmarks import cases  # noqa: E402
+from benchmarks.measure import (MEMORY_TOLERANCE, TIME_TOLERANCE, compare, environment,  # noqa: E402
+                                format_comparison, format_results, load_results, measure, save_results)
+from benchmarks.synthetic import parse_scale  # noqa: E402
+
+DEFAULT_SCALES = ['10000x12', '100000x12', '20000x60', '100000x12:numeric']
+QUICK_SCALES = ['2000x12']
+BENCHMARKS_DIR = os.path.join(BACKEND_DIR, 'benchmarks')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Time ingestion, profiling, cleaning, analysis and export, and compare with a baseline.'
+    )
+    parser.add_argument('--scale', action='append',
+                        help="Synthetic dataset as ROWSxCOLUMNS[:MIX], MIX one of mixed, numeric, text "
+                             f"(repeatable; default {' '.join(DEFAULT_SCALES)})")
+    parser.add_argument('--quick', action='store_true',
+                        help=f"Smoke run: {' '.join(QUICK_SCALES)}, one repetition, no bundled datasets")
+    parser.add_argument('--no-bundled', action='store_true', help='Skip the datasets in --datasets-dir')
+    parser.add_argument('--datasets-dir', default=os.path.join(os.path.dirname(BACKEND_DIR), 'datasets'))
+    parser.add_argument('--only', action='append', help='Run only cases whose id contains this (repeatable)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case (default 3)')
+    parser.add_argument('--output', default=os.path.join(BENCHMARKS_DIR, 'results', 'latest.json'))
+    parser.add_argument('--baseline', default=os.path.join(BENCHMARKS_DIR, 'results', 'baseline.json'),
+                        help='Results to compare against, if the file exists')
+    parser.add_argument('--save-baseline', action='store_true', help='Also store this run as the baseline')
+    parser.add_argument('--time-tolerance', type=float, default=TIME_TOLERANCE)
+    parser.add_argument('--memory-tolerance', type=float, default=MEMORY_TOLERANCE)
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.scale = args.scale or QUICK_SCALES
+        args.repeat = 1
+        args.no_bundled = True
+    args.scale = args.scale or DEFAULT_SCALES
+    return args
+
+
+def load_datasets(args, workdir):
+    for spec in args.scale:
+        rows, columns, mix = parse_scale(spec)
+        yield lambda rows=rows, columns=columns, mix=mix: cases.synthetic_dataset(rows, columns, mix, workdir)
+    if not args.no_bundled:
+        for path in sorted(glob.glob(os.path.join(args.datasets_dir, '*'))):
+            if path.rsplit('.', 1)[-1].lower() in cases.FORMATS:
+                yield lambda path=path: cases.bundled_dataset(path)
+
+
+def selected(args, case_id, dataset):
+    return not args.only or any(part in f'{case_id}[{dataset.name}]' for part in args.only)
+
+
+def run_case(case_id, fn, dataset, repeat):
+    group, _, name = case_id.partition('/')
+    result = {
+        'id': f'{case_id}[{dataset.name}]',
+        'group': group,
+        'case': name,
+        'dataset': dataset.name,
+        'rows': len(dataset.df),
+        'columns': len(dataset.df.columns),
+        'status': 'ok'
+    }
+    try:
+        result.update(measure(fn, repeat))
+    except Exception as e:
+        result.update(status='error', error=f'{type(e).__name__}: {e}')
+    return result
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='benchmarks-')
+    # Jobs run inline so their memory is traced in this process
+    app_module.app.config['UPLOAD_FOLDER'] = os.path.join(workdir, 'uploads')
+    app_module.dataset_registry.upload_folder = app_module.app.config['UPLOAD_FOLDER']
+    app_module.worker_pool.workers = 0
+
+    results = {'meta': dict(environment(), args=vars(args)), 'results': []}
+    try:
+        for make_dataset in load_datasets(args, workdir):
+            try:
+                dataset = make_dataset()
+            except Exception as e:
+                print(f'Skipping dataset: {type(e).__name__}: {e}', file=sys.stderr)
+                continue
+            print(f'{dataset.name}: {len(dataset.df)} rows x {len(dataset.df.columns)} columns', file=sys.stderr)
+            client = app_module.app.test_client()
+            case_list = [case for case in cases.loading_cases(dataset, workdir) + cases.report_cases(dataset)
+                         + cases.cleaning_cases(dataset) + cases.endpoint_cases(dataset, client)
+                         if selected(args, case[0], dataset)]
+            if any(case_id.startswith(('api/', 'export/')) for case_id, _ in case_list) and \
+                    'api/upload' not in dict(case_list):
+                cases.upload(client, dataset)  # Requests need a dataset in the session even when upload isn't timed
+            for case_id, fn in case_list:
+                results['results'].append(run_case(case_id, fn, dataset, args.repeat))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(format_results(results))
+    save_results(results, args.output)
+    print(f'\nResults written to {args.output}')
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        rows = compare(results, load_results(args.baseline), args.time_tolerance, args.memory_tolerance)
+        if args.only:
+            rows = [row for row in rows if row['status'] != 'missing']
+        print(f'\nCompared with {args.baseline}:')
+        print(format_comparison(rows))
+        regressions = [row for row in rows if row['status'] == 'regression']
+        if regressions:
+            print(f'\n{len(regressions)} regression(s)')
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f'Baseline written to {args.baseline}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import os
+
+import pandas as pd
+
+import app as app_module
+from chunked_ingest import ingest_chunked
+from dataset_store import read_dataset, write_columnar
+from dtype_compaction import compact_dtypes
+from pool_tasks import apply_cleaning_operations
+from profiler import preview_records, profile_dataframe
+
+from benchmarks.synthetic import synthetic_frame
+
+# Workbooks are only generated up to this many cells; openpyxl writes them slowly
+XLSX_MAX_CELLS = 600000
+FORMATS = ('csv', 'json', 'xlsx', 'parquet')
+
+
+class BenchDataset:
+    """A dataset under benchmark: its frame as uploaded and a file of it per format"""
+
+    def __init__(self, name, df, files, upload_format):
+        self.name = name
+        self.df = df
+        self.files = files
+        self.upload_format = upload_format
+
+
+def synthetic_dataset(rows, columns, mix, workdir):
+    df = synthetic_frame(rows, columns, mix)
+    name = f'synthetic-{rows}x{columns}-{mix}'
+    stem = os.path.join(workdir, name)
+    files = {'csv': stem + '.csv', 'json': stem + '.json'}
+    df.to_csv(files['csv'], index=False)
+    df.to_json(files['json'], orient='records')
+    if rows * columns <= XLSX_MAX_CELLS:
+        files['xlsx'] = stem + '.xlsx'
+        df.to_excel(files['xlsx'], index=False)
+    # Stored the way ingestion stores uploads
+    files['parquet'] = write_columnar(compact_dtypes(df)[0], stem + '.csv')
+    return BenchDataset(name, df, files, 'csv')
+
+
+def bundled_dataset(path):
+    ext = path.rsplit('.', 1)[-1].lower()
+    return BenchDataset(os.path.basename(path), read_dataset(path), {ext: path}, ext)
+
+
+def loading_cases(dataset, workdir):
+    cases = [(f'load/read_dataset[{fmt}]', lambda path=path: read_dataset(path))
+             for fmt, path in dataset.files.items()]
+    for fmt in ('csv', 'json'):
+        if fmt in dataset.files:
+            dest = os.path.join(workdir, f'{dataset.name}.chunked.parquet')
+            cases.append((
+                f'load/ingest_chunked[{fmt}]',
+                lambda path=dataset.files[fmt], dest=dest: ingest_chunked(path, dest, compact=True)
+            ))
+    cases.append(('load/compact_dtypes', lambda: compact_dtypes(dataset.df)))
+    return cases
+
+
+def report_cases(dataset):
+    df = dataset.df
+
+    def suggested_dtypes():
+        return {col: app_module.get_suggested_dtype(df[col]) for col in df.columns}
+
+    def data_quality_report():
+        # Nothing cached: the cost of a first /cleaning request for a dataset version
+        return app_module.quality_report(
+            lambda: profile_dataframe(df), lambda: preview_records(df), suggested_dtypes, dataset.name
+        )
+
+    return [
+        ('report/data_quality_report', data_quality_report),
+        ('report/profile_dataframe', lambda: profile_dataframe(df)),
+        ('report/get_suggested_dtype', suggested_dtypes),
+        ('report/sampled_quality_report', lambda: app_module.sampled_quality_report(
+            df, dataset.name, app_module.app.config['QUALITY_SAMPLE_ROWS']
+        )),
+    ]
+
+
+def cleaning_configs(df):
+    """One cleaning configuration per rule type, plus all of them together"""
+    numeric = [col for col in df.columns
+               if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])]
+    with_nulls = [col for col in df.columns if df[col].isna().any()]
+    numeric_nulls = [col for col in with_nulls if col in numeric]
+
+    def fill(columns, method):
+        return {col: {'action': 'fill', 'fillMethod': method, 'fillValue': '0'} for col in columns}
+
+    configs = {
+        'duplicates': {'duplicates': 'delete'},
+        'nulls_mean': {'nulls': fill(numeric_nulls, 'mean')},
+        'nulls_median': {'nulls': fill(numeric_nulls, 'median')},
+        'nulls_mode': {'nulls': fill(with_nulls, 'mode')},
+        'nulls_specific': {'nulls': fill(with_nulls, 'specific')},
+        'nulls_forward': {'nulls': fill(with_nulls, 'forward')},
+        'nulls_delete_row': {'nulls': {col: {'action': 'delete_row'} for col in with_nulls}},
+        'dtype_convert': {'dataTypes': {col: 'convert' for col in df.columns}},
+    }
+    for method in ('iqr', 'zscore', 'winsorizing'):
+        for action in ('remove', 'cap'):
+            configs[f'outliers_{method}_{action}'] = {
+                'outliers': {col: {'method': method, 'action': action} for col in numeric}
+            }
+    configs['all_rules'] = {
+        'duplicates': 'delete',
+        'nulls': dict(fill(with_nulls, 'mode'), **fill(numeric_nulls, 'median')),
+        'dataTypes': {col: 'convert' for col in df.columns},
+        'outliers': {col: {'method': 'iqr', 'action': 'cap'} for col in numeric}
+    }
+    return configs
+
+
+def cleaning_cases(dataset):
+    return [
+        (f'clean/apply_cleaning_operations[{rule}]',
+         lambda config=config: apply_cleaning_operations(dataset.df, config))
+        for rule, config in cleaning_configs(dataset.df).items()
+    ]
+
+
+def _request(client, method, url, **kwargs):
+    response = client.open(url, method=method, **kwargs)
+    body = response.get_data()  # Consumes streamed responses
+    if response.status_code != 200:
+        message = response.get_json(silent=True) or {}
+        raise RuntimeError(f"{method} {url} returned {response.status_code}: {message.get('error', '')}")
+    return body
+
+
+def upload(client, dataset):
+    path = dataset.files[dataset.upload_format]
+    with open(path, 'rb') as f:
+        return _request(client, 'POST', '/upload', data={'dataset': (f, os.path.basename(path))},
+                        content_type='multipart/form-data')
+
+
+def _forget_report(client):
+    """Drop the session dataset's cached report so /cleaning computes it again"""
+    with client.session_transaction() as session:
+        dataset_id = session.get('dataset_id')
+    for name in ('quality_report', 'quality_profile', 'dtype_inference'):
+        app_module.dataset_registry.pop_artifact(dataset_id, name)
+
+
+def endpoint_cases(dataset, client):
+    """Requests through the Flask app, run in order on one session. /cleaning is timed
+    without a cached report but with the dataset already parsed, and /analysis with the
+    dataset cached, so it measures serialization."""
+    def cleaning():
+        _forget_report(client)
+        _request(client, 'GET', '/cleaning')
+
+    def clean():
+        _request(client, 'POST', '/clean-data', json=cleaning_configs(dataset.df)['all_rules'])
+
+    def export(report_format, download_cleaned=False):
+        return lambda: _request(client, 'POST', '/export', json={
+            'reportTitle': 'Benchmark',
+            'reportFormat': report_format,
+            'downloadCleaned': download_cleaned
+        })
+
+    return [
+        ('api/upload', lambda: upload(client, dataset)),
+        ('api/cleaning', cleaning),
+        ('api/clean-data', clean),
+        ('api/analysis', lambda: _request(client, 'GET', '/analysis')),
+        ('api/analysis-data', lambda: _request(client, 'GET', '/analysis/data?limit=100000')),
+        ('export/export_report[html]', export('html')),
+        ('export/export_report[zip]', export('html', download_cleaned=True)),
+        ('export/export_report[pdf]', export('pdf')),
+    ]
@@ -0,0 +1,135 @@
+import gc
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# A case is a regression when it is this much slower (or bigger) than the baseline...
+TIME_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.25
+# ...and the difference is at least this large, so timer noise on tiny cases doesn't count
+MIN_TIME_DELTA = 0.005  # Seconds
+MIN_MEMORY_DELTA = 1024 * 1024  # Bytes
+
+
+def measure(fn, repeat=3):
+    """Time fn() `repeat` times, then run it once more under tracemalloc for its peak memory.
+
+    Memory is traced in a separate run so tracing overhead doesn't skew the
+    timings. The peak counts Python and NumPy/pandas allocations made during
+    the call; memory allocated by Arrow's own pool isn't traced.
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'wall_time_s': {'min': min(times), 'median': statistics.median(times), 'max': max(times)},
+        'peak_memory_bytes': peak
+    }
+
+
+def environment():
+    try:
+        import pyarrow
+        pyarrow_version = pyarrow.__version__
+    except ImportError:
+        pyarrow_version = None
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'pyarrow': pyarrow_version,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def save_results(results, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _ratio(current, base):
+    return current / base if base else None
+
+
+def compare(results, baseline, time_tolerance=TIME_TOLERANCE, memory_tolerance=MEMORY_TOLERANCE):
+    """Compare two result sets case by case (by id).
+    Returns [{'id', 'time_ratio', 'memory_ratio', 'regressions': [...], 'status'}], where
+    status is 'regression', 'improvement', 'ok', 'new' or 'missing'."""
+    base_cases = {case['id']: case for case in baseline['results']}
+    rows = []
+    for case in results['results']:
+        base = base_cases.pop(case['id'], None)
+        if base is None or base.get('status') != 'ok' or case.get('status') != 'ok':
+            rows.append({'id': case['id'], 'status': 'new' if base is None else case.get('status', 'ok')})
+            continue
+        current_time, base_time = case['wall_time_s']['median'], base['wall_time_s']['median']
+        current_memory, base_memory = case['peak_memory_bytes'], base['peak_memory_bytes']
+        regressions = []
+        if current_time > base_time * (1 + time_tolerance) and current_time - base_time >= MIN_TIME_DELTA:
+            regressions.append('time')
+        if (current_memory > base_memory * (1 + memory_tolerance)
+                and current_memory - base_memory >= MIN_MEMORY_DELTA):
+            regressions.append('memory')
+        improved = current_time < base_time / (1 + time_tolerance) and base_time - current_time >= MIN_TIME_DELTA
+        rows.append({
+            'id': case['id'],
+            'time_ratio': _ratio(current_time, base_time),
+            'memory_ratio': _ratio(current_memory, base_memory),
+            'regressions': regressions,
+            'status': 'regression' if regressions else 'improvement' if improved else 'ok'
+        })
+    rows.extend({'id': case_id, 'status': 'missing'} for case_id in base_cases)
+    return rows
+
+
+def _format_bytes(n):
+    return f'{n / 1024 / 1024:.1f} MB'
+
+
+def format_results(results):
+    lines = [f"{'case':<84} {'median':>10} {'min':>10} {'peak mem':>10}"]
+    for case in results['results']:
+        if case['status'] != 'ok':
+            lines.append(f"{case['id']:<84} {case['status']}: {case.get('error', '')}"[:160])
+            continue
+        times = case['wall_time_s']
+        lines.append(
+            f"{case['id']:<84} {times['median'] * 1000:>8.1f}ms {times['min'] * 1000:>8.1f}ms "
+            f"{_format_bytes(case['peak_memory_bytes']):>10}"
+        )
+    return '\n'.join(lines)
+
+
+def format_comparison(rows):
+    lines = [f"{'case':<84} {'time':>8} {'memory':>8}  status"]
+    for row in rows:
+        time_ratio = f"{row['time_ratio']:.2f}x" if row.get('time_ratio') is not None else '-'
+        memory_ratio = f"{row['memory_ratio']:.2f}x" if row.get('memory_ratio') is not None else '-'
+        status = row['status'] + (f" ({', '.join(row['regressions'])})" if row.get('regressions') else '')
+        lines.append(f"{row['id']:<84} {time_ratio:>8} {memory_ratio:>8}  {status}")
+    return '\n'.join(lines)
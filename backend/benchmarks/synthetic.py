@@ -0,0 +1,79 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+# Share of columns of each kind; the kinds cycle in this order so every mix is reproducible
+DTYPE_MIXES = {
+    'mixed': {'int': 2, 'float': 3, 'category': 2, 'text': 1, 'date': 1, 'bool': 1, 'numstr': 1},
+    'numeric': {'int': 1, 'float': 2},
+    'text': {'category': 2, 'text': 2, 'date': 1, 'bool': 1},
+}
+NULL_FRACTION = 0.05
+DUPLICATE_FRACTION = 0.02
+OUTLIER_FRACTION = 0.01
+
+CATEGORIES = ['north', 'south', 'east', 'west', 'central', 'online', 'wholesale', 'export']
+
+
+def column_kinds(columns, mix='mixed'):
+    """Kind of each of `columns` columns, spread over the mix in proportion"""
+    weights = DTYPE_MIXES[mix]
+    pattern = [kind for kind, weight in weights.items() for _ in range(weight)]
+    return [pattern[i % len(pattern)] for i in range(columns)]
+
+
+def _with_nulls(values, rng):
+    values = pd.Series(values)
+    return values.mask(rng.random(len(values)) < NULL_FRACTION)
+
+
+def _column(kind, rows, rng):
+    if kind == 'int':
+        return pd.Series(rng.integers(0, 10000, rows))
+    if kind == 'float':
+        values = rng.normal(100.0, 15.0, rows)
+        outliers = rng.random(rows) < OUTLIER_FRACTION
+        values[outliers] *= rng.choice([-5.0, 8.0], outliers.sum())
+        return _with_nulls(values, rng)
+    if kind == 'category':
+        return _with_nulls(rng.choice(CATEGORIES, rows), rng)
+    if kind == 'text':
+        return pd.Series([f'item-{n:08d}' for n in rng.integers(0, rows * 10, rows)])
+    if kind == 'date':
+        days = rng.integers(0, 3650, rows)
+        return _with_nulls((pd.Timestamp('2015-01-01') + pd.to_timedelta(days, unit='D')).strftime('%Y-%m-%d'), rng)
+    if kind == 'bool':
+        return pd.Series(rng.choice(['yes', 'no'], rows))
+    if kind == 'numstr':
+        return _with_nulls(np.round(rng.uniform(0, 500, rows), 2).astype(str), rng)
+    raise ValueError(f'Unknown column kind: {kind}')
+
+
+def synthetic_frame(rows, columns, mix='mixed', seed=0):
+    """A frame of rows x columns with the given dtype mix, as it would come out of read_csv.
+
+    Columns have missing values, float columns a share of outliers, and a
+    share of the rows repeat earlier ones, so every report section and
+    cleaning rule has work to do. The same arguments give the same frame.
+    """
+    rng = np.random.default_rng(seed)
+    data = {f'{kind}_{i}': _column(kind, rows, rng) for i, kind in enumerate(column_kinds(columns, mix))}
+    df = pd.DataFrame(data)
+    duplicates = int(rows * DUPLICATE_FRACTION)
+    if duplicates:
+        targets = rng.choice(rows, duplicates, replace=False)
+        sources = rng.choice(rows, duplicates)
+        df.iloc[targets] = df.iloc[sources].to_numpy()
+    # Round-trip through CSV so dtypes match what an upload of this data would get
+    return pd.read_csv(io.StringIO(df.to_csv(index=False)))
+
+
+def parse_scale(spec):
+    """'100000x12' or '100000x12:numeric' -> (rows, columns, mix)"""
+    size, _, mix = spec.partition(':')
+    rows, _, columns = size.lower().partition('x')
+    mix = mix or 'mixed'
+    if mix not in DTYPE_MIXES:
+        raise ValueError(f"Unknown dtype mix '{mix}' (expected one of {', '.join(DTYPE_MIXES)})")
+    return int(rows), int(columns), mix
@@ -0,0 +1,90 @@
+import base64
+import binascii
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Base URL that PDF renders use to fetch stored chart images instead of inline data URIs
+ASSET_URL_PREFIX = 'http://report-assets.local/'
+
+
+def image_id_for(image_base64):
+    """Content hash that identifies a chart image (sha256 of its base64 text)"""
+    return hashlib.sha256(image_base64.encode('ascii')).hexdigest()
+
+
+def strip_data_uri(image_base64):
+    """Drop a leading 'data:image/png;base64,' if the client sent a full data URI"""
+    if image_base64.startswith('data:') and ',' in image_base64:
+        return image_base64.split(',', 1)[1]
+    return image_base64
+
+
+class ChartImageStore:
+    """In-process LRU store of chart images keyed by content hash.
+
+    Clients upload a chart image once and refer to it by its ID in later
+    exports. Images are kept as base64 text, which is what the HTML report
+    embeds; PDF renders fetch the decoded bytes by URL instead.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._images = OrderedDict()  # image_id -> base64 text
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def put(self, image_base64):
+        """Store an image and return its ID. Raises ValueError if it isn't valid base64."""
+        image_base64 = strip_data_uri(image_base64)
+        image_id = image_id_for(image_base64)
+        with self._lock:
+            if image_id in self._images:
+                self._images.move_to_end(image_id)
+                return image_id
+        try:
+            base64.b64decode(image_base64, validate=True)
+        except (binascii.Error, ValueError):
+            raise ValueError('Chart image is not valid base64')
+        with self._lock:
+            if image_id not in self._images:
+                self._images[image_id] = image_base64
+                self.current_bytes += len(image_base64)
+                self._evict()
+        return image_id
+
+    def get(self, image_id):
+        """Base64 text of a stored image, or None"""
+        with self._lock:
+            image_base64 = self._images.get(image_id)
+            if image_base64 is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(image_id)
+            self.hits += 1
+            return image_base64
+
+    def __contains__(self, image_id):
+        with self._lock:
+            return image_id in self._images
+
+    def stats(self):
+        with self._lock:
+            return {
+                'images': len(self._images),
+                'current_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+    def _evict(self):
+        # Always keep the most recent image, even if it alone exceeds the budget
+        while self.current_bytes > self.max_bytes and len(self._images) > 1:
+            _, image_base64 = self._images.popitem(last=False)
+            self.current_bytes -= len(image_base64)
+            self.evictions += 1
@@ -0,0 +1,258 @@
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from dataset_store import read_columnar
+from dtype_compaction import STRING_DTYPE, DtypeScan, compaction_summary
+from duplicate_index import combine_hashes, hash_column
+from profiler import _scalar, _to_python, json_records, numeric_profile, outlier_bounds, outlier_masks
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Chunked ingestion writes Parquet, so it needs pyarrow
+    pa = None
+    pq = None
+
+INGEST_CHUNK_ROWS = 100000
+JSON_READ_CHARS = 1024 * 1024
+PREVIEW_ROWS = 5
+
+
+def iter_json_items(path, read_chars=JSON_READ_CHARS):
+    """Yield the source text of each item of a top-level JSON array, reading the file in blocks"""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        buf, pos, eof, in_array = '', 0, False, False
+        while True:
+            # Skip whitespace (and separators once inside the array)
+            while pos < len(buf) and (buf[pos] in ' \t\r\n' or (in_array and buf[pos] == ',')):
+                pos += 1
+            if pos == len(buf):
+                if eof:
+                    raise ValueError('Unexpected end of JSON data')
+                buf, pos = f.read(read_chars), 0
+                eof = not buf
+                continue
+            if not in_array:
+                if buf[pos] != '[':
+                    raise ValueError('Expected a JSON array of records')
+                in_array = True
+                pos += 1
+                continue
+            if buf[pos] == ']':
+                return
+            try:
+                _, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Probably cut off at the end of the buffer: read more and retry
+                if eof:
+                    raise ValueError('Malformed JSON data')
+                more = f.read(read_chars)
+                eof = not more
+                buf, pos = buf[pos:] + more, 0
+                continue
+            yield buf[pos:end]
+            pos = end
+
+
+def _read_json_batch(items, columns):
+    # read_json on each batch applies the same type coercion as reading the whole file
+    chunk = pd.read_json(io.StringIO('[' + ','.join(items) + ']'), orient='records')
+    return chunk if columns is None else chunk.reindex(columns=columns)
+
+
+def _json_chunks(path, chunk_rows, columns=None):
+    batch = []
+    for item in iter_json_items(path):
+        batch.append(item)
+        if len(batch) >= chunk_rows:
+            yield _read_json_batch(batch, columns)
+            batch = []
+    if batch:
+        yield _read_json_batch(batch, columns)
+
+
+def _common_dtype(dtypes):
+    """The dtype a full read would most likely have given a column seen with these chunk dtypes"""
+    if len(dtypes) == 1:
+        return next(iter(dtypes))
+    if all(pd.api.types.is_numeric_dtype(d) and not pd.api.types.is_bool_dtype(d) for d in dtypes):
+        return np.dtype('float64')
+    return STRING_DTYPE
+
+
+class _ChunkReader:
+    """Reads a CSV or JSON-records file as DataFrame chunks with one consistent set of dtypes.
+
+    A first pass parses every chunk only to learn each column's dtypes;
+    columns whose dtype differs between chunks get a common one (float64
+    for mixed numbers, str otherwise). The second pass yields chunks parsed
+    or cast with those dtypes, so they can be appended to one Parquet file.
+    With compact, the first pass also works out compact dtypes for the
+    columns (see DtypeScan) in compact_dtypes.
+    """
+
+    def __init__(self, path, chunk_rows, compact=False):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.compact = compact
+        self.ext = path.rsplit('.', 1)[-1].lower()
+        self.encoding = 'utf-8-sig'
+        self.columns = None
+        self.dtypes = None
+        self.compact_dtypes = {}
+
+    def _raw_chunks(self, dtype=None):
+        if self.ext == 'csv':
+            return pd.read_csv(self.path, chunksize=self.chunk_rows, encoding=self.encoding, dtype=dtype)
+        return _json_chunks(self.path, self.chunk_rows, columns=self.columns)
+
+    def _scan(self):
+        seen = {}
+        dtype_scan = DtypeScan() if self.compact else None
+        for chunk in self._raw_chunks():
+            for col in chunk.columns:
+                seen.setdefault(col, set()).add(chunk[col].dtype)
+            if dtype_scan is not None:
+                dtype_scan.observe(chunk)
+        self.columns = list(seen)
+        self.dtypes = {col: _common_dtype(dtypes) for col, dtypes in seen.items()}
+        if dtype_scan is not None:
+            self.compact_dtypes = dtype_scan.dtypes()
+
+    def scan(self):
+        try:
+            self._scan()
+        except UnicodeDecodeError:
+            if self.ext != 'csv':
+                raise
+            self.encoding = 'latin1'
+            self._scan()
+
+    def chunks(self):
+        if self.ext == 'csv':
+            yield from self._raw_chunks(dtype=self.dtypes)
+            return
+        for chunk in self._raw_chunks():
+            changed = {col: dtype for col, dtype in self.dtypes.items() if chunk[col].dtype != dtype}
+            yield chunk.astype(changed) if changed else chunk
+
+
+def _memory_bytes(chunk):
+    """Deep memory usage of a chunk, counting categorical columns without their categories"""
+    usage = chunk.memory_usage(deep=True, index=False)
+    for col in chunk.columns:
+        if isinstance(chunk[col].dtype, pd.CategoricalDtype):
+            usage[col] = chunk[col].array.codes.nbytes
+    return int(usage.sum())
+
+
+def ingest_chunked(src_path, dest_path, chunk_rows=INGEST_CHUNK_ROWS, compact=False):
+    """Convert a CSV or JSON-records file to Parquet one chunk at a time.
+
+    With compact, columns are stored with compact dtypes (see DtypeScan) and
+    the result has a 'compaction' summary with the memory saved.
+    Returns {'profile': ..., 'preview': ..., 'columns': ...}. The profile matches
+    profiler.profile_dataframe's. Row, null, memory and duplicate counts are
+    accumulated per chunk; duplicates are found from one 64-bit hash per row.
+    Numeric statistics and outlier counts are computed afterwards from the
+    Parquet file, one column at a time. Peak memory is about one chunk or
+    one column, whichever is larger.
+    """
+    reader = _ChunkReader(src_path, chunk_rows, compact)
+    reader.scan()
+
+    rows = 0
+    memory_bytes = 0
+    loaded_bytes = 0  # Before compaction
+    null_counts = pd.Series(0, index=reader.columns, dtype=np.int64)
+    row_hashes = []
+    preview = None
+    schema = None
+    writer = None
+    try:
+        for chunk in reader.chunks():
+            if reader.compact_dtypes:
+                loaded_bytes += int(chunk.memory_usage(deep=True, index=False).sum())
+                chunk = chunk.astype(reader.compact_dtypes)
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                writer = pq.ParquetWriter(dest_path, schema)
+            writer.write_table(table)
+
+            rows += len(chunk)
+            memory_bytes += _memory_bytes(chunk)
+            null_counts += chunk.isna().sum()
+            # Hashed like DuplicateIndex does, so the count matches the one reported after a full read
+            row_hashes.append(combine_hashes([hash_column(chunk[col]) for col in chunk.columns], len(chunk)))
+            if preview is None:
+                preview = json_records(chunk.head(PREVIEW_ROWS))
+    except Exception:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+    if writer is None:
+        raise ValueError('The file contains no rows')
+    writer.close()
+    # Every chunk of a categorical column shares its categories, so they are counted once
+    memory_bytes += sum(
+        int(dtype.categories.memory_usage(deep=True))
+        for dtype in reader.compact_dtypes.values() if isinstance(dtype, pd.CategoricalDtype)
+    )
+
+    hashes = np.concatenate(row_hashes)
+    del row_hashes
+    numeric_columns = [
+        col for col in reader.columns
+        if pd.api.types.is_numeric_dtype(reader.dtypes[col]) and not pd.api.types.is_bool_dtype(reader.dtypes[col])
+    ]
+    profile = {
+        'rows': rows,
+        'columns': len(reader.columns),
+        'memory_bytes': memory_bytes,
+        'null_counts': {col: int(n) for col, n in null_counts.items() if n > 0},
+        'total_nulls': int(null_counts.sum()),
+        'duplicates': int(pd.Series(hashes, copy=False).duplicated().sum()),
+        'numeric_columns': numeric_columns,
+        'statistical_summary': {},
+        'outliers': {}
+    }
+    _profile_numeric_columns(dest_path, numeric_columns, profile)
+    result = {'profile': profile, 'preview': preview, 'columns': reader.columns}
+    if compact:
+        result['compaction'] = compaction_summary(
+            loaded_bytes if reader.compact_dtypes else memory_bytes,
+            memory_bytes,
+            {col: (reader.dtypes[col], dtype) for col, dtype in reader.compact_dtypes.items()}
+        )
+    return result
+
+
+def _profile_numeric_columns(path, columns, profile):
+    """Fill statistical_summary and outliers from the Parquet file, reading one column at a time"""
+    summary = {name: {} for name in ('mean', 'std', 'min', 'max', 'median')}
+    for col in columns:
+        block = read_columnar(path, [col])[col].to_numpy(dtype=np.float64, na_value=np.nan).reshape(-1, 1)
+        stats = numeric_profile(block)
+        for name, values in (('mean', stats['mean']), ('std', stats['std']), ('min', stats['min']),
+                             ('max', stats['max']), ('median', stats['quantiles'][0.5])):
+            summary[name][col] = _to_python(values)[0]
+        masks = outlier_masks(block, stats)
+        bounds = outlier_bounds(stats)
+        profile['outliers'][col] = {
+            method: {
+                'count': int(masks[method].sum()),
+                'lower': _scalar(bounds[method][0][0]),
+                'upper': _scalar(bounds[method][1][0])
+            }
+            for method in masks
+        }
+    if columns:
+        profile['statistical_summary'] = summary
@@ -0,0 +1,225 @@
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from duplicate_index import DuplicateIndex
+
+FILL_STATISTICS = ('mean', 'median', 'mode')
+
+
+class CleaningPlan:
+    """A cleaning configuration compiled into one pass over the data.
+
+    Steps run in the same order as the configuration, but instead of
+    materializing a filtered DataFrame after every row removal they narrow a
+    single boolean `keep` mask. Statistics (fill values, outlier bounds) are
+    computed on the rows kept so far, so the result matches applying the
+    steps one by one. Fills and clips are collected and applied in one call
+    per dtype group, and rows and dropped columns are taken out once at the
+    end. The input frame is never modified.
+
+    After execute(), kept_rows is the boolean mask of input rows kept and
+    changed_columns the columns whose values were replaced, which lets
+    callers carry per-row work (like row hashes) over to the output.
+    """
+
+    def __init__(self, config):
+        self.drop_duplicates = config.get('duplicates') == 'delete'
+        self.null_steps = [
+            (column, spec.get('action'), spec.get('fillMethod', 'specific'), spec.get('fillValue', ''))
+            for column, spec in config.get('nulls', {}).items()
+        ]
+        self.conversions = [
+            column for column, action in config.get('dataTypes', {}).items() if action == 'convert'
+        ]
+        self.outlier_steps = [
+            (column, spec.get('method', 'none'), spec.get('action', 'none'))
+            for column, spec in config.get('outliers', {}).items()
+            if spec.get('method', 'none') != 'none' and spec.get('action', 'none') != 'none'
+        ]
+
+    def execute(self, df, suggest_dtype, duplicate_index=None):
+        """Return the cleaned frame.
+        suggest_dtype(series, unchanged) returns 'numeric', 'datetime' or another verdict;
+        unchanged is True when the series is identical to the input column.
+        duplicate_index is the input's DuplicateIndex, if one is already cached."""
+        state = _PlanState(df)
+
+        if self.drop_duplicates:
+            state.keep &= ~(duplicate_index or DuplicateIndex(df)).duplicated()
+
+        self._run_null_steps(state)
+        self._run_conversions(state, suggest_dtype)
+        self._run_outlier_steps(state)
+        self.kept_rows = state.keep
+        self.changed_columns = set(state.replacements)
+        return state.materialize()
+
+    def _run_null_steps(self, state):
+        fills = {}
+        for column, action, fill_method, fill_value in self.null_steps:
+            if not state.has(column):
+                continue
+            if action == 'delete_row':
+                state.keep &= state.get(column).notna().to_numpy()
+            elif action == 'delete_column':
+                state.dropped.add(column)
+            elif action == 'fill':
+                values = state.get(column)
+                if fill_method == 'specific':
+                    if isinstance(values.dtype, pd.CategoricalDtype) and fill_value not in values.cat.categories:
+                        # Categorical columns only take known values, so the fill value becomes a category
+                        state.replace(column, values.cat.add_categories([fill_value]))
+                    fills[column] = fill_value
+                elif fill_method in FILL_STATISTICS:
+                    kept = state.kept(values)
+                    if fill_method == 'mean':
+                        fills[column] = kept.mean()
+                    elif fill_method == 'median':
+                        fills[column] = kept.median()
+                    else:
+                        mode_val = kept.mode()
+                        fills[column] = mode_val.iloc[0] if not mode_val.empty else fill_value
+                elif fill_method in ('forward', 'backward'):
+                    # Values only propagate between kept rows
+                    kept = state.kept(values)
+                    state.replace_kept(column, kept.ffill() if fill_method == 'forward' else kept.bfill())
+        # Each column appears once in the null config, so fills can wait until the end of the phase
+        state.apply_grouped(fills, lambda frame, values: frame.fillna(value=values))
+
+    def _run_conversions(self, state, suggest_dtype):
+        for column in self.conversions:
+            if not state.has(column):
+                continue
+            values = state.kept(state.get(column))
+            unchanged = state.all_kept() and column not in state.replacements
+            suggested_type = suggest_dtype(values, unchanged)
+            try:
+                if suggested_type == 'numeric':
+                    state.replace_kept(column, _plain(pd.to_numeric(values, errors='coerce')))
+                elif suggested_type == 'datetime':
+                    state.replace_kept(column, _plain(pd.to_datetime(values, errors='coerce')))
+            except Exception:
+                pass  # Keep original type if conversion fails
+
+    def _run_outlier_steps(self, state):
+        clips = {}
+        for column, method, action in self.outlier_steps:
+            if not state.has(column) or not pd.api.types.is_numeric_dtype(state.get(column)):
+                continue
+            values = state.get(column)
+            bounds = _outlier_bounds(state.kept(values), method)
+            if bounds is None:
+                continue
+            low, high = bounds
+            if action == 'remove':
+                inside = (values >= low) & (values <= high)
+                state.keep &= inside.to_numpy(dtype=bool, na_value=False)
+            elif action == 'cap':
+                clips[column] = (low, high)
+        state.apply_grouped(
+            clips,
+            lambda frame, limits: frame.clip(
+                lower=pd.Series({col: lo for col, (lo, _) in limits.items()}),
+                upper=pd.Series({col: hi for col, (_, hi) in limits.items()}),
+                axis=1
+            )
+        )
+
+
+def _plain(converted):
+    """Categorical columns are converted category by category; return the converted values
+    as an ordinary column of the new type"""
+    if isinstance(converted.dtype, pd.CategoricalDtype):
+        return converted.astype(converted.cat.categories.dtype)
+    return converted
+
+
+def _outlier_bounds(col_data, method):
+    """(low, high) bounds of the non-outlier range, or None when the method doesn't apply"""
+    if method == 'winsorizing':
+        q05, q95 = col_data.quantile([0.05, 0.95])
+        return q05, q95
+    if method == 'iqr':
+        q1, q3 = col_data.quantile([0.25, 0.75])
+        iqr = q3 - q1
+        return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    if method == 'zscore':
+        mean = col_data.mean()
+        std = col_data.std()
+        return (mean - 3 * std, mean + 3 * std) if std > 0 else None
+    return None
+
+
+class _PlanState:
+    """Working state of a plan: the input frame, replaced columns and the row mask"""
+
+    def __init__(self, df):
+        self.df = df
+        self.keep = np.ones(len(df), dtype=bool)
+        self.dropped = set()
+        self.replacements = {}
+
+    def has(self, column):
+        return column in self.df.columns and column not in self.dropped
+
+    def get(self, column):
+        return self.replacements[column] if column in self.replacements else self.df[column]
+
+    def replace(self, column, values):
+        self.replacements[column] = values
+
+    def all_kept(self):
+        return bool(self.keep.all())
+
+    def kept(self, values):
+        return values if self.all_kept() else values[self.keep]
+
+    def replace_kept(self, column, values):
+        """Replace a column with values computed from its kept rows only. Operating on removed
+        rows too could change the result's dtype (a NaN there turns integers into floats, a
+        clipped value there makes a float), so the removed rows are filled in afterwards with
+        a copy of a kept value; they never reach the output."""
+        if self.all_kept():
+            self.replace(column, values)
+        elif not self.keep.any():
+            # Nothing to copy; placeholders of the same dtype
+            if isinstance(values.dtype, np.dtype):
+                placeholders = np.empty(len(self.keep), dtype=values.dtype)
+            else:
+                placeholders = pd.array([None] * len(self.keep), dtype=values.dtype)
+            self.replace(column, pd.Series(placeholders, index=self.df.index, name=column))
+        else:
+            # Each row takes the nearest kept row at or before it (the first kept row if none)
+            source = np.maximum(np.cumsum(self.keep) - 1, 0)
+            self.replace(column, pd.Series(values.array.take(source), index=self.df.index,
+                                           dtype=values.dtype, name=column))
+
+    def apply_grouped(self, per_column, operation):
+        """Run operation(frame, {column: arg}) on the kept rows, once per dtype group of the given columns"""
+        groups = defaultdict(dict)
+        for column, arg in per_column.items():
+            groups[self.get(column).dtype][column] = arg
+        for args in groups.values():
+            frame = pd.DataFrame({column: self.kept(self.get(column)) for column in args})
+            result = operation(frame, args)
+            for column in args:
+                self.replace_kept(column, result[column])
+
+    def materialize(self):
+        """Build the output frame with one row/column selection"""
+        columns = [col for col in self.df.columns if col not in self.dropped]
+        untouched = [col for col in columns if col not in self.replacements]
+        if self.all_kept():
+            out = self.df.copy(deep=False) if len(untouched) == len(self.df.columns) else self.df[untouched]
+        else:
+            out = self.df.loc[self.keep, untouched]
+        for position, column in enumerate(columns):
+            if column in self.replacements:
+                values = self.replacements[column]
+                # Insert positionally with the dtype spelled out: a bare object array would be
+                # inferred as strings on pandas 3
+                values = values.array if self.all_kept() else values.array[self.keep]
+                out.insert(position, column, pd.Series(values, index=out.index, dtype=values.dtype, copy=False))
+        return out
@@ -0,0 +1,94 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+class DatasetCache:
+    """In-process LRU cache of parsed DataFrames keyed by file path, mtime and size.
+
+    Cached frames are shared between requests, so callers must treat them as
+    read-only and take a copy before mutating.
+    """
+
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (df, nbytes)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(filepath):
+        stat = os.stat(filepath)
+        return (os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
+
+    def get(self, filepath, loader):
+        """Return the parsed DataFrame for filepath, calling loader(filepath) on a miss"""
+        key = self._key(filepath)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Parse outside the lock so slow files don't block other sessions
+        df = loader(filepath)
+        nbytes = int(df.memory_usage(deep=True).sum())
+
+        with self._lock:
+            # Drop stale versions of the same file before inserting the new one
+            self._discard_path(key[0])
+            self._entries[key] = (df, nbytes)
+            self.current_bytes += nbytes
+            self._evict()
+        return df
+
+    def peek(self, filepath):
+        """Cached DataFrame for the file's current version, or None; never loads"""
+        key = self._key(filepath)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def invalidate(self, filepath):
+        """Drop every cached version of filepath"""
+        with self._lock:
+            self._discard_path(os.path.abspath(filepath))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'current_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _discard_path(self, abspath):
+        for key in [k for k in self._entries if k[0] == abspath]:
+            _, nbytes = self._entries.pop(key)
+            self.current_bytes -= nbytes
+
+    def _evict(self):
+        # Always keep the most recent entry, even if it alone exceeds the budget
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.current_bytes -= nbytes
+            self.evictions += 1
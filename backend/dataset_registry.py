@@ -0,0 +1,178 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class DatasetRecord:
+    """Files and cached artifacts belonging to one uploaded dataset"""
+
+    def __init__(self, dataset_id, filename, folder):
+        self.dataset_id = dataset_id
+        self.filename = filename
+        self.folder = folder
+        self.raw_path = os.path.join(folder, filename)
+        self.cleaned_paths = []
+        self.artifacts = {}  # (version, name) -> value
+        self.created_at = time.time()
+        self.last_used = self.created_at
+
+    @property
+    def version(self):
+        """0 for the raw upload, incremented for every cleaned version"""
+        return len(self.cleaned_paths)
+
+    @property
+    def version_tag(self):
+        return f"{self.dataset_id}-v{self.version}"
+
+    @property
+    def cleaned_path(self):
+        return self.cleaned_paths[-1] if self.cleaned_paths else None
+
+    @property
+    def current_path(self):
+        """Latest cleaned file if one exists, otherwise the raw upload"""
+        return self.cleaned_path or self.raw_path
+
+    @property
+    def all_paths(self):
+        return [self.raw_path] + self.cleaned_paths
+
+    def to_dict(self):
+        return {
+            'dataset_id': self.dataset_id,
+            'filename': self.filename,
+            'version': self.version,
+            'raw_path': self.raw_path,
+            'cleaned_paths': list(self.cleaned_paths),
+            'artifacts': sorted({name for _, name in self.artifacts})
+        }
+
+
+class DatasetRegistry:
+    """In-memory index from dataset ID to its files, so requests never scan the uploads folder.
+
+    Each dataset gets its own subdirectory, which keeps concurrent sessions
+    that upload files with the same name from overwriting each other.
+    Abandoned sessions never reset their dataset, so records are evicted
+    with their folder once unused for `max_idle_seconds`, and the least
+    recently used go when there are more than `max_datasets`. Every
+    record removed, evicted or not, is passed to `on_remove(record)`
+    before its folder is deleted, so work on it can be stopped.
+    """
+
+    def __init__(self, upload_folder, max_datasets=None, max_idle_seconds=None, on_remove=None):
+        self.upload_folder = upload_folder
+        self.max_datasets = max_datasets
+        self.max_idle_seconds = max_idle_seconds
+        self.on_remove = on_remove
+        self._records = OrderedDict()  # Least recently used first
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._records)
+
+    def create(self, filename):
+        dataset_id = uuid.uuid4().hex
+        folder = os.path.join(self.upload_folder, dataset_id)
+        os.makedirs(folder, exist_ok=True)
+        record = DatasetRecord(dataset_id, filename, folder)
+        with self._lock:
+            self._records[dataset_id] = record
+            evicted = self._expired()
+        self._discard(evicted, evicted=True)
+        return record
+
+    def get(self, dataset_id):
+        """The dataset's record, or None; marks it as used"""
+        if not dataset_id:
+            return None
+        with self._lock:
+            record = self._records.get(dataset_id)
+            if record is not None:
+                record.last_used = time.time()
+                self._records.move_to_end(dataset_id)
+        return record
+
+    def add_cleaned_version(self, dataset_id, path):
+        with self._lock:
+            record = self._records[dataset_id]
+            record.cleaned_paths.append(path)
+        return record
+
+    def set_artifact(self, dataset_id, name, value, version=None):
+        """Attach a derived result (report, matrix, ...) to a specific dataset version"""
+        with self._lock:
+            record = self._records.get(dataset_id)
+            if record is None:
+                return
+            record.artifacts[(record.version if version is None else version, name)] = value
+
+    def get_artifact(self, dataset_id, name, version=None):
+        record = self._records.get(dataset_id)
+        if record is None:
+            return None
+        return record.artifacts.get((record.version if version is None else version, name))
+
+    def pop_artifact(self, dataset_id, name, version=None):
+        """Drop an artifact that is no longer needed and return it, if it existed"""
+        with self._lock:
+            record = self._records.get(dataset_id)
+            if record is None:
+                return None
+            return record.artifacts.pop((record.version if version is None else version, name), None)
+
+    def remove(self, dataset_id):
+        """Forget a dataset and delete its folder. Returns the removed record, if any."""
+        with self._lock:
+            record = self._records.pop(dataset_id, None)
+        if record is not None:
+            self._discard([record])
+        return record
+
+    def evict_idle(self):
+        """Remove the datasets unused for longer than max_idle_seconds. Cheap when there
+        are none, as only the least recently used records are looked at."""
+        with self._lock:
+            evicted = self._expired()
+        self._discard(evicted, evicted=True)
+        return evicted
+
+    def stats(self):
+        with self._lock:
+            return {
+                'datasets': len(self._records),
+                'max_datasets': self.max_datasets,
+                'max_idle_seconds': self.max_idle_seconds,
+                'evictions': self.evictions
+            }
+
+    def _expired(self):
+        """Pop the records over the count limit or idle for too long (caller holds the lock)"""
+        expired = []
+        now = time.time()
+        while self._records:
+            record = next(iter(self._records.values()))
+            over_limit = self.max_datasets is not None and len(self._records) > self.max_datasets
+            idle = self.max_idle_seconds is not None and now - record.last_used > self.max_idle_seconds
+            if not (over_limit or idle):
+                break
+            del self._records[record.dataset_id]
+            expired.append(record)
+        return expired
+
+    def _discard(self, records, evicted=False):
+        for record in records:
+            if evicted:
+                with self._lock:
+                    self.evictions += 1
+            if self.on_remove is not None:
+                try:
+                    self.on_remove(record)
+                except Exception:
+                    pass
+            shutil.rmtree(record.folder, ignore_errors=True)
@@ -0,0 +1,131 @@
+import os
+import uuid
+
+import pandas as pd
+
+from dtype_compaction import STRING_DTYPE
+from excel_ingest import EXCEL_CHUNK_ROWS, read_sheet
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; without it datasets stay in their upload format
+    pa = None
+    pq = None
+
+# Internal files are named after the user-facing file plus this suffix,
+# e.g. cleaned_sales.csv.parquet for what the user sees as cleaned_sales.csv
+COLUMNAR_SUFFIX = '.parquet'
+
+
+def columnar_available():
+    return pq is not None
+
+
+def is_columnar(path):
+    return path.endswith(COLUMNAR_SUFFIX)
+
+
+def display_name(path):
+    """The file name the user sees, without the internal storage suffix"""
+    name = os.path.basename(path)
+    return name[:-len(COLUMNAR_SUFFIX)] if is_columnar(name) else name
+
+
+def display_ext(path):
+    return display_name(path).rsplit('.', 1)[-1].lower()
+
+
+def write_original(df, path):
+    """Write df in the format given by path's extension (csv, xls/xlsx or json)"""
+    ext = path.rsplit('.', 1)[-1].lower()
+    if ext == 'csv':
+        df.to_csv(path, index=False)
+    elif ext in ['xls', 'xlsx']:
+        df.to_excel(path, index=False)
+    elif ext == 'json':
+        df.to_json(path, orient='records')
+    else:
+        raise ValueError('Unsupported file format')
+
+
+def write_dataset(df, path):
+    """Store df for internal use under the user-facing path and return the path written.
+
+    Parquet keeps dtypes (datetimes, nullable ints, categories) and lets
+    readers load single columns. When pyarrow is missing or can't encode a
+    column (e.g. mixed Python types in an object column) the frame is written
+    in the original format instead.
+    """
+    if pq is not None:
+        try:
+            return write_columnar(df, path)
+        except (ValueError, TypeError, NotImplementedError):
+            pass
+    write_original(df, path)
+    return path
+
+
+def write_columnar(df, path):
+    """Write df as Parquet under the user-facing path and return the path written.
+    Raises if pyarrow can't encode the frame, leaving no partial file behind."""
+    columnar_path = path + COLUMNAR_SUFFIX
+    try:
+        df.to_parquet(columnar_path, index=False)
+    except Exception:
+        if os.path.exists(columnar_path):
+            os.remove(columnar_path)
+        raise
+    return columnar_path
+
+
+def stringify_mixed_columns(df):
+    """df with every object column pyarrow can't encode (mixed Python types, such as
+    numbers and text in one Excel column) converted to strings. Missing values stay missing."""
+    mixed = []
+    for col in df.columns:
+        if df[col].dtype == object:
+            try:
+                pa.array(df[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                mixed.append(col)
+    return df.astype({col: STRING_DTYPE for col in mixed}) if mixed else df
+
+
+def read_dataset(filepath, excel_chunk_rows=EXCEL_CHUNK_ROWS):
+    """Parse a dataset file from disk based on its extension"""
+    if is_columnar(filepath):
+        return read_columnar(filepath)
+    ext = filepath.split('.')[-1].lower()
+    if ext == 'csv':
+        try:
+            return pd.read_csv(filepath, encoding='utf-8-sig')
+        except UnicodeDecodeError:
+            return pd.read_csv(filepath, encoding='latin1')
+    elif ext in ['xls', 'xlsx']:
+        return read_sheet(filepath, chunk_rows=excel_chunk_rows)
+    elif ext == 'json':
+        return pd.read_json(filepath, orient='records')
+    raise ValueError('Unsupported file format')
+
+
+def read_columnar(path, columns=None):
+    """Read a Parquet dataset through a memory map, optionally only some columns.
+    Requested columns that don't exist are skipped so callers can report them."""
+    if columns is not None:
+        present = set(pq.read_schema(path).names)
+        columns = [col for col in dict.fromkeys(columns) if col in present]
+    return pd.read_parquet(path, columns=columns, memory_map=True)
+
+
+def materialize_original(path):
+    """User-facing copy of an internal dataset in its original format, written once per version"""
+    if not is_columnar(path):
+        return path
+    original_path = path[:-len(COLUMNAR_SUFFIX)]
+    if not os.path.exists(original_path) or os.path.getmtime(original_path) < os.path.getmtime(path):
+        # Unique temp name so concurrent downloads never write the same file
+        tmp_path = f"{original_path}.{uuid.uuid4().hex}.tmp.{display_ext(path)}"
+        write_original(read_columnar(path), tmp_path)
+        os.replace(tmp_path, original_path)
+    return original_path
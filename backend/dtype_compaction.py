@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+# String columns with at most this many distinct values per non-null value become categoricals
+CATEGORY_MAX_RATIO = 0.5
+# ...as long as they have no more distinct values than this (bounds the memory used to count them)
+CATEGORY_MAX_VALUES = 32767
+# The text dtype pandas 3 reads strings as: Arrow-backed when available, NaN for missing values.
+# Spelled out because on pandas 2 the 'str' alias means str() conversion, which turns NaN into 'nan'.
+STRING_DTYPE = pd.StringDtype(na_value=np.nan)
+
+
+def _column_kind(series):
+    """'int' for plain integer columns, 'string' for text columns, None for anything else"""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return None
+    if pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype):
+        return 'int'
+    if pd.api.types.is_string_dtype(dtype):
+        if dtype != object or pd.api.types.infer_dtype(series, skipna=True) == 'string':
+            return 'string'
+    return None
+
+
+def _smallest_int_dtype(low, high, unsigned):
+    candidates = ('uint8', 'uint16', 'uint32', 'uint64') if unsigned else ('int8', 'int16', 'int32', 'int64')
+    for name in candidates:
+        info = np.iinfo(name)
+        if info.min <= low and high <= info.max:
+            return np.dtype(name)
+    return None
+
+
+class DtypeScan:
+    """Works out compact dtypes for a dataset seen as one frame or chunk by chunk.
+
+    observe() each chunk (same columns, same dtypes as the final frame),
+    then dtypes() returns {column: compact dtype} for the columns worth
+    changing. Integer columns get the smallest integer type of the same
+    signedness that holds every value, so no value changes; floats keep
+    float64, as float32 would change the statistics reported for them.
+    String columns with few distinct values become categoricals with one
+    sorted set of categories, so chunks cast with it stay consistent; other
+    object columns holding only strings get the (Arrow-backed) string dtype.
+    """
+
+    def __init__(self, max_category_ratio=CATEGORY_MAX_RATIO, max_categories=CATEGORY_MAX_VALUES):
+        self.max_category_ratio = max_category_ratio
+        self.max_categories = max_categories
+        self.columns = {}
+
+    def observe(self, chunk):
+        for col in chunk.columns:
+            series = chunk[col]
+            kind = _column_kind(series)
+            state = self.columns.setdefault(col, {'kind': None, 'dtype': None, 'non_null': 0, 'gaps': False})
+            if kind != 'string' and not series.notna().any():
+                # An all-missing block parses as float whatever the column holds elsewhere
+                state['gaps'] = True
+                continue
+            if state['dtype'] is None:
+                state['kind'], state['dtype'] = kind, series.dtype
+            elif state['kind'] != kind or state['dtype'] != series.dtype:
+                state['kind'] = None  # Chunks disagree; the column keeps whatever dtype it ends up with
+            if state['kind'] == 'int':
+                state['low'] = min(state.get('low', series.min()), series.min())
+                state['high'] = max(state.get('high', series.max()), series.max())
+            elif state['kind'] == 'string':
+                state['non_null'] += int(series.count())
+                values = state.setdefault('values', set())
+                if values is not None:
+                    values.update(series.dropna().unique())
+                    if len(values) > self.max_categories:
+                        state['values'] = None
+
+    def dtypes(self):
+        changes = {}
+        for col, state in self.columns.items():
+            dtype = None
+            if state['kind'] == 'int' and not state['gaps']:
+                dtype = _smallest_int_dtype(state['low'], state['high'], state['dtype'].kind == 'u')
+                if dtype is not None and dtype.itemsize >= state['dtype'].itemsize:
+                    dtype = None
+            elif state['kind'] == 'string':
+                values = state.get('values')
+                if values and len(values) <= self.max_category_ratio * state['non_null']:
+                    dtype = pd.CategoricalDtype(pd.Index(sorted(values), dtype=STRING_DTYPE))
+                elif state['dtype'] == object:
+                    dtype = STRING_DTYPE
+            if dtype is not None:
+                changes[col] = dtype
+        return changes
+
+
+def _dtype_name(dtype):
+    return pd.api.types.pandas_dtype(dtype).name
+
+
+def compaction_summary(before, after, changes):
+    """{'memory_before', 'memory_after', 'columns': {col: {'before', 'after'}}} from memory
+    usage in bytes and {col: (dtype before, dtype after)} for the columns that changed"""
+    return {
+        'memory_before': int(before),
+        'memory_after': int(after),
+        'columns': {col: {'before': _dtype_name(before_dtype), 'after': _dtype_name(after_dtype)}
+                    for col, (before_dtype, after_dtype) in changes.items()}
+    }
+
+
+def compact_dtypes(df, max_category_ratio=CATEGORY_MAX_RATIO):
+    """Return (compacted frame, compaction_summary) for a freshly loaded dataset (see DtypeScan)"""
+    scan = DtypeScan(max_category_ratio)
+    scan.observe(df)
+    changes = scan.dtypes()
+    compacted = df.astype(changes) if changes else df
+    return compacted, compaction_summary(
+        df.memory_usage(deep=True, index=False).sum(),
+        compacted.memory_usage(deep=True, index=False).sum(),
+        {col: (df[col].dtype, compacted[col].dtype) for col in changes}
+    )
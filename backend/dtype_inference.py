@@ -0,0 +1,123 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Number of non-null values tested before committing to a full-column parse
+INFERENCE_SAMPLE_SIZE = 1000
+
+BOOL_SETS = [
+    {True, False},
+    {1, 0},
+    {'yes', 'no'},
+    {'Yes', 'No'},
+    {'true', 'false'},
+    {'True', 'False'},
+    {'Y', 'N'},
+    {'y', 'n'}
+]
+
+
+def _sample(values, sample_size):
+    """Evenly spaced sample so problems at the end of a column are still seen"""
+    if len(values) <= sample_size:
+        return values
+    positions = np.linspace(0, len(values) - 1, sample_size).astype(np.int64)
+    return values.iloc[positions]
+
+
+def _parses_strictly(parse, values):
+    try:
+        parse(values)
+        return True
+    except Exception:
+        return False
+
+
+def _parse_fraction(parse, values):
+    """Fraction of values that survive parse(values, errors='coerce')"""
+    if len(values) == 0:
+        return 1.0
+    return float(parse(values, errors='coerce').notna().sum()) / len(values)
+
+
+def _is_boolean(non_null, sample_size):
+    # More than two distinct values in the sample rules a boolean out without a full scan
+    if _sample(non_null, sample_size).nunique() > 2:
+        return False
+    unique_vals = non_null.unique()
+    if len(unique_vals) != 2:
+        return False
+    unique_set = set(unique_vals)
+    return any(unique_set == bset for bset in BOOL_SETS)
+
+
+def infer_dtype(series, sample_size=INFERENCE_SAMPLE_SIZE):
+    """Suggest a better dtype for a column.
+
+    Returns {'suggested': 'boolean' | 'numeric' | 'datetime' | None,
+    'parseable_fraction': share of non-null values that parse as the tested
+    type, 'sampled': True when the verdict came from the sample alone}.
+    Numeric and datetime parsing is tried on a bounded sample first and only
+    confirmed on the full column (with the same strict parse) when every
+    sampled value parses.
+    """
+    if series.dtype == 'bool' or pd.api.types.is_datetime64_any_dtype(series):
+        return {'suggested': None, 'parseable_fraction': 1.0, 'sampled': False}
+
+    non_null = series.dropna()
+    if _is_boolean(non_null, sample_size):
+        return {'suggested': 'boolean', 'parseable_fraction': 1.0, 'sampled': False}
+    if pd.api.types.is_numeric_dtype(series):
+        return {'suggested': None, 'parseable_fraction': 1.0, 'sampled': False}
+
+    sample = _sample(non_null, sample_size)
+    sampled = len(sample) < len(non_null)
+    best_fraction = None
+    with warnings.catch_warnings():
+        # pd.to_datetime warns when it has to fall back to per-element parsing
+        warnings.simplefilter('ignore', UserWarning)
+        for suggested, parse in (('numeric', pd.to_numeric), ('datetime', pd.to_datetime)):
+            if not _parses_strictly(parse, sample):
+                continue
+            # Confirmed with the same strict parse: a coerced one also counts blank strings as failures
+            if not sampled or _parses_strictly(parse, non_null):
+                return {'suggested': suggested, 'parseable_fraction': 1.0, 'sampled': False}
+            best_fraction = max(best_fraction or 0.0, _parse_fraction(parse, non_null))
+        if best_fraction is not None:
+            return {'suggested': None, 'parseable_fraction': best_fraction, 'sampled': False}
+        # Nothing parsed cleanly in the sample; estimate how numeric the column is from it
+        return {
+            'suggested': None,
+            'parseable_fraction': _parse_fraction(pd.to_numeric, sample),
+            'sampled': sampled
+        }
+
+
+def infer_column_dtype(series, cache=None):
+    """infer_dtype() with an optional per-dataset-version cache (a dict keyed by column name)"""
+    if cache is not None and series.name in cache:
+        return cache[series.name]
+    result = infer_dtype(series)
+    if cache is not None:
+        cache[series.name] = result
+    return result
+
+
+def subset_verdict(verdict, column, subset):
+    """Carry a cached infer_dtype() verdict of column over to subset, a selection of
+    its rows with the values unchanged. Returns None when subset has to be inferred again.
+
+    A 'numeric' or 'datetime' verdict means every non-null value parsed, which
+    holds for any selection of them, except that the selection may be down to
+    two boolean-like values, and that pd.to_datetime guesses the format from
+    the first value, so a datetime verdict needs the same value in front.
+    """
+    if verdict is None or verdict['suggested'] not in ('numeric', 'datetime'):
+        return None
+    non_null = subset.dropna()
+    if len(non_null) == 0 or _is_boolean(non_null, INFERENCE_SAMPLE_SIZE):
+        return None
+    if verdict['suggested'] == 'datetime' and non_null.iloc[0] != column.dropna().iloc[0]:
+        return None
+    return verdict
@@ -0,0 +1,96 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Budget for cached per-column hashes; beyond it column hashes are recomputed when needed
+DUPLICATE_INDEX_MAX_BYTES = 256 * 1024 * 1024
+
+
+def hash_column(values):
+    """uint64 hash of every value of a Series, equal for values duplicated() treats as equal"""
+    if pd.api.types.is_float_dtype(values):
+        # -0.0 == 0.0 and NaNs match whatever their sign bit, but their bit patterns hash differently
+        values = (values + 0.0).where(values.notna(), np.nan)
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def combine_hashes(arrays, n_rows):
+    """Fold per-column uint64 hashes into one hash per row (order-sensitive, like pandas)"""
+    out = np.full(n_rows, 0x345678, dtype=np.uint64)
+    mult = np.uint64(1000003)
+    for i, hashes in enumerate(arrays):
+        out ^= hashes
+        out *= mult
+        mult += np.uint64(82520 + 2 * (len(arrays) - i))
+    out += np.uint64(97531)
+    return out
+
+
+class DuplicateIndex:
+    """Vectorized per-row hashes of one dataset version, answering duplicate queries.
+
+    Each column is hashed once (pd.util.hash_pandas_object) and cached;
+    row hashes for any subset of columns are combined from those, so subset
+    checks never rehash the frame. Rows count as duplicates when their
+    64-bit row hashes match, which agrees with DataFrame.duplicated() except
+    for hash collisions (negligible below billions of rows) and object
+    columns mixing types that compare equal, like 1 and 1.0.
+    """
+
+    def __init__(self, df, max_bytes=DUPLICATE_INDEX_MAX_BYTES, column_hashes=None, row_hashes=None):
+        self.df = df
+        self.max_bytes = max_bytes
+        self._column_hashes = dict(column_hashes or {})
+        self._row_hashes = dict(row_hashes or {})  # tuple of columns -> combined hashes
+        self._lock = threading.Lock()
+
+    def column_hash(self, column):
+        with self._lock:
+            hashes = self._column_hashes.get(column)
+        if hashes is not None:
+            return hashes
+        hashes = hash_column(self.df[column])
+        with self._lock:
+            if self.nbytes + hashes.nbytes <= self.max_bytes:
+                self._column_hashes[column] = hashes
+        return hashes
+
+    def row_hashes(self, columns=None):
+        key = tuple(self.df.columns if columns is None else columns)
+        with self._lock:
+            hashes = self._row_hashes.get(key)
+        if hashes is None:
+            hashes = combine_hashes([self.column_hash(col) for col in key], len(self.df))
+            with self._lock:
+                if self.nbytes + hashes.nbytes <= self.max_bytes:
+                    self._row_hashes[key] = hashes
+        return hashes
+
+    def duplicated(self, columns=None, keep='first'):
+        """Boolean mask like DataFrame.duplicated(subset=columns, keep=keep)"""
+        return pd.Series(self.row_hashes(columns), copy=False).duplicated(keep=keep).to_numpy()
+
+    def count(self, columns=None):
+        return int(self.duplicated(columns).sum())
+
+    def positions(self, columns=None, keep='first'):
+        """Row positions of the duplicated rows"""
+        return np.flatnonzero(self.duplicated(columns, keep))
+
+    def derive(self, df, keep, unchanged_columns):
+        """Index for a frame made of this one's rows where `keep` is True, in which
+        `unchanged_columns` hold the same values; their hashes are reused"""
+        unchanged_columns = set(unchanged_columns)
+        with self._lock:
+            column_hashes = {
+                col: hashes[keep] for col, hashes in self._column_hashes.items() if col in unchanged_columns
+            }
+            row_hashes = {
+                key: hashes[keep] for key, hashes in self._row_hashes.items() if unchanged_columns.issuperset(key)
+            }
+        return DuplicateIndex(df, self.max_bytes, column_hashes, row_hashes)
+
+    @property
+    def nbytes(self):
+        return sum(h.nbytes for h in self._column_hashes.values()) + sum(h.nbytes for h in self._row_hashes.values())
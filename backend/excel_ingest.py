@@ -0,0 +1,196 @@
+import posixpath
+import zipfile
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+try:
+    import openpyxl
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+    from openpyxl.utils.cell import range_boundaries
+except ImportError:  # Needed for .xlsx files, as with pd.read_excel
+    openpyxl = None
+
+try:
+    import xlrd
+except ImportError:  # Needed for legacy .xls files, as with pd.read_excel
+    xlrd = None
+
+EXCEL_CHUNK_ROWS = 50000
+
+_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_DOC_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+
+def _is_xlsx(path):
+    return path.rsplit('.', 1)[-1].lower() == 'xlsx'
+
+
+def _xlsx_sheet_parts(zf):
+    """[(sheet name, worksheet part inside the archive)] in workbook order"""
+    workbook = ElementTree.fromstring(zf.read('xl/workbook.xml'))
+    rels = ElementTree.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    targets = {rel.get('Id'): rel.get('Target', '') for rel in rels.iter(f'{_PKG_REL_NS}Relationship')}
+    parts = []
+    for sheet in workbook.iter(f'{_MAIN_NS}sheet'):
+        target = targets.get(sheet.get(f'{_DOC_REL_NS}id'), '')
+        part = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+        parts.append((sheet.get('name'), part))
+    return parts
+
+
+def _xlsx_dimension(zf, part):
+    """(rows, columns) of a worksheet's used range from its <dimension> element, which
+    precedes the cell data; (None, None) when the sheet doesn't declare one"""
+    with zf.open(part) as f:
+        for _, elem in ElementTree.iterparse(f, events=('start',)):
+            if elem.tag == f'{_MAIN_NS}dimension':
+                min_col, min_row, max_col, max_row = range_boundaries(elem.get('ref'))
+                if min_row is None or max_row is None:
+                    return None, None
+                return max_row - min_row + 1, max_col - min_col + 1
+            if elem.tag == f'{_MAIN_NS}sheetData':
+                break
+    return None, None
+
+
+def list_sheets(path):
+    """Sheets of a workbook as [{'name', 'rows', 'columns'}] without parsing cell data.
+    rows and columns are the used range (header row included), or None when unknown."""
+    if _is_xlsx(path):
+        with zipfile.ZipFile(path) as zf:
+            sheets = []
+            for name, part in _xlsx_sheet_parts(zf):
+                rows, columns = _xlsx_dimension(zf, part) if part in zf.namelist() else (None, None)
+                sheets.append({'name': name, 'rows': rows, 'columns': columns})
+            return sheets
+    if xlrd is None:
+        raise ImportError('Reading .xls files requires xlrd')
+    # .xls has no dimension record to peek at; each sheet is loaded and released in turn
+    book = xlrd.open_workbook(path, on_demand=True)
+    try:
+        sheets = []
+        for name in book.sheet_names():
+            sheet = book.sheet_by_name(name)
+            sheets.append({'name': name, 'rows': sheet.nrows, 'columns': sheet.ncols})
+            book.unload_sheet(name)
+        return sheets
+    finally:
+        book.release_resources()
+
+
+def _convert_cell(cell):
+    # Same conversion as pandas' openpyxl reader, so the result matches pd.read_excel
+    if cell.value is None:
+        return ''
+    if cell.data_type == TYPE_ERROR:
+        return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        value = int(cell.value)
+        return value if value == cell.value else float(cell.value)
+    return cell.value
+
+
+def _iter_xlsx_rows(path, sheet):
+    """Cell values of one sheet row by row, streamed from a read-only workbook.
+    Trailing empty cells and trailing empty rows are dropped, as pd.read_excel does."""
+    if openpyxl is None:
+        raise ImportError('Reading .xlsx files requires openpyxl')
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        worksheet = workbook.worksheets[0] if sheet is None else workbook[sheet]
+        worksheet.reset_dimensions()  # Don't trust the stored dimension when iterating
+        empty_rows = 0
+        for row in worksheet.rows:
+            values = [_convert_cell(cell) for cell in row]
+            while values and values[-1] == '':
+                values.pop()
+            if not values:
+                empty_rows += 1
+                continue
+            for _ in range(empty_rows):
+                yield []
+            empty_rows = 0
+            yield values
+    finally:
+        workbook.close()
+
+
+def _parse_rows(header, rows):
+    """Parse a block of rows under the header with the same type inference as pd.read_excel"""
+    width = max([len(header)] + [len(row) for row in rows])
+    data = [row + [''] * (width - len(row)) for row in [header] + rows]
+    return TextParser(data, header=0, skip_blank_lines=False).read()
+
+
+def _unify_dtype(chunks, column):
+    """The dtype a single pd.read_excel call gives a column parsed in blocks, or None when
+    the blocks inferred incompatible types and only the column's raw values can tell"""
+    dtypes = {chunk[column].dtype for chunk in chunks if column in chunk and chunk[column].notna().any()}
+    has_gaps = any(column not in chunk or chunk[column].isna().any() for chunk in chunks)
+    if len(dtypes) == 1:
+        dtype = next(iter(dtypes))
+        # Missing values turn integer and boolean columns into floats
+        if has_gaps and (pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype)):
+            return np.dtype('float64')
+        return dtype
+    if dtypes and all(pd.api.types.is_numeric_dtype(d) and not pd.api.types.is_bool_dtype(d) for d in dtypes):
+        return np.dtype('float64')
+    return None
+
+
+def _concat_chunks(chunks):
+    """Concatenate parsed blocks. Returns (frame, columns left as object because the blocks
+    disagreed on their type)."""
+    if len(chunks) == 1:
+        return chunks[0], []
+    columns = list(dict.fromkeys(col for chunk in chunks for col in chunk.columns))
+    dtypes = {col: _unify_dtype(chunks, col) for col in columns}
+    conflicts = [col for col, dtype in dtypes.items() if dtype is None]
+    dtypes = {col: np.dtype('object') if dtype is None else dtype for col, dtype in dtypes.items()}
+    aligned = [chunk.reindex(columns=columns).astype(dtypes) for chunk in chunks]
+    return pd.concat(aligned, ignore_index=True), conflicts
+
+
+def _reparse_columns(path, sheet, columns, positions):
+    """Parse some columns again from all of their raw values at once (a second streaming pass)"""
+    rows = _iter_xlsx_rows(path, sheet)
+    next(rows)
+    data = [[row[i] if i < len(row) else '' for i in positions] for row in rows]
+    return TextParser(data, names=columns, header=None, skip_blank_lines=False).read()
+
+
+def read_sheet(path, sheet=None, chunk_rows=EXCEL_CHUNK_ROWS):
+    """Read one sheet (the first by default) into a DataFrame like pd.read_excel.
+
+    .xlsx sheets are streamed from a read-only workbook and parsed
+    chunk_rows rows at a time, so openpyxl's object model is never built
+    and only one block of raw cell values is held at once. Legacy .xls
+    files have no streaming reader and go through pd.read_excel.
+    """
+    if not _is_xlsx(path):
+        return pd.read_excel(path, sheet_name=0 if sheet is None else sheet)
+
+    rows = _iter_xlsx_rows(path, sheet)
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+    chunks = []
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_rows:
+            chunks.append(_parse_rows(header, batch))
+            batch = []
+    if batch or not chunks:
+        chunks.append(_parse_rows(header, batch))
+    df, conflicts = _concat_chunks(chunks)
+    if conflicts:
+        positions = [df.columns.get_loc(col) for col in conflicts]
+        reparsed = _reparse_columns(path, sheet, conflicts, positions)
+        for col in conflicts:
+            df[col] = reparsed[col]
+    return df
@@ -0,0 +1,131 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExportCancelled(Exception):
+    """Raised by an export function to stop a job whose dataset no longer exists"""
+
+
+class ExportJob:
+    """State of one background export"""
+
+    def __init__(self, key, dataset_id):
+        self.job_id = uuid.uuid4().hex
+        self.key = key
+        self.dataset_id = dataset_id
+        self.status = 'queued'  # queued -> running -> done | failed | cancelled
+        self.progress = 0
+        self.stage = 'Queued'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def update(self, progress, stage):
+        self.progress = progress
+        self.stage = stage
+
+    def to_dict(self):
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'progress': self.progress,
+            'stage': self.stage,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+
+class ExportJobQueue:
+    """Runs exports on a bounded thread pool and deduplicates identical requests.
+
+    Jobs are keyed by a caller-supplied hash of the dataset version and export
+    options. Submitting a key that is already queued, running or finished
+    returns the existing job, so repeat exports reuse the stored artifact.
+    Failed and cancelled jobs are not reused. A job function raises
+    ExportCancelled to stop without failing. At most `max_jobs` jobs are remembered;
+    `on_evict(job)` is called for each forgotten job so its artifact can be
+    deleted.
+    """
+
+    def __init__(self, max_workers=2, max_jobs=64, on_evict=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='export')
+        self._jobs = OrderedDict()  # job_id -> job
+        self._by_key = {}
+        self._lock = threading.Lock()
+        self.max_jobs = max_jobs
+        self.on_evict = on_evict
+
+    def submit(self, key, dataset_id, fn):
+        """Queue fn(job) unless an equivalent job exists. Returns (job, reused)."""
+        with self._lock:
+            existing = self._jobs.get(self._by_key.get(key))
+            if existing is not None and existing.status not in ('failed', 'cancelled'):
+                self._jobs.move_to_end(existing.job_id)
+                return existing, True
+            job = ExportJob(key, dataset_id)
+            self._jobs[job.job_id] = job
+            self._by_key[key] = job.job_id
+            evicted = self._evict()
+        for old in evicted:
+            self._forget(old)
+        self._executor.submit(self._run, job, fn)
+        return job, False
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def discard_dataset(self, dataset_id):
+        """Forget every job belonging to a removed dataset"""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.dataset_id == dataset_id]
+            for job in jobs:
+                self._jobs.pop(job.job_id, None)
+                if self._by_key.get(job.key) == job.job_id:
+                    del self._by_key[job.key]
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in ('queued', 'running', 'done', 'failed', 'cancelled')}
+
+    def _run(self, job, fn):
+        job.status = 'running'
+        job.update(1, 'Starting')
+        try:
+            job.result = fn(job)
+            job.update(100, 'Done')
+            job.status = 'done'
+        except ExportCancelled as e:
+            job.error = str(e)
+            job.status = 'cancelled'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+
+    def _evict(self):
+        """Pop the oldest finished jobs beyond max_jobs (caller holds the lock)"""
+        evicted = []
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            job = self._jobs[job_id]
+            if job.status in ('done', 'failed', 'cancelled'):
+                del self._jobs[job_id]
+                if self._by_key.get(job.key) == job_id:
+                    del self._by_key[job.key]
+                evicted.append(job)
+        return evicted
+
+    def _forget(self, job):
+        if self.on_evict is not None:
+            try:
+                self.on_evict(job)
+            except Exception:
+                pass
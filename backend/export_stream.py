@@ -0,0 +1,61 @@
+import io
+import zipfile
+
+FILE_CHUNK_BYTES = 1024 * 1024
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable file object that collects whatever zipfile writes into it"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+
+def iter_file_chunks(path, chunk_bytes=FILE_CHUNK_BYTES):
+    """Read a file from disk in fixed-size chunks"""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_bytes)
+            if not chunk:
+                return
+            yield chunk
+
+
+def iter_csv_chunks(df, rows_per_chunk):
+    """Encode a DataFrame as CSV a block of rows at a time (same output as df.to_csv(index=False))"""
+    rows_per_chunk = max(1, rows_per_chunk)
+    for start in range(0, max(len(df), 1), rows_per_chunk):
+        block = df.iloc[start:start + rows_per_chunk]
+        yield block.to_csv(index=False, header=start == 0).encode('utf-8')
+
+
+def stream_zip(members):
+    """Yield a deflate-compressed ZIP archive as it is built.
+
+    members is a list of (arcname, chunks) where chunks is bytes or an
+    iterable of bytes. Only one chunk of input and its compressed output are
+    held at a time, so memory stays flat regardless of member size.
+    """
+    sink = _ChunkSink()
+    # An unseekable target makes zipfile write sizes in data descriptors after each member
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for arcname, chunks in members:
+            if isinstance(chunks, bytes):
+                chunks = [chunks]
+            with zf.open(arcname, 'w', force_zip64=True) as member:
+                for chunk in chunks:
+                    member.write(chunk)
+                    yield from sink.drain()
+            yield from sink.drain()
+    yield from sink.drain()
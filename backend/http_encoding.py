@@ -0,0 +1,129 @@
+import gzip
+import math
+
+import numpy as np
+import pandas as pd
+from flask.json.provider import DefaultJSONProvider
+
+from instrumentation import stage
+
+try:
+    import orjson
+except ImportError:  # Optional: the standard library encoder is used instead
+    orjson = None
+try:
+    import brotli
+except ImportError:  # Optional: only gzip is offered
+    brotli = None
+
+COMPRESS_MIN_BYTES = 1024  # Smaller bodies aren't worth the CPU and the extra headers
+GZIP_LEVEL = 4
+BROTLI_QUALITY = 4  # Faster than gzip -6 and about 10% smaller on report JSON
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain', 'text/csv')
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding(accept_encodings):
+    """Best content coding the client accepts (werkzeug Accept object), or None"""
+    best, best_quality = None, 0
+    for encoding in available_encodings():
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding, gzip_level=GZIP_LEVEL, brotli_quality=BROTLI_QUALITY):
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+def compress_response(response, accept_encodings, min_bytes=COMPRESS_MIN_BYTES,
+                      gzip_level=GZIP_LEVEL, brotli_quality=BROTLI_QUALITY):
+    """Compress a buffered text/JSON response in place if the client accepts it.
+    A strong ETag gets the coding appended ('"tag-gzip"'), as the compressed
+    bytes are a different representation; etag_matches() accepts either."""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(accept_encodings)
+    data = response.get_data()
+    if encoding is None or len(data) < min_bytes:
+        return response
+    with stage('compress'):
+        response.set_data(compress(data, encoding, gzip_level, brotli_quality))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f'{etag}-{encoding}')
+    return response
+
+
+def etag_matches(if_none_match, etag):
+    """The form of this ETag (plain or compressed) named by If-None-Match, or None"""
+    if if_none_match.star_tag:
+        return etag
+    for tag in [etag] + [f'{etag}-{encoding}' for encoding in ('br', 'gzip')]:
+        if tag in if_none_match:
+            return tag
+    return None
+
+
+def _default(o):
+    """JSON form of the NumPy/pandas values that can end up in responses"""
+    if isinstance(o, np.integer):
+        return int(o)
+    if isinstance(o, np.floating):
+        return None if math.isnan(o) else float(o)
+    if isinstance(o, np.bool_):
+        return bool(o)
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    if o is pd.NaT or o is pd.NA:
+        return None
+    return DefaultJSONProvider.default(o)
+
+
+if orjson is not None:
+    # Dates are passed to _default so they keep Flask's HTTP-date format
+    ORJSON_OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                      | orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, encoding with orjson when it is installed.
+
+    Output is the same JSON as the default provider's (keys sorted, dates
+    as HTTP dates); NumPy and pandas scalars and arrays are encoded directly
+    and NaN becomes null. Responses are indented in debug mode, as Flask's
+    are. Falls back to the standard encoder for anything orjson rejects
+    (e.g. integers beyond 64 bits) and for dumps() with extra json.dumps options.
+    """
+
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS).decode()
+            except TypeError:  # orjson.JSONEncodeError included
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is None:
+            return super().response(obj)
+        option = ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        try:
+            body = orjson.dumps(obj, default=_default, option=option)
+        except TypeError:  # orjson.JSONEncodeError included
+            return super().response(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,338 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Upper bounds (seconds) of the request and stage duration histograms
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+PROFILE_INTERVAL = 0.005  # Seconds between stack samples
+PROFILE_MAX_DEPTH = 128  # Frames kept per sampled stack
+
+_current_trace = ContextVar('trace', default=None)
+
+
+class Stage:
+    """One timed step of a request, with the size of the data it handled if known"""
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.rows = None
+        self.columns = None
+
+    def set_shape(self, df):
+        self.rows, self.columns = (int(n) for n in df.shape)
+        return df
+
+    def to_dict(self):
+        return {'name': self.name, 'seconds': self.seconds, 'rows': self.rows, 'columns': self.columns}
+
+
+class Trace:
+    """Stages timed while handling one request (or one worker pool job).
+
+    Stages opened inside another stage are named after it ('clean_dataset.load'),
+    and so are stages recorded elsewhere and added with record(), such as the ones
+    a worker process timed for a job.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = []
+        self._open = []
+
+    @contextmanager
+    def stage(self, name):
+        stage = Stage('.'.join(self._open + [name]))
+        self._open.append(name)
+        start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage.seconds = time.perf_counter() - start
+            self._open.pop()
+            self.stages.append(stage)
+
+    def record(self, stages):
+        """Add stages (as to_dict() output) timed by another trace, under the open stages"""
+        for entry in stages:
+            stage = Stage('.'.join(self._open + [entry['name']]))
+            stage.seconds, stage.rows, stage.columns = entry['seconds'], entry['rows'], entry['columns']
+            self.stages.append(stage)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def to_dicts(self):
+        return [stage.to_dict() for stage in self.stages]
+
+
+def activate(trace):
+    """Make trace the current one for this thread/context; returns a token for deactivate()"""
+    return _current_trace.set(trace)
+
+
+def deactivate(token):
+    _current_trace.reset(token)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def stage(name):
+    """Time a block as a stage of the current trace. Without one it still yields a
+    Stage (so callers can set its shape) but nothing is recorded."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield Stage(name)
+        return
+    with trace.stage(name) as current:
+        yield current
+
+
+def record(stages):
+    trace = _current_trace.get()
+    if trace is not None and stages:
+        trace.record(stages)
+
+
+def server_timing(trace, total_name='total'):
+    """Server-Timing header value for a finished trace (durations in milliseconds)"""
+    entries = []
+    for stage in trace.stages:
+        entry = f'{stage.name};dur={stage.seconds * 1000:.1f}'
+        if stage.rows is not None:
+            entry += f';desc="{stage.rows}x{stage.columns}"'
+        entries.append(entry)
+    entries.append(f'{total_name};dur={trace.elapsed() * 1000:.1f}')
+    return ', '.join(entries)
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_label_value(value)}"' for key, value in labels) + '}'
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket', labels + (('le', _format_number(float(bound))),), cumulative
+        yield f'{name}_bucket', labels + (('le', '+Inf'),), self.count
+        yield f'{name}_sum', labels, self.sum
+        yield f'{name}_count', labels, self.count
+
+
+class Metrics:
+    """Request metrics in the Prometheus text format.
+
+    Counts requests and times them and their stages per endpoint, counts
+    named events (cache hits and the like), and on every scrape reads the
+    stats() of registered components (caches, pools, queues) as gauges.
+    """
+
+    def __init__(self, prefix='app', buckets=DURATION_BUCKETS):
+        self.prefix = prefix
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._help = {}
+        self._types = {}
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> _Histogram
+        self._collectors = []
+        self.in_flight = 0
+        self.slow_requests = 0
+
+    def _declare(self, name, metric_type, help_text):
+        name = f'{self.prefix}_{name}'
+        self._types.setdefault(name, metric_type)
+        self._help.setdefault(name, help_text)
+        return name
+
+    def increment(self, name, help_text, amount=1, **labels):
+        key = (self._declare(name, 'counter', help_text), tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, help_text, value, **labels):
+        key = (self._declare(name, 'histogram', help_text), tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    def add_collector(self, name, stats, help_text):
+        """Expose the numeric values of stats() as {prefix}_{name}_{key} gauges"""
+        self._collectors.append((name, stats, help_text))
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def observe_request(self, endpoint, method, status, trace, slow=False):
+        seconds = trace.elapsed()
+        self.increment('requests_total', 'Requests handled', endpoint=endpoint, method=method, status=status)
+        self.observe('request_duration_seconds', 'Request handling time', seconds, endpoint=endpoint)
+        for stage in trace.stages:
+            self.observe('stage_duration_seconds', 'Time spent in one stage of a request', stage.seconds,
+                         endpoint=endpoint, stage=stage.name)
+            if stage.rows is not None:
+                self.increment('stage_rows_total', 'Rows handled by a stage', stage.rows,
+                               endpoint=endpoint, stage=stage.name)
+        if slow:
+            with self._lock:
+                self.slow_requests += 1
+
+    def stats(self):
+        with self._lock:
+            requests = sum(value for (name, _), value in self._counters.items()
+                           if name == f'{self.prefix}_requests_total')
+            return {'in_flight': self.in_flight, 'requests': requests, 'slow_requests': self.slow_requests}
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        samples = {}  # metric name -> [(sample name, labels, value)]
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                samples.setdefault(name, []).append((name, labels, value))
+            for (name, labels), histogram in self._histograms.items():
+                samples.setdefault(name, []).extend(histogram.samples(name, labels))
+            types, help_texts = dict(self._types), dict(self._help)
+            gauges = {'requests_in_flight': self.in_flight}
+        for name, value in gauges.items():
+            name = f'{self.prefix}_{name}'
+            types[name], help_texts[name] = 'gauge', 'Requests being handled'
+            samples[name] = [(name, (), value)]
+        for collector, stats, help_text in self._collectors:
+            try:
+                values = stats()
+            except Exception:
+                continue  # A broken component shouldn't take the whole scrape down
+            for key, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f'{self.prefix}_{collector}_{key}'
+                types[name], help_texts[name] = 'gauge', f'{help_text}: {key}'
+                samples[name] = [(name, (), value)]
+
+        lines = []
+        for name in sorted(samples):
+            lines.append(f'# HELP {name} {help_texts[name]}')
+            lines.append(f'# TYPE {name} {types[name]}')
+            rows = samples[name] if types[name] == 'histogram' else sorted(samples[name], key=lambda s: s[1])
+            for sample_name, labels, value in rows:
+                lines.append(f'{sample_name}{_format_labels(labels)} {_format_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+class _ProfileSession:
+    def __init__(self, thread_id):
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self.samples = 0
+
+
+def _fold(frame, max_depth):
+    names = []
+    while frame is not None and len(names) < max_depth:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class SamplingProfiler:
+    """Statistical profiler for request threads.
+
+    One background thread samples the stack of every thread being profiled
+    each `interval` seconds, and counts identical stacks. stop() returns
+    them as folded stacks ('outer;inner' -> samples), the input of
+    flamegraph.pl and speedscope. Only threads of this process are seen:
+    work handed to worker processes shows up as the wait for its result.
+    """
+
+    def __init__(self, interval=PROFILE_INTERVAL, max_depth=PROFILE_MAX_DEPTH):
+        self.interval = interval
+        self.max_depth = max_depth
+        self._sessions = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self, thread_id=None):
+        session = _ProfileSession(thread_id or threading.get_ident())
+        with self._lock:
+            self._sessions.add(session)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._sample, name='sampling-profiler', daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return session
+
+    def stop(self, session):
+        with self._lock:
+            self._sessions.discard(session)
+            if not self._sessions:
+                self._wake.clear()
+        return session.stacks
+
+    def _sample(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                sessions = list(self._sessions)
+            if not sessions:
+                continue
+            frames = sys._current_frames()
+            for session in sessions:
+                frame = frames.get(session.thread_id)
+                if frame is not None:
+                    session.stacks[_fold(frame, self.max_depth)] += 1
+                    session.samples += 1
+            del frames
+
+
+def write_folded(stacks, path):
+    """Write folded stacks as 'frame;frame;frame count' lines"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        for stack, count in stacks.most_common():
+            f.write(f'{stack} {count}\n')
+    return path
@@ -0,0 +1,180 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+from playwright.sync_api import sync_playwright
+
+
+class RendererBusy(Exception):
+    """Raised when the render queue is full"""
+
+
+class PdfRenderer:
+    """Bounded pool of warm Chromium instances for HTML -> PDF rendering.
+
+    Playwright's sync API is bound to the thread that started it, so each
+    worker thread owns its own Playwright driver and browser and pulls jobs
+    from a shared queue. A worker reuses one browser context for up to
+    `renders_per_context` renders, replaces it after a failed render, and
+    relaunches the browser when a health check finds it disconnected.
+    Workers are started lazily on the first render.
+    """
+
+    def __init__(self, workers=2, renders_per_context=50, queue_size=16,
+                 render_timeout=60, health_interval=30):
+        self.workers = workers
+        self.renders_per_context = renders_per_context
+        self.render_timeout = render_timeout
+        self.health_interval = health_interval
+        self._jobs = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self.last_error = None
+        self.stats_counters = {
+            'renders': 0,
+            'failures': 0,
+            'context_recycles': 0,
+            'browser_restarts': 0
+        }
+
+    def render(self, html, assets=None, timeout=None):
+        """Render html to PDF bytes, waiting at most `timeout` seconds for a result.
+        assets maps absolute URLs referenced by the page to (body_bytes, content_type);
+        those requests are answered from memory instead of the network."""
+        future = Future()
+        try:
+            self._jobs.put_nowait((html, assets or {}, future))
+        except queue.Full:
+            raise RendererBusy('PDF renderer is busy, please try again shortly')
+        # Started after queueing, so a worker that fails to launch fails this job too
+        self._ensure_started()
+        try:
+            return future.result(timeout=timeout or self.render_timeout)
+        except TimeoutError:
+            future.cancel()  # Skip it if a worker hasn't picked it up yet
+            raise
+
+    def stats(self):
+        return dict(
+            self.stats_counters,
+            workers_alive=sum(t.is_alive() for t in self._threads),
+            queued=self._jobs.qsize(),
+            last_error=self.last_error
+        )
+
+    def shutdown(self):
+        self._stopping.set()
+        for _ in self._threads:
+            try:
+                self._jobs.put_nowait(None)
+            except queue.Full:
+                break
+
+    def _ensure_started(self):
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker, name='pdf-renderer', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats_counters[name] += 1
+
+    def _worker(self):
+        try:
+            self._serve()
+        except Exception as e:
+            # Could not start (or keep) Chromium: fail waiting jobs instead of letting them time out.
+            # Leave the pool first, so a job queued once the queue is drained starts a new worker
+            self.last_error = str(e)
+            with self._lock:
+                self._threads = [t for t in self._threads if t is not threading.current_thread()]
+            while True:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job and job[-1].set_running_or_notify_cancel():
+                    job[-1].set_exception(e)
+
+    def _serve(self):
+        with sync_playwright() as p:
+            browser = p.chromium.launch()
+            context = None
+            renders = 0
+            last_check = time.monotonic()
+            while not self._stopping.is_set():
+                try:
+                    job = self._jobs.get(timeout=self.health_interval)
+                except queue.Empty:
+                    job = False
+
+                # Health check when idle or overdue: relaunch a dead browser
+                if job is False or time.monotonic() - last_check > self.health_interval:
+                    last_check = time.monotonic()
+                    if not browser.is_connected():
+                        browser = self._relaunch(p, browser)
+                        context, renders = None, 0
+                if job is False:
+                    continue
+                if job is None:
+                    break
+
+                html, assets, future = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if context is None or renders >= self.renders_per_context:
+                        if context is not None:
+                            context.close()
+                            self._count('context_recycles')
+                        context = browser.new_context()
+                        renders = 0
+                    page = context.new_page()
+                    try:
+                        if assets:
+                            page.route(lambda url: url in assets, _asset_handler(assets))
+                        page.set_content(html)
+                        pdf_bytes = page.pdf(format='A4', print_background=True)
+                    finally:
+                        page.close()
+                    renders += 1
+                    self._count('renders')
+                    future.set_result(pdf_bytes)
+                except Exception as e:
+                    self._count('failures')
+                    future.set_exception(e)
+                    # Start over with a fresh context, and a fresh browser if it crashed
+                    context = self._discard_context(context)
+                    if not browser.is_connected():
+                        browser = self._relaunch(p, browser)
+                    renders = 0
+            self._discard_context(context)
+            browser.close()
+
+    def _discard_context(self, context):
+        if context is not None:
+            try:
+                context.close()
+            except Exception:
+                pass
+        return None
+
+    def _relaunch(self, p, browser):
+        try:
+            browser.close()
+        except Exception:
+            pass
+        self._count('browser_restarts')
+        return p.chromium.launch()
+
+
+def _asset_handler(assets):
+    def handle(route):
+        body, content_type = assets[route.request.url]
+        route.fulfill(status=200, body=body, content_type=content_type)
+    return handle
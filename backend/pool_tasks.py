@@ -0,0 +1,219 @@
+import os
+import threading
+from collections import OrderedDict
+
+from chunked_ingest import ingest_chunked
+from cleaning_plan import CleaningPlan
+from dataset_cache import DatasetCache
+from dataset_store import (COLUMNAR_SUFFIX, columnar_available, is_columnar, read_dataset, stringify_mixed_columns,
+                           write_columnar, write_dataset)
+from dtype_compaction import compact_dtypes
+from dtype_inference import infer_column_dtype, subset_verdict
+from duplicate_index import DUPLICATE_INDEX_MAX_BYTES, DuplicateIndex
+from excel_ingest import EXCEL_CHUNK_ROWS, read_sheet
+from instrumentation import stage
+from profiler import derive_profile, preview_records, profile_dataframe
+
+# Jobs run by the WorkerPool, in worker processes or inline. They receive file paths and small
+# values and return small results, so DataFrames never cross a process boundary: each process
+# reads datasets itself (Parquet through a memory map) into its own frame cache.
+
+WORKER_DATASET_CACHE_MAX_BYTES = 256 * 1024 * 1024
+MAX_DUPLICATE_INDEXES = 4  # Per process; each one keeps its frame alive
+
+_settings = {
+    'excel_chunk_rows': EXCEL_CHUNK_ROWS,
+    'duplicate_index_max_bytes': DUPLICATE_INDEX_MAX_BYTES
+}
+_frames = DatasetCache(max_bytes=WORKER_DATASET_CACHE_MAX_BYTES)
+_indexes = OrderedDict()  # (path, mtime, size) -> DuplicateIndex
+_indexes_lock = threading.Lock()
+
+
+def configure(frames=None, excel_chunk_rows=EXCEL_CHUNK_ROWS, duplicate_index_max_bytes=DUPLICATE_INDEX_MAX_BYTES):
+    """Set this process's frame cache and options. The app passes its own DatasetCache
+    so jobs run inline share it; worker processes get a fresh one (init_worker)."""
+    global _frames
+    if frames is not None:
+        _frames = frames
+    _settings['excel_chunk_rows'] = excel_chunk_rows
+    _settings['duplicate_index_max_bytes'] = duplicate_index_max_bytes
+
+
+def init_worker(cache_max_bytes, excel_chunk_rows, duplicate_index_max_bytes):
+    configure(DatasetCache(max_bytes=cache_max_bytes), excel_chunk_rows, duplicate_index_max_bytes)
+
+
+def read(path):
+    return read_dataset(path, _settings['excel_chunk_rows'])
+
+
+def load(path):
+    """Parsed dataset from this process's cache, read from disk on a miss"""
+    with stage('load') as current:
+        return current.set_shape(_frames.get(path, read))
+
+
+def _file_key(path):
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def duplicate_index(path, df):
+    """DuplicateIndex of a dataset file's current contents, kept per file version; df is its frame"""
+    key = _file_key(path)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            index.df = df  # Same contents, possibly a frame reloaded after a cache eviction
+            return index
+        for stale in [k for k in _indexes if k[0] == key[0]]:
+            del _indexes[stale]
+        index = DuplicateIndex(df, max_bytes=_settings['duplicate_index_max_bytes'])
+        _indexes[key] = index
+        while len(_indexes) > MAX_DUPLICATE_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def _remember_duplicate_index(path, index):
+    with _indexes_lock:
+        _indexes[_file_key(path)] = index
+        while len(_indexes) > MAX_DUPLICATE_INDEXES:
+            _indexes.popitem(last=False)
+
+
+def _compact(df, compact):
+    if not compact:
+        return df, None
+    with stage('compact') as current:
+        return compact_dtypes(current.set_shape(df))
+
+
+def _read(path):
+    with stage('read') as current:
+        return current.set_shape(read(path))
+
+
+def _write(write, df, path):
+    with stage('write') as current:
+        current.set_shape(df)
+        return write(df, path)
+
+
+def ingest_dataset(filepath, store_columnar, chunked_min_bytes, chunk_rows, compact=False):
+    """Convert a saved upload for internal use. Returns (path to read the dataset from,
+    ingestion profile or None, compaction summary or None). Large CSV/JSON files are
+    converted to Parquet chunk by chunk and profiled on the way; workbooks are parsed once;
+    other files are converted when store_columnar is set. With compact, files stored as
+    Parquet keep compact dtypes (see dtype_compaction), so every later read is compact."""
+    ext = filepath.rsplit('.', 1)[-1].lower()
+    if (columnar_available() and ext in ('csv', 'json')
+            and os.path.getsize(filepath) >= chunked_min_bytes):
+        with stage('ingest_chunked') as current:
+            ingested = ingest_chunked(filepath, filepath + COLUMNAR_SUFFIX, chunk_rows, compact=compact)
+            current.rows, current.columns = ingested['profile']['rows'], ingested['profile']['columns']
+        return filepath + COLUMNAR_SUFFIX, ingested, ingested.pop('compaction', None)
+    if columnar_available() and ext in ('xls', 'xlsx'):
+        df, compaction = _compact(_read(filepath), compact)
+        return _write(write_columnar, df, filepath), None, compaction
+    if store_columnar:
+        df, compaction = _compact(_read(filepath), compact)
+        path = _write(write_dataset, df, filepath)
+        # Without Parquet the file is kept in its original format and read back with default dtypes
+        return path, None, compaction if is_columnar(path) else None
+    return filepath, None, None
+
+
+def _suggested_dtypes(df, dtype_cache):
+    return {col: infer_column_dtype(df[col], dtype_cache)['suggested'] for col in df.columns}
+
+
+def profile_dataset(path, dtype_cache):
+    """Everything an exact quality report needs for one dataset file.
+    dtype_cache holds the version's known dtype verdicts; the returned one adds new verdicts."""
+    df = load(path)
+    dtype_cache = dict(dtype_cache)
+    with stage('profile'):
+        profile = profile_dataframe(df, duplicate_index(path, df))
+    with stage('dtypes'):
+        suggested_dtypes = _suggested_dtypes(df, dtype_cache)
+    return {
+        'profile': profile,
+        'preview': preview_records(df),
+        'suggested_dtypes': suggested_dtypes,
+        'dtype_cache': dtype_cache
+    }
+
+
+def apply_cleaning_operations(df, config, dtype_cache=None, duplicate_index=None):
+    """Apply data cleaning operations based on configuration.
+    The input frame is left untouched. dtype_cache holds inference verdicts for the
+    unmodified dataset version; it is only consulted for columns still identical to it.
+    Returns (cleaned frame, the executed CleaningPlan with its kept rows and changed columns)."""
+    plan = CleaningPlan(config)
+    df_cleaned = plan.execute(
+        df,
+        lambda series, unchanged: infer_column_dtype(series, dtype_cache if unchanged else None)['suggested'],
+        duplicate_index=duplicate_index
+    )
+    return df_cleaned, plan
+
+
+def clean_dataset(path, config, dest_path, dtype_cache, base_profile):
+    """Clean one dataset file, store the result under dest_path and profile it.
+
+    base_profile is the exact profile of the input; the cleaned profile is
+    derived from it (see derive_profile) and row hashes and dtype verdicts
+    of the columns the plan left alone carry over. Returns the written path,
+    dtypes before and after, and the cleaned version's report inputs.
+    """
+    df = load(path)
+    dtype_cache = dict(dtype_cache)
+    with stage('clean') as current:
+        index = duplicate_index(path, df)
+        df_cleaned, plan = apply_cleaning_operations(df, config, dtype_cache=dtype_cache, duplicate_index=index)
+        current.set_shape(df_cleaned)
+    unchanged = [col for col in df_cleaned.columns if col not in plan.changed_columns]
+
+    cleaned_path = _write(write_dataset, df_cleaned, dest_path)
+    with stage('profile'):
+        cleaned_index = index.derive(df_cleaned, plan.kept_rows, unchanged)
+        if is_columnar(cleaned_path):
+            # Parquet round-trips dtypes, so the hashes also describe the file as it will be read back
+            _remember_duplicate_index(cleaned_path, cleaned_index)
+        profile = derive_profile(base_profile, df, df_cleaned, plan.kept_rows, plan.changed_columns, cleaned_index)
+
+    # Verdicts come from evenly spaced samples, so after rows were removed only the ones
+    # that hold for any selection of the values carry over (see subset_verdict)
+    if plan.kept_rows.all():
+        cleaned_dtype_cache = {col: dtype_cache[col] for col in unchanged if col in dtype_cache}
+    else:
+        cleaned_dtype_cache = {}
+        for col in unchanged:
+            verdict = subset_verdict(dtype_cache.get(col), df[col], df_cleaned[col])
+            if verdict is not None:
+                cleaned_dtype_cache[col] = verdict
+    with stage('dtypes'):
+        suggested_dtypes = _suggested_dtypes(df_cleaned, cleaned_dtype_cache)
+    return {
+        'path': cleaned_path,
+        'before_dtypes': df.dtypes.apply(lambda x: x.name).to_dict(),
+        'after_dtypes': df_cleaned.dtypes.apply(lambda x: x.name).to_dict(),
+        'before_dtype_cache': dtype_cache,
+        'profile': profile,
+        'preview': preview_records(df_cleaned),
+        'suggested_dtypes': suggested_dtypes,
+        'dtype_cache': cleaned_dtype_cache
+    }
+
+
+def convert_sheet(workbook, sheet, dest_path, compact=False):
+    """Parse one sheet of a workbook and store it as Parquet under dest_path.
+    Columns mixing numbers and text are stored as text, as the workbook itself
+    can't stand in for one of its sheets. Returns (path written, compaction summary or None)."""
+    with stage('read') as current:
+        df = current.set_shape(read_sheet(workbook, sheet, chunk_rows=_settings['excel_chunk_rows']))
+    df, compaction = _compact(df, compact)
+    return _write(write_columnar, stringify_mixed_columns(df), dest_path), compaction
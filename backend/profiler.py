@@ -0,0 +1,407 @@
+import numpy as np
+import pandas as pd
+
+from duplicate_index import DuplicateIndex
+
+# Quantiles needed by the report: winsorizing bounds, IQR bounds and the median
+PROFILE_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+
+def numeric_block(df):
+    """Numeric columns as one float64 (rows x columns) block with NaN for missing values"""
+    numeric_df = df.select_dtypes(include=['number'])
+    return list(numeric_df.columns), numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def numeric_profile(block):
+    """Per-column statistics of a numeric block, computed with one reduction per statistic
+    over the whole block and a single quantile call."""
+    n_cols = block.shape[1]
+    valid = ~np.isnan(block)
+    counts = valid.sum(axis=0)
+    has_values = counts > 0
+
+    filled = np.where(valid, block, 0.0)
+    sums = filled.sum(axis=0)
+    means = np.full(n_cols, np.nan)
+    np.divide(sums, counts, out=means, where=has_values)
+
+    deviations = np.where(valid, block - means, 0.0)
+    stds = np.full(n_cols, np.nan)
+    np.divide((deviations ** 2).sum(axis=0), counts - 1, out=stds, where=counts > 1)
+    np.sqrt(stds, out=stds)
+
+    mins = np.full(n_cols, np.nan)
+    maxs = np.full(n_cols, np.nan)
+    quantiles = np.full((len(PROFILE_QUANTILES), n_cols), np.nan)
+    if has_values.any():
+        present = block[:, has_values]
+        mins[has_values] = np.nanmin(present, axis=0)
+        maxs[has_values] = np.nanmax(present, axis=0)
+        quantiles[:, has_values] = np.nanquantile(present, PROFILE_QUANTILES, axis=0)
+
+    return {
+        'count': counts,
+        'mean': means,
+        'std': stds,
+        'min': mins,
+        'max': maxs,
+        'quantiles': dict(zip(PROFILE_QUANTILES, quantiles))
+    }
+
+
+def outlier_bounds(stats):
+    """(lower, upper) bound arrays per outlier method; values outside the bounds are outliers.
+    Bounds are NaN where a method doesn't apply (e.g. z-score with zero spread)."""
+    q = stats['quantiles']
+    iqr = q[0.75] - q[0.25]
+    std = np.where(stats['std'] > 0, stats['std'], np.nan)
+    return {
+        'winsorizing': (q[0.05], q[0.95]),
+        'iqr': (q[0.25] - 1.5 * iqr, q[0.75] + 1.5 * iqr),
+        'zscore': (stats['mean'] - 3 * std, stats['mean'] + 3 * std)
+    }
+
+
+def outlier_masks(block, stats):
+    """Boolean (rows x columns) masks for the winsorizing, IQR and z-score outlier rules.
+    NaN cells never count as outliers."""
+    with np.errstate(invalid='ignore'):
+        return {
+            method: (block < low) | (block > high)
+            for method, (low, high) in outlier_bounds(stats).items()
+        }
+
+
+def column_outlier_positions(series, method):
+    """Row positions of one column's outliers for one method, recomputed from the data"""
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan).reshape(-1, 1)
+    mask = outlier_masks(values, numeric_profile(values))[method][:, 0]
+    return np.flatnonzero(mask)
+
+
+def encode_ranges(positions):
+    """Run-length encode sorted row positions as [start, stop) pairs"""
+    if len(positions) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(positions) != 1) + 1
+    starts = positions[np.concatenate(([0], breaks))]
+    stops = positions[np.concatenate((breaks - 1, [len(positions) - 1]))] + 1
+    return np.column_stack((starts, stops)).tolist()
+
+
+def _scalar(value):
+    return None if np.isnan(value) else float(value)
+
+
+def _to_python(values):
+    return [_scalar(v) for v in values]
+
+
+def profile_dataframe(df, duplicate_index=None):
+    """Compute everything data_quality_report needs from shared masks and one numeric block.
+    duplicate_index is the frame's DuplicateIndex, if one is already cached."""
+    null_counts = df.isna().to_numpy().sum(axis=0)
+    column_memory = df.memory_usage(deep=True, index=False)
+
+    profile = {
+        'rows': len(df),
+        'columns': len(df.columns),
+        'memory_bytes': int(df.index.memory_usage(deep=True) + column_memory.sum()),
+        'column_memory': {col: int(n) for col, n in column_memory.items()},
+        'null_counts': {col: int(n) for col, n in zip(df.columns, null_counts) if n > 0},
+        'total_nulls': int(null_counts.sum()),
+        'duplicates': (duplicate_index or DuplicateIndex(df)).count(),
+        'numeric_columns': [],
+        'statistical_summary': {},
+        'outliers': {}
+    }
+    columns, summary, outliers = numeric_sections(df)
+    _set_numeric_sections(profile, columns, summary, outliers)
+    return profile
+
+
+def _json_values(series):
+    values = series.tolist()
+    for i in np.flatnonzero(series.isna().to_numpy()):
+        values[i] = None
+    return values
+
+
+def json_records(df):
+    """df.to_dict(orient="records") with missing values as None, built column by column
+    so the frame is never copied (as replace({np.nan: None}) would)"""
+    names = list(df.columns)
+    return [dict(zip(names, row)) for row in zip(*(_json_values(df.iloc[:, i]) for i in range(len(names))))]
+
+
+def preview_records(df):
+    """Preview data (first 5 rows) with NaN replaced by None"""
+    return json_records(df.head())
+
+
+def numeric_sections(df):
+    """Per-column summary statistics and outlier counts/bounds of df's numeric columns.
+    Returns (columns, {column: {'mean', 'std', 'min', 'max', 'median'}}, {column: outliers})."""
+    columns, block = numeric_block(df)
+    if not columns:
+        return columns, {}, {}
+
+    stats = numeric_profile(block)
+    values = {
+        'mean': _to_python(stats['mean']),
+        'std': _to_python(stats['std']),
+        'min': _to_python(stats['min']),
+        'max': _to_python(stats['max']),
+        'median': _to_python(stats['quantiles'][0.5])
+    }
+    summary = {col: {name: column_values[i] for name, column_values in values.items()} for i, col in enumerate(columns)}
+
+    # Only counts and bounds go into the report; row indices are fetched on demand
+    masks = outlier_masks(block, stats)
+    bounds = outlier_bounds(stats)
+    outliers = {
+        col: {
+            method: {
+                'count': int(masks[method][:, i].sum()),
+                'lower': _scalar(bounds[method][0][i]),
+                'upper': _scalar(bounds[method][1][i])
+            }
+            for method in masks
+        }
+        for i, col in enumerate(columns)
+    }
+    return columns, summary, outliers
+
+
+def _set_numeric_sections(profile, columns, summary, outliers):
+    profile['numeric_columns'] = columns
+    profile['outliers'] = {col: outliers[col] for col in columns}
+    if columns:
+        profile['statistical_summary'] = {
+            name: {col: summary[col][name] for col in columns} for name in ('mean', 'std', 'min', 'max', 'median')
+        }
+
+
+def derive_profile(base, before, after, kept_rows, changed_columns, duplicate_index=None):
+    """Profile of `after` computed incrementally from base, the profile of `before`
+    (a full profile is computed when base is missing or not an exact profile).
+
+    `after` must consist of before's rows where kept_rows is True, with every
+    column outside changed_columns holding the same values as in `before`.
+    Changed columns are profiled again. Unchanged columns keep their base
+    statistics when no row was dropped; otherwise their null counts are
+    corrected by the dropped rows alone and only their order statistics
+    (numeric summaries, outliers) and memory are recomputed, since those
+    can't be updated for removed rows.
+    """
+    if base is None or 'column_memory' not in base:
+        return profile_dataframe(after, duplicate_index)
+    all_kept = bool(kept_rows.all())
+    changed = [col for col in after.columns if col in changed_columns or col not in before.columns]
+    unchanged = [col for col in after.columns if col not in changed]
+
+    nulls = {col: base['null_counts'].get(col, 0) for col in unchanged}
+    if not all_kept and unchanged:
+        dropped_nulls = before[unchanged].iloc[np.flatnonzero(~kept_rows)].isna().sum()
+        nulls = {col: n - int(dropped_nulls[col]) for col, n in nulls.items()}
+    if changed:
+        nulls.update({col: int(n) for col, n in after[changed].isna().sum().items()})
+
+    if all_kept:
+        column_memory = {col: base['column_memory'][col] for col in unchanged}
+        if changed:
+            column_memory.update(after[changed].memory_usage(deep=True, index=False).items())
+    else:
+        column_memory = after.memory_usage(deep=True, index=False).to_dict()
+    column_memory = {col: int(column_memory[col]) for col in after.columns}
+
+    profile = {
+        'rows': len(after),
+        'columns': len(after.columns),
+        'memory_bytes': int(after.index.memory_usage(deep=True)) + sum(column_memory.values()),
+        'column_memory': column_memory,
+        'null_counts': {col: nulls[col] for col in after.columns if nulls[col] > 0},
+        'total_nulls': int(sum(nulls.values())),
+        'duplicates': (duplicate_index or DuplicateIndex(after)).count(),
+        'numeric_columns': [],
+        'statistical_summary': {},
+        'outliers': {}
+    }
+
+    columns = list(after.select_dtypes(include=['number']).columns)
+    reused = set(unchanged) if all_kept else set()
+    _, summary, outliers = numeric_sections(after[[col for col in columns if col not in reused]])
+    for col in columns:
+        if col in reused:
+            summary[col] = {name: values[col] for name, values in base['statistical_summary'].items()}
+            outliers[col] = base['outliers'][col]
+    _set_numeric_sections(profile, columns, summary, outliers)
+    return profile
+
+
+def _count_estimate(k, n, total, z):
+    """Scale a count of k hits in a sample of n rows to the population of `total` rows.
+    Returns (estimate, low, high) using a Wilson interval with finite population correction."""
+    if n == 0:
+        return 0, 0, total
+    p = k / n
+    if n >= total:
+        return k, k, k
+    # The correction enters as a larger effective sample size, so that like the plain
+    # Wilson interval it still reaches 0 when k is 0 (and total when k is n)
+    m = n * (total - 1) / (total - n)
+    denom = 1 + z ** 2 / m
+    center = (p + z ** 2 / (2 * m)) / denom
+    half = z * np.sqrt(p * (1 - p) / m + z ** 2 / (4 * m ** 2)) / denom
+    # Every hit in the sample is a hit in the population, and so is every miss
+    low = max(k, int(np.floor(max(center - half, 0.0) * total)))
+    high = min(total - (n - k), int(np.ceil(min(center + half, 1.0) * total)))
+    return int(round(p * total)), low, high
+
+
+def _quantile_bounds(sorted_values, p, z):
+    """Distribution-free confidence interval for the p-quantile from sample order statistics"""
+    m = len(sorted_values)
+    if m == 0:
+        return None, None
+    spread = z * np.sqrt(m * p * (1 - p))
+    lo = int(np.clip(np.floor(m * p - spread), 0, m - 1))
+    hi = int(np.clip(np.ceil(m * p + spread), 0, m - 1))
+    return float(sorted_values[lo]), float(sorted_values[hi])
+
+
+def _distinct_rows_estimate(row_hashes, total):
+    """Estimate the number of distinct rows from sampled row hashes (Haas-Stokes Duj1 estimator).
+    Returns (estimate, low, high). No sample-based estimator can bound this tightly, so the
+    range is the guaranteed one: every sampled value exists, and each unsampled row may be new."""
+    n = len(row_hashes)
+    _, counts = np.unique(row_hashes, return_counts=True)
+    seen = len(counts)
+    singletons = int((counts == 1).sum())
+    unseen_fraction = 1 - n / total
+    estimate = seen / (1 - unseen_fraction * singletons / n)
+    low, high = seen, seen + (total - n)
+    return min(max(estimate, low), high), low, high
+
+
+def sample_rows(df, sample_size, seed=0):
+    """Uniform random sample of rows without replacement, kept in their original order"""
+    if len(df) <= sample_size:
+        return df
+    positions = np.sort(np.random.default_rng(seed).choice(len(df), size=sample_size, replace=False))
+    return df.iloc[positions]
+
+
+def sample_profile(sample, total, z=1.96):
+    """profile_dataframe() for a frame of `total` rows, estimated from a uniform row sample.
+
+    Returns (profile, bounds). Counts are scaled to the full row count;
+    statistics come from the sample. bounds holds a [low, high] interval
+    (at the confidence given by z) for every estimate: Wilson intervals for
+    null and outlier counts, normal intervals for means and standard
+    deviations, order-statistic intervals for medians and the guaranteed
+    range for duplicate rows (whose estimate uses the Duj1 estimator). Sample minima and maxima only bound the true
+    extremes from one side, so the other end is None.
+    """
+    n = len(sample)
+    fpc = np.sqrt((total - n) / (total - 1)) if total > 1 else 0.0
+
+    index = DuplicateIndex(sample)
+    profile = profile_dataframe(sample, index)
+    profile['rows'] = total
+    profile['memory_bytes'] = int(profile['memory_bytes'] * total / n)
+    del profile['column_memory']  # Sample-sized, so not a base for derive_profile()
+    bounds = {'nulls': {}, 'total_nulls': [0, 0], 'duplicates': None,
+              'statistical_summary': {}, 'outliers': {}}
+
+    null_counts = {}
+    for col, k in profile['null_counts'].items():
+        estimate, low, high = _count_estimate(k, n, total, z)
+        null_counts[col] = estimate
+        bounds['nulls'][col] = [low, high]
+        bounds['total_nulls'][0] += low
+        bounds['total_nulls'][1] += high
+    profile['null_counts'] = null_counts
+    profile['total_nulls'] = sum(null_counts.values())
+
+    distinct, distinct_low, distinct_high = _distinct_rows_estimate(index.row_hashes(), total)
+    sample_duplicates = profile['duplicates']
+    profile['duplicates'] = int(round(max(total - distinct, sample_duplicates)))
+    bounds['duplicates'] = [
+        int(max(sample_duplicates, np.floor(total - distinct_high))),
+        int(np.ceil(total - distinct_low))
+    ]
+
+    columns = profile['numeric_columns']
+    if not columns:
+        return profile, bounds
+    _, block = numeric_block(sample)
+    stats = numeric_profile(block)
+    summary_bounds = {name: {} for name in ('mean', 'std', 'min', 'max', 'median')}
+    for i, col in enumerate(columns):
+        values = np.sort(block[:, i][~np.isnan(block[:, i])])
+        m = len(values)
+        mean, std = stats['mean'][i], stats['std'][i]
+        if m > 1 and std > 0:
+            # The spread of the sample std depends on the tails, so scale it by the sample kurtosis
+            kurtosis = np.mean(((values - mean) / std) ** 4)
+            mean_half = z * std / np.sqrt(m) * fpc
+            std_half = z * std * np.sqrt(max(kurtosis - 1, 0.0) / (4 * m)) * fpc
+        else:
+            mean_half = std_half = 0.0 if m > 1 else np.nan
+        mean_range = (mean - mean_half, mean + mean_half)
+        std_range = (max(std - std_half, 0.0), std + std_half)
+        quantile_ranges = {p: _quantile_bounds(values, p, z) for p in PROFILE_QUANTILES}
+        summary_bounds['mean'][col] = [_scalar(v) for v in mean_range]
+        summary_bounds['std'][col] = [_scalar(v) for v in std_range]
+        # The true minimum is at most the sample minimum, the true maximum at least the sample maximum
+        summary_bounds['min'][col] = [None, _scalar(stats['min'][i])]
+        summary_bounds['max'][col] = [_scalar(stats['max'][i]), None]
+        summary_bounds['median'][col] = list(quantile_ranges[0.5])
+
+        # Outlier counts are uncertain twice over: the fences are estimated too. Count the
+        # sample's outliers under the widest and narrowest plausible fences for the range.
+        fences = _fence_ranges(mean_range, std_range, quantile_ranges)
+        bounds['outliers'][col] = {}
+        for method, entry in profile['outliers'][col].items():
+            (wide_low, wide_high), (narrow_low, narrow_high) = fences[method]
+            fewest = _count_outside(values, wide_low, wide_high)
+            most = _count_outside(values, narrow_low, narrow_high)
+            entry['count'] = _count_estimate(entry['count'], n, total, z)[0]
+            bounds['outliers'][col][method] = [
+                _count_estimate(fewest, n, total, z)[1],
+                _count_estimate(most, n, total, z)[2]
+            ]
+    bounds['statistical_summary'] = summary_bounds
+    return profile, bounds
+
+
+def _fence_ranges(mean_range, std_range, quantile_ranges):
+    """Widest and narrowest (lower, upper) outlier fences per method, given ranges for their inputs"""
+    q05, q25, q75, q95 = (quantile_ranges[p] for p in (0.05, 0.25, 0.75, 0.95))
+    if q25[0] is None:
+        nan_fences = ((np.nan, np.nan), (np.nan, np.nan))
+        return {'winsorizing': nan_fences, 'iqr': nan_fences, 'zscore': nan_fences}
+    widest_iqr = q75[1] - q25[0]
+    narrowest_iqr = max(q75[0] - q25[1], 0.0)
+    return {
+        'winsorizing': ((q05[0], q95[1]), (q05[1], q95[0])),
+        'iqr': (
+            (q25[0] - 1.5 * widest_iqr, q75[1] + 1.5 * widest_iqr),
+            (q25[1] - 1.5 * narrowest_iqr, q75[0] + 1.5 * narrowest_iqr)
+        ),
+        'zscore': (
+            (mean_range[0] - 3 * std_range[1], mean_range[1] + 3 * std_range[1]),
+            (mean_range[1] - 3 * std_range[0], mean_range[0] + 3 * std_range[0])
+        ) if std_range[0] > 0 else ((np.nan, np.nan), (np.nan, np.nan))
+    }
+
+
+def _count_outside(sorted_values, low, high):
+    """Number of sorted values strictly below low or above high (none when a fence is NaN)"""
+    if np.isnan(low) or np.isnan(high):
+        return 0
+    below = np.searchsorted(sorted_values, low, side='left')
+    above = len(sorted_values) - np.searchsorted(sorted_values, high, side='right')
+    return int(below + above)
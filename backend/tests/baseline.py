@@ -0,0 +1,267 @@
+"""The original cleaning and quality report code, kept as the reference the
+optimized paths are checked against. Copied unchanged except where pandas 3
+removed an API: fillna(method=...) is written as ffill()/bfill(), and the
+debug print and logging are gone."""
+
+import numpy as np
+import pandas as pd
+
+
+def apply_cleaning_operations(df, config):
+    """Apply data cleaning operations based on configuration"""
+
+    # Handle duplicates
+    if config.get('duplicates') == 'delete':
+        df = df.drop_duplicates()
+
+    # Handle null values
+    nulls_config = config.get('nulls', {})
+    for column, null_action in nulls_config.items():
+        if column in df.columns:
+            action = null_action.get('action')
+            if action == 'delete_row':
+                df = df.dropna(subset=[column])
+            elif action == 'delete_column':
+                df = df.drop(columns=[column])
+            elif action == 'fill':
+                fill_method = null_action.get('fillMethod', 'specific')
+                fill_value = null_action.get('fillValue', '')
+                if fill_method == 'specific':
+                    df[column] = df[column].fillna(fill_value)
+                elif fill_method == 'mean':
+                    df[column] = df[column].fillna(df[column].mean())
+                elif fill_method == 'median':
+                    df[column] = df[column].fillna(df[column].median())
+                elif fill_method == 'mode':
+                    mode_val = df[column].mode()
+                    df[column] = df[column].fillna(mode_val.iloc[0] if not mode_val.empty else fill_value)
+                elif fill_method == 'forward':
+                    df[column] = df[column].ffill()
+                elif fill_method == 'backward':
+                    df[column] = df[column].bfill()
+
+    # Handle data type conversions
+    data_types_config = config.get('dataTypes', {})
+    for column, action in data_types_config.items():
+        if column in df.columns and action == 'convert':
+            suggested_type = get_suggested_dtype(df[column])
+            if suggested_type:
+                try:
+                    if suggested_type == 'numeric':
+                        df[column] = pd.to_numeric(df[column], errors='coerce')
+                    elif suggested_type == 'datetime':
+                        df[column] = pd.to_datetime(df[column], errors='coerce')
+                except:
+                    pass  # Keep original type if conversion fails
+
+    # Handle outlier cleaning
+    outlier_config = config.get('outliers', {})
+    for column, outlier_action in outlier_config.items():
+        if column in df.columns and pd.api.types.is_numeric_dtype(df[column]):
+            method = outlier_action.get('method', 'none')
+            action = outlier_action.get('action', 'none')
+            col_data = df[column]
+            if method == 'none' or action == 'none':
+                continue
+            if action == 'remove':
+                if method == 'winsorizing':
+                    q05 = col_data.quantile(0.05)
+                    q95 = col_data.quantile(0.95)
+                    mask = (col_data >= q05) & (col_data <= q95)
+                    df = df[mask]
+                elif method == 'iqr':
+                    q1 = col_data.quantile(0.25)
+                    q3 = col_data.quantile(0.75)
+                    iqr = q3 - q1
+                    iqr_low = q1 - 1.5 * iqr
+                    iqr_high = q3 + 1.5 * iqr
+                    mask = (col_data >= iqr_low) & (col_data <= iqr_high)
+                    df = df[mask]
+                elif method == 'zscore':
+                    mean = col_data.mean()
+                    std = col_data.std()
+                    if std > 0:
+                        z_scores = (col_data - mean) / std
+                        mask = z_scores.abs() <= 3
+                        df = df[mask]
+            elif action == 'cap':
+                if method == 'winsorizing':
+                    q05 = col_data.quantile(0.05)
+                    q95 = col_data.quantile(0.95)
+                    df[column] = col_data.clip(lower=q05, upper=q95)
+                elif method == 'iqr':
+                    q1 = col_data.quantile(0.25)
+                    q3 = col_data.quantile(0.75)
+                    iqr = q3 - q1
+                    iqr_low = q1 - 1.5 * iqr
+                    iqr_high = q3 + 1.5 * iqr
+                    df[column] = col_data.clip(lower=iqr_low, upper=iqr_high)
+                elif method == 'zscore':
+                    mean = col_data.mean()
+                    std = col_data.std()
+                    if std > 0:
+                        df[column] = col_data.clip(lower=mean - 3*std, upper=mean + 3*std)
+
+    return df
+
+
+def get_suggested_dtype(series):
+    # 1. Check for boolean dtype
+    if series.dtype == 'bool':
+        return None  # Already boolean, no suggestion needed
+    else:
+        # 2. Check for only two unique values (excluding NaN)
+        unique_vals = series.dropna().unique()
+        if len(unique_vals) == 2:
+            bool_sets = [
+                {True, False},
+                {1, 0},
+                {'yes', 'no'},
+                {'Yes', 'No'},
+                {'true', 'false'},
+                {'True', 'False'},
+                {'Y', 'N'},
+                {'y', 'n'}
+            ]
+            unique_set = set(unique_vals)
+            for bset in bool_sets:
+                if unique_set == bset:
+                    return 'boolean'
+    # 3. Check for numeric
+    if pd.api.types.is_numeric_dtype(series):
+        return None  # Already numeric, no suggestion needed
+    try:
+        pd.to_numeric(series)
+        return 'numeric'
+    except:
+        # 4. Check for datetime
+        try:
+            pd.to_datetime(series)
+            if not pd.api.types.is_datetime64_any_dtype(series):
+                return 'datetime'
+        except:
+            return None
+    return None
+
+
+def data_quality_report(df, filename):
+    """Generate a comprehensive data quality report"""
+    report = {
+        'filename': filename,
+        'dataset_info': {},
+        'preview': [],
+        'quality_metrics': {},
+        'nulls': {},
+        'duplicates': 0,
+        'suggested_dtypes': {},
+        'statistical_summary': {},
+        'data_quality_score': 0,
+        'outliers': {}  # <-- Add outliers key
+    }
+
+    try:
+        # Basic dataset info
+        report['dataset_info'] = {
+            'rows': len(df),
+            'columns': len(df.columns),
+            'memory_usage': f"{df.memory_usage(deep=True).sum() / 1024 / 1024:.2f} MB"
+        }
+
+        # Preview data (first 5 rows) with NaN replaced by None
+        preview_df = df.head().replace({np.nan: None})
+        report['preview'] = preview_df.to_dict(orient="records")
+
+        # Null values analysis
+        nulls = df.isnull().sum()
+        report['nulls'] = nulls[nulls > 0].to_dict()
+
+        # Calculate null percentage
+        total_cells = len(df) * len(df.columns)
+        null_percentage = (df.isnull().sum().sum() / total_cells) * 100 if total_cells > 0 else 0
+
+        # Duplicate analysis
+        duplicate_count = int(df.duplicated().sum())
+        report['duplicates'] = duplicate_count
+        duplicate_percentage = (duplicate_count / len(df)) * 100 if len(df) > 0 else 0
+
+        # Data type suggestions
+        suggested_dtypes = {}
+        for col in df.columns:
+            suggested_type = get_suggested_dtype(df[col])
+            if suggested_type:
+                suggested_dtypes[col] = suggested_type
+        report['suggested_dtypes'] = suggested_dtypes
+
+        # Statistical summary for numeric columns
+        numeric_cols = df.select_dtypes(include=['number']).columns
+        if len(numeric_cols) > 0:
+            numeric_df = df[numeric_cols]
+            report['statistical_summary'] = {
+                'mean': numeric_df.mean().to_dict(),
+                'std': numeric_df.std().to_dict(),
+                'min': numeric_df.min().to_dict(),
+                'max': numeric_df.max().to_dict(),
+                'median': numeric_df.median().to_dict()
+            }
+
+            # Outlier detection for each numeric column
+            for col in numeric_cols:
+                col_data = df[col].dropna()
+                outlier_info = {}
+                # Winsorizing (outside 5th/95th percentiles)
+                q05 = col_data.quantile(0.05)
+                q95 = col_data.quantile(0.95)
+                winsor_idx = col_data[(col_data < q05) | (col_data > q95)].index.tolist()
+                outlier_info['winsorizing'] = {
+                    'count': len(winsor_idx),
+                    'indices': winsor_idx
+                }
+                # IQR method
+                q1 = col_data.quantile(0.25)
+                q3 = col_data.quantile(0.75)
+                iqr = q3 - q1
+                iqr_low = q1 - 1.5 * iqr
+                iqr_high = q3 + 1.5 * iqr
+                iqr_idx = col_data[(col_data < iqr_low) | (col_data > iqr_high)].index.tolist()
+                outlier_info['iqr'] = {
+                    'count': len(iqr_idx),
+                    'indices': iqr_idx
+                }
+                # Z-score method (|z| > 3)
+                mean = col_data.mean()
+                std = col_data.std()
+                if std > 0:
+                    z_scores = (col_data - mean) / std
+                    z_idx = z_scores[abs(z_scores) > 3].index.tolist()
+                else:
+                    z_idx = []
+                outlier_info['zscore'] = {
+                    'count': len(z_idx),
+                    'indices': z_idx
+                }
+                report['outliers'][col] = outlier_info
+
+        # Quality metrics
+        report['quality_metrics'] = {
+            'null_percentage': round(null_percentage, 2),
+            'duplicate_percentage': round(duplicate_percentage, 2),
+            'data_types_optimized': len(suggested_dtypes) == 0
+        }
+
+        # Overall data quality score (0-100)
+        completeness_weight = 0.4
+        uniqueness_weight = 0.3
+        type_optimization_weight = 0.3
+
+        quality_score = (
+            (100 - null_percentage) * completeness_weight +
+            (100 - duplicate_percentage) * uniqueness_weight +
+            (100 if len(suggested_dtypes) == 0 else 70) * type_optimization_weight
+        )
+
+        report['data_quality_score'] = round(quality_score, 1)
+
+    except Exception as e:
+        report['error'] = f"Error generating report: {str(e)}"
+
+    return report
@@ -0,0 +1,68 @@
+"""Tests for the backend. Run from the backend directory: python -m pytest tests"""
+
+import io
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASETS_DIR = os.path.join(os.path.dirname(BACKEND_DIR), 'datasets')
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    """The app with uploads under tmp_path and worker pool jobs run inline"""
+    import app as app_module
+    upload_folder = str(tmp_path / 'uploads')
+    os.makedirs(upload_folder)
+    monkeypatch.setitem(app_module.app.config, 'UPLOAD_FOLDER', upload_folder)
+    monkeypatch.setattr(app_module.dataset_registry, 'upload_folder', upload_folder)
+    monkeypatch.setattr(app_module.worker_pool, 'workers', 0)
+    yield app_module
+    app_module.dataset_cache.clear()
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+BUNDLED_DATASETS = sorted(os.listdir(DATASETS_DIR))
+
+
+def load_bundled(name):
+    """A bundled dataset as the app parses it; skips the test for files it can't parse"""
+    from dataset_store import read_dataset
+    try:
+        return read_dataset(os.path.join(DATASETS_DIR, name))
+    except ValueError as e:
+        pytest.skip(f'{name} is not readable: {e}')
+
+
+def upload_bundled(client, name):
+    with open(os.path.join(DATASETS_DIR, name), 'rb') as f:
+        return client.post('/upload', data={'dataset': (f, name)}, content_type='multipart/form-data')
+
+
+def upload_frame(client, df, filename='data.csv'):
+    """Upload df as a CSV or JSON-records file and return the response"""
+    if filename.endswith('.json'):
+        body = df.to_json(orient='records').encode('utf-8')
+    else:
+        body = df.to_csv(index=False).encode('utf-8')
+    return client.post('/upload', data={'dataset': (io.BytesIO(body), filename)},
+                       content_type='multipart/form-data')
+
+
+@pytest.fixture
+def no_numeric_suggestion_for_datetimes(monkeypatch):
+    """Make the baseline skip datetime columns, the one intended difference in dtype suggestions:
+    the original suggested converting them to numbers"""
+    import baseline
+    get_suggested_dtype = baseline.get_suggested_dtype
+    monkeypatch.setattr(baseline, 'get_suggested_dtype', lambda series: (
+        None if pd.api.types.is_datetime64_any_dtype(series) else get_suggested_dtype(series)
+    ))
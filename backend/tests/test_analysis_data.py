@@ -0,0 +1,61 @@
+import base64
+
+import numpy as np
+import pandas as pd
+
+from analysis_engine import encode_column
+from conftest import upload_frame
+
+
+def null_mask(column, rows):
+    if column['nulls'] is None:
+        return [False] * rows
+    packed = np.frombuffer(base64.b64decode(column['nulls']), dtype=np.uint8)
+    return np.unpackbits(packed, bitorder='little')[:rows].astype(bool).tolist()
+
+
+def decode(column, rows):
+    return [None if null else value for value, null in zip(column['values'], null_mask(column, rows))]
+
+
+def test_column_is_dense_values_plus_a_null_bitmap():
+    encoded = encode_column(pd.Series([1.5, np.nan, np.inf, 4.0], name='x'))
+    assert encoded['values'] == [1.5, 0.0, 0.0, 4.0]
+    assert null_mask(encoded, 4) == [False, True, True, False]
+    assert encode_column(pd.Series([1, 2], name='n'))['nulls'] is None
+
+
+def test_window_matches_the_uploaded_rows(client):
+    df = pd.DataFrame({
+        'id': range(25),
+        'score': [np.nan if i % 4 == 0 else i / 2 for i in range(25)],
+        'label': [f'item {i % 3}' for i in range(25)]
+    })
+    assert upload_frame(client, df).status_code == 200
+    response = client.get('/analysis/data?columns=score&columns=label&offset=5&limit=10')
+    assert response.status_code == 200
+    payload = response.get_json()
+
+    assert (payload['total_rows'], payload['offset'], payload['row_count']) == (25, 5, 10)
+    assert payload['has_more'] and payload['null_encoding'] == 'base64-packbits-lsb'
+    assert [column['name'] for column in payload['columns']] == ['score', 'label']
+    window = df.iloc[5:15]
+    assert decode(payload['columns'][0], 10) == [None if pd.isna(v) else v for v in window['score']]
+    assert decode(payload['columns'][1], 10) == window['label'].tolist()
+
+    last = client.get('/analysis/data?offset=20&limit=10').get_json()
+    assert last['row_count'] == 5 and not last['has_more']
+    assert decode(last['columns'][0], 5) == list(range(20, 25))
+
+
+def test_page_size_is_capped(app_module, client, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, 'ANALYSIS_PAGE_MAX_ROWS', 4)
+    assert upload_frame(client, pd.DataFrame({'a': range(10)})).status_code == 200
+    payload = client.get('/analysis/data?limit=100').get_json()
+    assert payload['limit'] == 4 and payload['row_count'] == 4 and payload['has_more']
+
+
+def test_bad_parameters_are_rejected(client):
+    assert upload_frame(client, pd.DataFrame({'a': range(10)})).status_code == 200
+    for query in ('columns=missing', 'offset=x', 'offset=-1', 'limit=0'):
+        assert client.get(f'/analysis/data?{query}').status_code == 400, query
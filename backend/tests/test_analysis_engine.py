@@ -0,0 +1,257 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis_engine import aggregate_chart, correlation_matrix, lttb_indices, scatter_points
+from conftest import upload_frame
+from dtype_compaction import compact_dtypes
+
+AGGREGATIONS = {'sum': 'sum', 'average': 'mean', 'count': 'count'}
+
+
+def sales_frame(rows=500):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'region': rng.choice(['north', 'south', 'east', 'west'], rows).astype(object),
+        'channel': rng.choice(['online', 'store', 'phone'], rows).astype(object),
+        'amount': rng.normal(100, 30, rows).round(2),
+        'units': rng.integers(0, 20, rows)
+    })
+    df.loc[::11, 'region'] = None
+    df.loc[::7, 'amount'] = np.nan
+    return df
+
+
+def series(payload):
+    return dict(zip(payload['labels'], payload['datasets'][0]['data']))
+
+
+@pytest.mark.parametrize('aggregation', ['sum', 'average', 'count'])
+def test_category_aggregation_matches_groupby(aggregation):
+    df = sales_frame()
+    payload = aggregate_chart(df, 'bar', ['region', 'amount'], aggregation)
+    expected = df.dropna(subset=['region', 'amount']).groupby('region', sort=False)['amount'].agg(
+        AGGREGATIONS[aggregation])
+    assert payload['labels'] == expected.index.tolist()
+    np.testing.assert_allclose(payload['datasets'][0]['data'], expected.to_numpy())
+    assert payload['datasets'][0]['label'] == f'amount ({aggregation.capitalize()})'
+
+    # The numeric column may come first
+    assert series(aggregate_chart(df, 'pie', ['amount', 'region'], aggregation)) == series(payload)
+
+
+def test_single_column_counts_in_order_of_appearance():
+    df = sales_frame()
+    expected = df['region'].value_counts(sort=False)
+    payload = aggregate_chart(df, 'bar', ['region'])
+    assert payload['labels'] == df['region'].dropna().unique().tolist()
+    assert series(payload) == expected.to_dict()
+
+
+def test_sorted_top_n_keeps_the_largest_groups():
+    df = sales_frame()
+    totals = df.groupby('region')['amount'].sum()
+    payload = aggregate_chart(df, 'bar', ['region', 'amount'], 'sum', sort_order='desc', top=2)
+    assert payload['labels'] == totals.nlargest(2).index.tolist()
+    payload = aggregate_chart(df, 'bar', ['region', 'amount'], 'sum', sort_order='asc')
+    assert payload['labels'] == totals.sort_values().index.tolist()
+
+
+@pytest.mark.parametrize('aggregation', ['sum', 'average', 'count'])
+def test_grouped_aggregation_matches_a_pivot(aggregation):
+    df = sales_frame()
+    payload = aggregate_chart(df, 'groupedBar', ['region', 'channel', 'amount'], aggregation)
+    expected = (df.dropna(subset=['region', 'channel', 'amount'])
+                .groupby(['region', 'channel'])['amount'].agg(AGGREGATIONS[aggregation])
+                .unstack(fill_value=0))
+    assert sorted(payload['labels']) == sorted(expected.index)
+    assert sorted(dataset['label'] for dataset in payload['datasets']) == sorted(expected.columns)
+    for dataset in payload['datasets']:
+        column = expected[dataset['label']].reindex(payload['labels'])
+        np.testing.assert_allclose(dataset['data'], column.to_numpy(), err_msg=dataset['label'])
+
+
+def test_histogram_matches_numpy():
+    df = sales_frame()
+    payload = aggregate_chart(df, 'histogram', ['amount'], bins=12)
+    counts, edges = np.histogram(df['amount'].dropna(), bins=12)
+    assert payload['datasets'][0]['data'] == counts.tolist()
+    np.testing.assert_allclose(payload['bin_edges'], edges)
+
+
+@pytest.mark.filterwarnings('error::FutureWarning')
+@pytest.mark.parametrize('chart', [
+    ('bar', ['region']), ('bar', ['region', 'amount'], 'average'), ('pie', ['amount', 'region'], 'count'),
+    ('groupedBar', ['region', 'channel', 'amount'], 'sum', 'desc'), ('stackedBar', ['channel', 'region', 'units'])
+])
+def test_compacted_frame_only_charts_remaining_categories(chart):
+    df = sales_frame()
+    compacted = compact_dtypes(df)[0]
+    assert isinstance(compacted['region'].dtype, pd.CategoricalDtype)
+    # Filtering keeps every category in the dtype, as the cleaning steps do
+    keep = df['region'] != 'east'
+    filtered = compacted[keep.to_numpy()]
+    assert 'east' in filtered['region'].cat.categories
+
+    payload = aggregate_chart(filtered, *chart)
+    assert payload == aggregate_chart(df[keep], *chart)
+    assert 'east' not in payload['labels']
+    assert 'east' not in [dataset['label'] for dataset in payload['datasets']]
+
+
+@pytest.mark.filterwarnings('error::FutureWarning')
+def test_aggregate_after_deleting_rows_of_a_category(client):
+    df = sales_frame()
+    df.loc[df['region'] == 'east', 'amount'] = np.nan
+    assert upload_frame(client, df).status_code == 200
+    response = client.post('/clean-data', json={'nulls': {'amount': {'action': 'delete_row'}}})
+    assert response.status_code == 200
+
+    remaining = df.dropna(subset=['amount'])
+    for chart_type, columns in (('bar', ['region']), ('bar', ['region', 'amount']),
+                                ('groupedBar', ['region', 'channel', 'units'])):
+        response = client.post('/analysis/aggregate', json={'type': chart_type, 'columns': columns})
+        assert response.status_code == 200
+        assert response.get_json()['labels'] == aggregate_chart(remaining, chart_type, columns)['labels']
+        assert 'east' not in response.get_json()['labels']
+
+
+@pytest.mark.parametrize('args', [
+    ('bar', []), ('bar', ['missing']), ('bar', ['region', 'amount'], 'median'), ('line', ['region', 'amount']),
+    ('groupedBar', ['region', 'amount'])
+])
+def test_bad_chart_specs_are_rejected(args):
+    with pytest.raises(ValueError):
+        aggregate_chart(sales_frame(), *args)
+
+
+def test_aggregate_endpoint_validates_columns(client):
+    assert upload_frame(client, sales_frame()).status_code == 200
+    response = client.post('/analysis/aggregate', json={'type': 'bar', 'columns': ['region', 'amount']})
+    assert response.status_code == 200
+    assert series(response.get_json()) == series(aggregate_chart(sales_frame(), 'bar', ['region', 'amount']))
+
+    for columns in ('region', [1, 2], [], None, ['region', 'missing']):
+        response = client.post('/analysis/aggregate', json={'type': 'bar', 'columns': columns})
+        assert response.status_code == 400, columns
+
+
+def measurements_frame(rows=400):
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=rows)
+    df = pd.DataFrame({
+        'x': x,
+        'y': 2 * x + rng.normal(size=rows),
+        'z': np.exp(x) + rng.normal(scale=0.1, size=rows),
+        'ties': rng.integers(0, 5, rows).astype(float),
+        'label': rng.choice(['a', 'b'], rows)
+    })
+    # Different missing rows per column, so pairs share only part of their values
+    df.loc[::5, 'x'] = np.nan
+    df.loc[::7, 'y'] = np.nan
+    df.loc[3::9, 'z'] = np.nan
+    df.loc[::4, 'ties'] = np.nan
+    return df
+
+
+@pytest.mark.parametrize('method', ['pearson', 'spearman'])
+def test_correlation_matches_pandas_with_missing_values(method):
+    df = measurements_frame()
+    result = correlation_matrix(df, method)
+    numeric = df.select_dtypes(include=['number'])
+    assert result['columns'] == list(numeric.columns)
+    np.testing.assert_allclose(result['matrix'], numeric.corr(method=method).to_numpy(), atol=1e-12)
+    mask = numeric.notna().to_numpy(dtype=np.int64)
+    np.testing.assert_array_equal(result['observations'], mask.T @ mask)
+
+
+def test_unsupported_correlation_method(client):
+    with pytest.raises(ValueError):
+        correlation_matrix(measurements_frame(), 'kendall')
+    assert upload_frame(client, measurements_frame()).status_code == 200
+    assert client.get('/analysis/correlation?method=kendall').status_code == 400
+    assert client.get('/analysis/correlation?method=spearman').status_code == 200
+
+
+def reference_lttb(x, y, threshold):
+    """Plain-loop Largest-Triangle-Three-Buckets, following Steinarsson's reference code"""
+    n = len(x)
+    buckets = threshold - 2
+    selected, prev = [0], 0
+    for i in range(buckets):
+        start, end = i * (n - 2) // buckets + 1, (i + 1) * (n - 2) // buckets + 1
+        next_end = min((i + 2) * (n - 2) // buckets + 1, n)
+        avg_x = sum(x[end:next_end]) / (next_end - end)
+        avg_y = sum(y[end:next_end]) / (next_end - end)
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[prev] - avg_x) * (y[j] - y[prev]) - (x[prev] - x[j]) * (avg_y - y[prev]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        prev = best
+    return selected + [n - 1]
+
+
+@pytest.mark.parametrize('n,threshold', [(1000, 100), (1000, 3), (101, 100), (32, 24), (5000, 777)])
+def test_lttb_keeps_one_point_per_bucket(n, threshold):
+    rng = np.random.default_rng(2)
+    x = np.sort(rng.uniform(0, 100, n))
+    y = np.sin(x) + rng.normal(scale=0.3, size=n)
+    keep = lttb_indices(x, y, threshold)
+
+    assert len(keep) == threshold
+    assert keep[0] == 0 and keep[-1] == n - 1
+    assert np.all(np.diff(keep) > 0)
+    # Each interior point comes from its own bucket of the n - 2 interior points
+    buckets = threshold - 2
+    for i, index in enumerate(keep[1:-1]):
+        assert i * (n - 2) // buckets + 1 <= index < (i + 1) * (n - 2) // buckets + 1
+    assert keep.tolist() == reference_lttb(x.tolist(), y.tolist(), threshold)
+
+
+@pytest.mark.parametrize('threshold', [0, 2, 50, 60])
+def test_lttb_returns_every_point_when_nothing_to_drop(threshold):
+    x = np.arange(50, dtype=float)
+    assert lttb_indices(x, x, threshold).tolist() == list(range(50))
+
+
+def scatter_frame(rows=3000):
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({'x': rng.normal(size=rows), 'y': rng.normal(size=rows)})
+    df.loc[::13, 'x'] = np.nan
+    df.loc[::17, 'y'] = np.inf
+    return df
+
+
+def test_scatter_drops_missing_points_and_downsamples_in_x_order():
+    df = scatter_frame()
+    valid = df[np.isfinite(df['x']) & np.isfinite(df['y'])].sort_values('x', kind='stable')
+
+    payload = scatter_points(df, 'x', 'y', mode='auto', max_points=len(valid))
+    assert payload['mode'] == 'all' and payload['total_points'] == len(valid)
+    assert payload['x'] == valid['x'].tolist() and payload['y'] == valid['y'].tolist()
+
+    for mode in ('auto', 'lttb'):
+        payload = scatter_points(df, 'x', 'y', mode=mode, max_points=500)
+        assert payload['mode'] == 'lttb' and payload['returned_points'] == 500
+        keep = lttb_indices(valid['x'].to_numpy(), valid['y'].to_numpy(), 500)
+        assert payload['x'] == valid['x'].to_numpy()[keep].tolist()
+        assert payload['y'] == valid['y'].to_numpy()[keep].tolist()
+
+
+def test_scatter_density_matches_histogram2d():
+    df = scatter_frame()
+    valid = df[np.isfinite(df['x']) & np.isfinite(df['y'])]
+    payload = scatter_points(df, 'x', 'y', mode='density', bins=20)
+    counts, x_edges, y_edges = np.histogram2d(valid['x'], valid['y'], bins=20)
+
+    np.testing.assert_allclose(payload['x_edges'], x_edges)
+    np.testing.assert_allclose(payload['y_edges'], y_edges)
+    assert len(payload['cells']) == np.count_nonzero(counts)
+    assert sum(cell['count'] for cell in payload['cells']) == payload['total_points'] == len(valid)
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    for cell in payload['cells']:
+        i = int(np.argmin(np.abs(x_centers - cell['x'])))
+        j = int(np.argmin(np.abs((y_edges[:-1] + y_edges[1:]) / 2 - cell['y'])))
+        assert cell['count'] == counts[i, j]
@@ -0,0 +1,52 @@
+import json
+
+import pandas as pd
+import pytest
+
+from benchmarks.__main__ import main
+from benchmarks.measure import compare
+from benchmarks.synthetic import parse_scale, synthetic_frame
+
+
+def test_scale_specs_are_parsed():
+    assert parse_scale('100000x12') == (100000, 12, 'mixed')
+    assert parse_scale('500X3:numeric') == (500, 3, 'numeric')
+    with pytest.raises(ValueError):
+        parse_scale('100x3:images')
+
+
+def test_synthetic_frames_are_reproducible():
+    df = synthetic_frame(500, 12)
+    pd.testing.assert_frame_equal(df, synthetic_frame(500, 12))
+    assert df.shape == (500, 12) and df.isna().any().any() and df.duplicated().any()
+    numeric = synthetic_frame(100, 6, 'numeric')
+    assert all(pd.api.types.is_numeric_dtype(numeric[col]) for col in numeric.columns)
+
+
+def case(case_id, median, memory=10 * 1024 * 1024):
+    return {'id': case_id, 'status': 'ok', 'wall_time_s': {'median': median}, 'peak_memory_bytes': memory}
+
+
+def test_comparison_flags_changes_beyond_the_tolerance():
+    baseline = {'results': [case('slower', 1.0), case('faster', 1.0), case('noise', 0.001), case('bigger', 1.0),
+                            case('gone', 1.0)]}
+    results = {'results': [case('slower', 1.5), case('faster', 0.5), case('noise', 0.002),
+                           case('bigger', 1.0, 20 * 1024 * 1024), case('added', 1.0)]}
+    statuses = {row['id']: row['status'] for row in compare(results, baseline)}
+    assert statuses == {'slower': 'regression', 'faster': 'improvement', 'noise': 'ok', 'bigger': 'regression',
+                        'added': 'new', 'gone': 'missing'}
+
+
+def test_run_is_saved_and_compared_with_the_baseline(app_module, tmp_path, capsys):
+    args = ['--scale', '300x6', '--no-bundled', '--repeat', '1', '--only', 'report/profile_dataframe',
+            '--only', 'api/cleaning', '--output', str(tmp_path / 'latest.json'),
+            '--baseline', str(tmp_path / 'baseline.json')]
+    assert main(args + ['--save-baseline']) == 0
+    results = json.loads((tmp_path / 'baseline.json').read_text())
+    assert [result['id'] for result in results['results']] == [
+        'report/profile_dataframe[synthetic-300x6-mixed]', 'api/cleaning[synthetic-300x6-mixed]'
+    ]
+    assert all(result['status'] == 'ok' for result in results['results'])
+
+    assert main(args + ['--time-tolerance', '1000', '--memory-tolerance', '1000']) == 0
+    assert 'Compared with' in capsys.readouterr().out
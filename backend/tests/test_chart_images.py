@@ -0,0 +1,78 @@
+import base64
+
+import pandas as pd
+import pytest
+
+from chart_images import ASSET_URL_PREFIX, ChartImageStore, image_id_for
+from conftest import upload_frame
+
+PNG = base64.b64encode(b'\x89PNG fake chart').decode('ascii')
+
+
+def test_images_are_stored_once_by_content_hash():
+    store = ChartImageStore()
+    image_id = store.put(PNG)
+    assert image_id == image_id_for(PNG)
+    assert store.put(f'data:image/png;base64,{PNG}') == image_id
+    assert image_id in store and store.get(image_id) == PNG
+    assert store.get('unknown') is None
+    assert store.stats()['images'] == 1
+    with pytest.raises(ValueError):
+        store.put('not base64!')
+
+
+def test_least_recently_used_image_is_evicted_beyond_the_budget():
+    images = [base64.b64encode(bytes([i]) * 30).decode('ascii') for i in range(3)]
+    store = ChartImageStore(max_bytes=2 * len(images[0]))
+    first, second = store.put(images[0]), store.put(images[1])
+    store.get(first)
+    third = store.put(images[2])
+    assert first in store and third in store and second not in store
+    assert store.stats()['evictions'] == 1
+
+
+def export(client, charts, report_format='html'):
+    return client.post('/export', json={
+        'reportFormat': report_format,
+        'includedSections': {'visualisations': True},
+        'charts': charts
+    })
+
+
+@pytest.fixture
+def cleaned(client):
+    assert upload_frame(client, pd.DataFrame({'a': [1, 2, 3]})).status_code == 200
+    assert client.post('/clean-data', json={}).status_code == 200
+    return client
+
+
+def test_exports_refer_to_stored_images_by_id(cleaned):
+    first = export(cleaned, [{'title': 'A', 'image_base64': PNG}])
+    assert first.status_code == 200
+    assert f'data:image/png;base64,{PNG}' in first.get_data(as_text=True)
+
+    again = export(cleaned, [{'title': 'A', 'image_id': image_id_for(PNG)}])
+    assert again.status_code == 200
+    assert f'data:image/png;base64,{PNG}' in again.get_data(as_text=True)
+
+
+def test_unknown_and_malformed_images_are_rejected(cleaned):
+    response = export(cleaned, [{'image_id': 'a' * 64}, {'image_id': 'b' * 64}])
+    assert response.status_code == 409
+    assert response.get_json()['missing_image_ids'] == ['a' * 64, 'b' * 64]
+    assert export(cleaned, [{'image_base64': 'not base64!'}]).status_code == 400
+
+
+def test_pdf_render_fetches_stored_images_by_url(app_module, cleaned, monkeypatch):
+    renders = []
+
+    def render(html, assets=None, timeout=None):
+        renders.append((html, assets))
+        return b'%PDF'
+
+    monkeypatch.setattr(app_module.pdf_renderer, 'render', render)
+    assert export(cleaned, [{'title': 'A', 'image_base64': PNG}], 'pdf').status_code == 200
+    html, assets = renders[0]
+    url = f'{ASSET_URL_PREFIX}{image_id_for(PNG)}.png'
+    assert url in html and PNG not in html
+    assert assets == {url: (base64.b64decode(PNG), 'image/png')}
@@ -0,0 +1,128 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from chunked_ingest import ingest_chunked, iter_json_items
+from dataset_store import read_columnar
+from duplicate_index import DuplicateIndex
+from profiler import profile_dataframe
+
+pytest.importorskip('pyarrow')
+
+CHUNK_ROWS = 7
+
+
+def frame(rows=40):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'id': range(rows),
+        'group': [f'g{i % 3}' for i in range(rows)],
+        'amount': rng.normal(10, 3, rows).round(2),
+        # Whole numbers in the first chunk, fractions later: read as int64, then float64
+        'score': [i if i < CHUNK_ROWS else i + 0.5 for i in range(rows)]
+    })
+    df.loc[[3, 20, 21], 'amount'] = np.nan
+    df.loc[30, 'amount'] = 500.0
+    # Duplicates of rows in earlier chunks
+    return pd.concat([df, df.iloc[[1, 5, 12]]], ignore_index=True)
+
+
+def test_json_items_are_split_across_read_blocks(tmp_path):
+    records = [{'a': i, 'text': 'comma, ] and "quotes" [', 'nested': {'x': [i, {'y': None}]}} for i in range(20)]
+    path = tmp_path / 'data.json'
+    path.write_text('\n [ ' + ',\n'.join(json.dumps(r) for r in records) + ' ]\n', encoding='utf-8')
+    assert [json.loads(item) for item in iter_json_items(str(path), read_chars=5)] == records
+
+
+@pytest.mark.parametrize('text', ['{"a": 1}', '[{"a": 1}, {"a": ', '[{"a": 1} {"a": 2}'])
+def test_malformed_json_is_rejected(tmp_path, text):
+    path = tmp_path / 'data.json'
+    path.write_text(text, encoding='utf-8')
+    with pytest.raises(ValueError):
+        list(iter_json_items(str(path), read_chars=4))
+
+
+@pytest.mark.parametrize('filename', ['data.csv', 'data.json'])
+def test_chunked_profile_matches_a_full_read(tmp_path, filename):
+    src = str(tmp_path / filename)
+    if filename.endswith('.csv'):
+        frame().to_csv(src, index=False)
+        full = pd.read_csv(src)
+    else:
+        frame().to_json(src, orient='records')
+        full = pd.read_json(src, orient='records')
+    dest = src + '.parquet'
+    ingested = ingest_chunked(src, dest, CHUNK_ROWS)
+
+    stored = read_columnar(dest)
+    assert ingested['columns'] == list(full.columns)
+    assert stored['score'].dtype == np.float64
+    pd.testing.assert_frame_equal(stored, full, check_dtype=False)
+
+    profile, expected = ingested['profile'], profile_dataframe(full)
+    for key in ('rows', 'columns', 'null_counts', 'total_nulls', 'duplicates', 'numeric_columns', 'outliers'):
+        assert profile[key] == expected[key], key
+    for stat, values in expected['statistical_summary'].items():
+        assert profile['statistical_summary'][stat] == pytest.approx(values), stat
+    assert profile['duplicates'] == 3
+
+
+@pytest.mark.parametrize('filename', ['data.csv', 'data.json'])
+def test_chunked_duplicates_treat_signed_zeros_and_nans_alike(tmp_path, filename):
+    # Rows repeating earlier ones in later chunks, with -0.0 for 0.0 or a missing value
+    df = pd.DataFrame({
+        'x': [0.0, np.nan, 1.5, 2.0] * 5 + [-0.0, np.nan, 1.5, -0.0],
+        'y': ['a', 'b', None, 'd'] * 5 + ['a', 'b', None, 'a'],
+        'z': [1.0, np.nan, -0.0, 3.0] * 5 + [1.0, np.nan, 0.0, 1.0]
+    })
+    src = str(tmp_path / filename)
+    if filename.endswith('.csv'):
+        df.to_csv(src, index=False)
+        full = pd.read_csv(src)
+    else:
+        # to_json() writes -0.0 as 0.0
+        records = df.astype(object).where(df.notna(), None).to_dict('records')
+        with open(src, 'w') as f:
+            json.dump(records, f)
+        full = pd.read_json(src, orient='records')
+    assert np.signbit(full['x']).any()
+
+    ingested = ingest_chunked(src, src + '.parquet', CHUNK_ROWS)
+    assert ingested['profile']['duplicates'] == DuplicateIndex(full).count() == full.duplicated().sum() == 20
+
+
+def test_text_after_an_empty_chunk_keeps_missing_values(tmp_path):
+    # The first chunk reads the column as float64 (all NaN), later ones as text
+    df = pd.DataFrame({'id': range(30), 'note': [None] * CHUNK_ROWS + ['a', None] * 11 + ['b']})
+    src = str(tmp_path / 'data.csv')
+    df.to_csv(src, index=False)
+    ingested = ingest_chunked(src, src + '.parquet', CHUNK_ROWS)
+
+    stored = read_columnar(src + '.parquet')['note']
+    assert stored.isna().tolist() == df['note'].isna().tolist()
+    assert stored.dropna().tolist() == df['note'].dropna().tolist()
+    assert ingested['profile']['null_counts'] == {'note': int(df['note'].isna().sum())}
+
+
+def test_streamed_upload_is_ingested_in_chunks(app_module, client, monkeypatch):
+    body = frame().to_csv(index=False).encode('utf-8')
+    monkeypatch.setitem(app_module.app.config, 'INGEST_CHUNKED_MIN_BYTES', 0)
+    monkeypatch.setitem(app_module.app.config, 'INGEST_CHUNK_ROWS', CHUNK_ROWS)
+    assert client.put('/upload/stream?filename=data.csv', data=body).status_code == 200
+    chunked = client.get('/cleaning').get_json()
+
+    monkeypatch.setitem(app_module.app.config, 'INGEST_CHUNKED_MIN_BYTES', len(body) + 1)
+    assert client.put('/upload/stream?filename=data.csv', data=body).status_code == 200
+    full = client.get('/cleaning').get_json()
+    for key in ('dataset_info', 'nulls', 'duplicates', 'outliers', 'statistical_summary', 'quality_metrics'):
+        if key == 'dataset_info':
+            assert chunked[key]['rows'] == full[key]['rows'] and chunked[key]['columns'] == full[key]['columns']
+        else:
+            assert chunked[key] == full[key], key
+
+
+def test_empty_streamed_upload_is_rejected(client):
+    assert client.put('/upload/stream?filename=data.csv', data=b'').status_code == 400
+    assert client.put('/upload/stream?filename=data.exe', data=b'a\n1\n').status_code == 400
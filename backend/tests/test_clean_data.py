@@ -0,0 +1,43 @@
+import pandas as pd
+
+import dtype_inference
+import pool_tasks
+from conftest import upload_frame
+from test_dtype_compaction import frame_with_missing_text
+
+
+def test_chunk_ingested_upload_is_not_profiled_again(app_module, client, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, 'INGEST_CHUNKED_MIN_BYTES', 0)
+    profiled = []
+    profile_dataset = pool_tasks.profile_dataset
+    monkeypatch.setattr(pool_tasks, 'profile_dataset', lambda *args: profiled.append(args) or profile_dataset(*args))
+
+    assert upload_frame(client, frame_with_missing_text()).status_code == 200
+    report = client.get('/cleaning?mode=fast').get_json()
+    assert report['nulls'] == {'cabin': 134, 'port': 58}
+    assert 'approximate' not in report
+
+    response = client.post('/clean-data', json={'nulls': {'cabin': {'action': 'delete_row'}}})
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result['before']['nulls'] == report['nulls']
+    assert result['before']['data_quality_score'] == report['data_quality_score']
+    assert result['after']['nulls'] == {'port': 38}
+    assert profiled == []
+
+
+def test_dtype_verdicts_carry_over_when_rows_are_removed(client, monkeypatch):
+    df = frame_with_missing_text()
+    df['joined'] = pd.date_range('2020-01-01', periods=len(df), freq='D').strftime('%Y-%m-%d')
+    df.loc[0, 'cabin'] = 'C0'  # A datetime verdict only carries over while the first date is kept
+    assert upload_frame(client, df).status_code == 200
+    assert client.get('/cleaning').get_json()['suggested_dtypes'] == {'joined': 'datetime'}
+
+    inferred = []
+    infer_dtype = dtype_inference.infer_dtype
+    monkeypatch.setattr(dtype_inference, 'infer_dtype', lambda series: inferred.append(series.name) or infer_dtype(series))
+    response = client.post('/clean-data', json={'nulls': {'cabin': {'action': 'delete_row'}}})
+    assert response.status_code == 200
+    assert 'joined' not in inferred
+    assert client.get('/cleaning').get_json()['suggested_dtypes'] == {'joined': 'datetime'}
+    assert 'joined' not in inferred
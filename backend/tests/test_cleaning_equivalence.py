@@ -0,0 +1,85 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import baseline
+from conftest import BUNDLED_DATASETS, load_bundled
+from dtype_compaction import compact_dtypes
+from pool_tasks import apply_cleaning_operations
+
+pytestmark = pytest.mark.filterwarnings('ignore::UserWarning')
+
+CONFIGS_PER_DATASET = 6
+
+
+def random_config(df, rng):
+    """A cleaning configuration touching a random selection of the columns"""
+    nulls = {}
+    for col in df.columns:
+        if df[col].isna().any() and rng.random() < 0.6:
+            action = rng.choice(['delete_row', 'delete_column', 'fill', 'fill', 'fill'])
+            spec = {'action': action}
+            if action == 'fill':
+                numeric = pd.api.types.is_numeric_dtype(df[col])
+                spec['fillMethod'] = rng.choice(['specific', 'mode', 'forward', 'backward']
+                                                + (['mean', 'median'] if numeric else []))
+                spec['fillValue'] = 0 if numeric else 'missing'
+            nulls[col] = spec
+    outliers = {
+        col: {'method': rng.choice(['winsorizing', 'iqr', 'zscore', 'none']),
+              'action': rng.choice(['remove', 'cap', 'none'])}
+        for col in df.select_dtypes('number').columns if rng.random() < 0.5
+    }
+    return {
+        'duplicates': rng.choice(['delete', 'keep']),
+        'nulls': nulls,
+        'dataTypes': {col: 'convert' for col in df.columns if rng.random() < 0.5},
+        'outliers': outliers
+    }
+
+
+def messy_frame(rows=3000):
+    """Nulls, blank strings and mixed types, as JSON uploads and spreadsheets produce them"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'amount': pd.Series([f'{v:.2f}' for v in rng.normal(100, 30, rows)], dtype=object),
+        'day': pd.Series([f'2024-03-{i % 28 + 1:02d}' for i in range(rows)], dtype=object),
+        'code': pd.Series([i if i % 3 else f'X-{i}' for i in range(rows)], dtype=object),
+        'label': pd.Series(rng.choice(['a', 'b', 'c'], rows), dtype=object),
+        'count': rng.integers(0, 50, rows),
+        'score': rng.normal(0, 1, rows)
+    })
+    df.loc[::10, ['amount', 'day']] = ''
+    df.loc[5::40, ['amount', 'code', 'label']] = None
+    df.loc[7::25, 'score'] = np.nan
+    df.loc[::500, 'score'] = 40.0
+    return pd.concat([df, df.iloc[:100]], ignore_index=True)  # Some duplicate rows
+
+
+def values(df):
+    return {col: [None if pd.isna(value) else value for value in df[col].tolist()] for col in df.columns}
+
+
+def check_configs(df, seed):
+    compacted = compact_dtypes(df)[0]
+    rng = random.Random(seed)
+    for _ in range(CONFIGS_PER_DATASET):
+        config = random_config(df, rng)
+        expected = baseline.apply_cleaning_operations(df.copy(), config)
+        cleaned = apply_cleaning_operations(df, config)[0]
+        pd.testing.assert_frame_equal(cleaned, expected, obj=str(config))
+        # Uploads are stored compacted; the cleaned values must still be the same
+        cleaned = apply_cleaning_operations(compacted, config)[0]
+        assert cleaned.index.equals(expected.index), config
+        assert values(cleaned) == values(expected), config
+
+
+@pytest.mark.parametrize('name', BUNDLED_DATASETS)
+def test_cleaning_matches_the_baseline(name):
+    check_configs(load_bundled(name), name)
+
+
+def test_cleaning_messy_columns_matches_the_baseline():
+    check_configs(messy_frame(), 0)
@@ -0,0 +1,72 @@
+import os
+
+import pandas as pd
+
+from conftest import upload_frame
+from dataset_cache import DatasetCache
+
+
+def write_csv(path, rows):
+    pd.DataFrame({'a': range(rows)}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_unchanged_file_is_parsed_once(tmp_path):
+    path = write_csv(tmp_path / 'a.csv', 10)
+    cache, calls = DatasetCache(), []
+
+    def loader(filepath):
+        calls.append(filepath)
+        return pd.read_csv(filepath)
+
+    first = cache.get(path, loader)
+    assert cache.get(path, loader) is first
+    assert calls == [path]
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_rewritten_file_replaces_the_stale_entry(tmp_path):
+    path = write_csv(tmp_path / 'a.csv', 10)
+    cache = DatasetCache()
+    assert len(cache.get(path, pd.read_csv)) == 10
+
+    write_csv(path, 20)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert len(cache.get(path, pd.read_csv)) == 20
+    assert cache.stats()['entries'] == 1
+
+    cache.invalidate(path)
+    assert cache.stats()['entries'] == 0 and cache.stats()['current_bytes'] == 0
+
+
+def test_least_recently_used_frame_is_evicted_beyond_the_budget(tmp_path):
+    paths = [write_csv(tmp_path / f'{name}.csv', 1000) for name in 'abc']
+    nbytes = int(pd.read_csv(paths[0]).memory_usage(deep=True).sum())
+    cache = DatasetCache(max_bytes=2 * nbytes)
+    first = cache.get(paths[0], pd.read_csv)
+    cache.get(paths[1], pd.read_csv)
+    cache.get(paths[0], pd.read_csv)
+    cache.get(paths[2], pd.read_csv)
+
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['evictions'] == 1
+    assert stats['current_bytes'] <= stats['max_bytes']
+    assert cache.get(paths[0], pd.read_csv) is first
+    assert cache.stats()['misses'] == 3
+
+
+def test_frame_larger_than_the_budget_is_still_cached(tmp_path):
+    path = write_csv(tmp_path / 'a.csv', 1000)
+    cache = DatasetCache(max_bytes=1)
+    first = cache.get(path, pd.read_csv)
+    assert cache.get(path, pd.read_csv) is first
+    assert cache.stats()['entries'] == 1
+
+
+def test_upload_replaces_the_cached_frame(app_module, client):
+    assert upload_frame(client, pd.DataFrame({'a': [1, 2, 3]})).status_code == 200
+    assert client.get('/cleaning').get_json()['dataset_info']['rows'] == 3
+    assert upload_frame(client, pd.DataFrame({'a': [1, 2]})).status_code == 200
+    assert client.get('/cleaning').get_json()['dataset_info']['rows'] == 2
+    assert client.get('/health').get_json()['dataset_cache']['entries'] == 1
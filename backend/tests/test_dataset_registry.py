@@ -0,0 +1,43 @@
+import os
+
+import pandas as pd
+
+from conftest import upload_frame
+from dataset_registry import DatasetRegistry
+
+
+def test_idle_datasets_are_evicted_with_their_folder(tmp_path):
+    removed = []
+    registry = DatasetRegistry(str(tmp_path), max_idle_seconds=60, on_remove=removed.append)
+    idle, active = registry.create('a.csv'), registry.create('b.csv')
+    idle.last_used -= 120
+
+    assert registry.evict_idle() == [idle]
+    assert removed == [idle]
+    assert registry.get(idle.dataset_id) is None
+    assert not os.path.exists(idle.folder)
+    assert registry.get(active.dataset_id) is active
+    assert registry.stats()['evictions'] == 1
+
+
+def test_least_recently_used_dataset_is_evicted_beyond_the_limit(tmp_path):
+    registry = DatasetRegistry(str(tmp_path), max_datasets=2)
+    first, second = registry.create('a.csv'), registry.create('b.csv')
+    registry.get(first.dataset_id)
+    third = registry.create('c.csv')
+
+    assert registry.get(second.dataset_id) is None
+    assert not os.path.exists(second.folder)
+    assert [registry.get(r.dataset_id) for r in (first, third)] == [first, third]
+
+
+def test_abandoned_session_dataset_is_removed(app_module, client, monkeypatch):
+    assert upload_frame(client, pd.DataFrame({'a': [1, 2, 3]})).status_code == 200
+    assert client.get('/cleaning').status_code == 200
+    with client.session_transaction() as session:
+        record = app_module.dataset_registry.get(session['dataset_id'])
+    monkeypatch.setattr(app_module.dataset_registry, 'max_idle_seconds', 0)
+
+    assert client.get('/cleaning').status_code == 400
+    assert not os.path.exists(record.folder)
+    assert app_module.dataset_registry.get_artifact(record.dataset_id, 'quality_report') is None
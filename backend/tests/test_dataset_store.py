@@ -0,0 +1,60 @@
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import upload_frame
+from dataset_store import display_ext, display_name, materialize_original, read_columnar, write_dataset
+
+pytest.importorskip('pyarrow')
+
+
+def frame():
+    return pd.DataFrame({
+        'when': pd.to_datetime(['2024-01-01', '2024-02-01', None]),
+        'count': pd.array([1, None, 3], dtype='Int64'),
+        'label': ['a', 'b', 'c']
+    })
+
+
+def test_internal_names_are_hidden():
+    assert display_name('/x/cleaned_sales.csv.parquet') == 'cleaned_sales.csv'
+    assert display_name('/x/sales.json') == 'sales.json'
+    assert display_ext('/x/cleaned_sales.xlsx.parquet') == 'xlsx'
+
+
+def test_parquet_round_trip_keeps_dtypes(tmp_path):
+    df = frame()
+    path = write_dataset(df, str(tmp_path / 'data.csv'))
+    assert path.endswith('data.csv.parquet')
+    pd.testing.assert_frame_equal(read_columnar(path), df)
+    pd.testing.assert_frame_equal(read_columnar(path, ['label', 'missing', 'when']), df[['label', 'when']])
+
+
+def test_unencodable_frame_is_written_in_the_original_format(tmp_path):
+    df = pd.DataFrame({'mixed': [1, 'two', 3.5]})
+    path = str(tmp_path / 'data.json')
+    assert write_dataset(df, path) == path
+    assert not os.path.exists(path + '.parquet')
+    assert pd.read_json(path, orient='records')['mixed'].tolist() == [1, 'two', 3.5]
+
+
+def test_original_format_is_written_once_per_version(tmp_path):
+    path = write_dataset(frame(), str(tmp_path / 'data.csv'))
+    original = materialize_original(path)
+    assert original == str(tmp_path / 'data.csv')
+    mtime = os.stat(original).st_mtime_ns
+    assert materialize_original(path) == original
+    assert os.stat(original).st_mtime_ns == mtime
+    assert pd.read_csv(original)['label'].tolist() == ['a', 'b', 'c']
+
+
+def test_cleaned_download_is_converted_back_to_the_upload_format(client):
+    df = pd.DataFrame({'a': [3, 1, 2, 1], 'b': ['x', 'y', 'z', 'y']})
+    assert upload_frame(client, df).status_code == 200
+    assert client.post('/clean-data', json={'duplicates': 'delete'}).status_code == 200
+
+    response = client.get('/download-cleaned')
+    assert response.status_code == 200
+    assert 'cleaned_data.csv' in response.headers['Content-Disposition']
+    assert response.get_data(as_text=True) == df.drop_duplicates().to_csv(index=False)
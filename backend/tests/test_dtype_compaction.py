@@ -0,0 +1,57 @@
+import base64
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import upload_frame
+from dtype_compaction import compact_dtypes
+
+
+def frame_with_missing_text(rows=400):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'id': np.arange(rows),
+        'cabin': [f'C{i}' for i in range(rows)],  # Unique: stays text
+        'port': rng.choice(['S', 'C', 'Q'], rows).astype(object),  # Few values: becomes categorical
+        'fare': rng.uniform(0, 100, rows)
+    })
+    df.loc[::3, 'cabin'] = None
+    df.loc[::7, 'port'] = np.nan
+    df['cabin'] = df['cabin'].astype(object)
+    return df
+
+
+def values(series):
+    return [None if pd.isna(value) else value for value in series.tolist()]
+
+
+def test_compact_dtypes_keeps_missing_text():
+    df = frame_with_missing_text()
+    compacted, summary = compact_dtypes(df)
+    assert isinstance(compacted['port'].dtype, pd.CategoricalDtype)
+    assert set(summary['columns']) >= {'id', 'cabin', 'port'}
+    assert compacted.isna().sum().to_dict() == df.isna().sum().to_dict()
+    for col in ('cabin', 'port'):
+        assert values(compacted[col]) == values(df[col])
+
+
+@pytest.mark.parametrize('filename', ['data.csv', 'data.json'])
+@pytest.mark.parametrize('chunked', [False, True])
+def test_upload_keeps_null_counts(app_module, client, monkeypatch, filename, chunked):
+    if chunked:
+        monkeypatch.setitem(app_module.app.config, 'INGEST_CHUNKED_MIN_BYTES', 0)
+        monkeypatch.setitem(app_module.app.config, 'INGEST_CHUNK_ROWS', 150)
+    df = frame_with_missing_text()
+    assert upload_frame(client, df, filename).status_code == 200
+
+    report = client.get('/cleaning').get_json()
+    assert report['nulls'] == {'cabin': 134, 'port': 58}
+
+    page = client.get('/analysis/data?columns=cabin&columns=port&limit=10').get_json()
+    for column in page['columns']:
+        nulls = np.unpackbits(np.frombuffer(base64.b64decode(column['nulls']), np.uint8),
+                              bitorder='little')[:page['row_count']].astype(bool)
+        expected = df[column['name']].head(10)
+        assert nulls.tolist() == expected.isna().tolist()
+        assert [v for v, null in zip(column['values'], nulls) if not null] == expected.dropna().tolist()
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import baseline
+from conftest import BUNDLED_DATASETS, load_bundled
+from dtype_inference import INFERENCE_SAMPLE_SIZE, infer_dtype, subset_verdict
+
+# pd.to_datetime warns about parsing element by element in the baseline
+pytestmark = pytest.mark.filterwarnings('ignore::UserWarning')
+
+
+def with_blanks(values):
+    series = pd.Series(values, dtype=object)
+    series.iloc[::10] = ''
+    series.iloc[5::50] = None
+    return series
+
+
+@pytest.mark.parametrize('values, suggested', [
+    ([str(i * 1.5) for i in range(3000)], 'numeric'),
+    ([f'2024-01-{i % 28 + 1:02d}' for i in range(3000)], 'datetime'),
+])
+def test_blank_strings_do_not_block_a_conversion(values, suggested):
+    series = with_blanks(values)
+    assert len(series.dropna()) > INFERENCE_SAMPLE_SIZE
+    assert baseline.get_suggested_dtype(series) == suggested
+    assert infer_dtype(series)['suggested'] == suggested
+
+
+def test_unparseable_value_outside_the_sample_is_found():
+    series = pd.Series([str(i) for i in range(5000)], dtype=object)
+    series.iloc[1] = 'n/a'  # Between two evenly spaced sample positions
+    assert baseline.get_suggested_dtype(series) is None
+    assert infer_dtype(series)['suggested'] is None
+
+
+@pytest.mark.parametrize('name', BUNDLED_DATASETS)
+def test_suggestions_match_the_baseline(name):
+    df = load_bundled(name)
+    for col in df.columns:
+        assert infer_dtype(df[col])['suggested'] == baseline.get_suggested_dtype(df[col]), col
+
+
+@pytest.mark.parametrize('column', [
+    with_blanks([str(i * 1.5) for i in range(3000)]),
+    with_blanks([f'2024-01-{i % 28 + 1:02d}' for i in range(3000)]),
+    pd.Series(['13/01/2020', '01/02/2020', '25/12/2020'] * 400, dtype=object),
+    pd.Series([1, 0, 2, None] * 300, dtype=object),
+    pd.Series(['1', '2', 'x'] * 400, dtype=object)
+])
+def test_subset_verdict_matches_inferring_the_subset(column):
+    verdict = infer_dtype(column)
+    rng = np.random.default_rng(0)
+    subsets = [column.iloc[1:], column.iloc[:2], column.iloc[:0], column[column != '']]
+    subsets += [column[rng.random(len(column)) < share] for share in (0.01, 0.5, 0.99)]
+    for subset in subsets:
+        carried = subset_verdict(verdict, column, subset)
+        if carried is not None:
+            assert carried == infer_dtype(subset)
+
+
+def test_subset_verdict_leaves_edge_cases_to_inference():
+    dates = pd.Series(['13/01/2020', '01/02/2020', '25/12/2020'], dtype=object)
+    assert infer_dtype(dates)['suggested'] == 'datetime'
+    # The day-first format is only guessed from the first value
+    assert subset_verdict(infer_dtype(dates), dates, dates.iloc[1:]) is None
+    assert subset_verdict(infer_dtype(dates), dates, dates.iloc[[0, 2]]) == infer_dtype(dates)
+
+    numbers = pd.Series([1, 0, 2, None], dtype=object)
+    assert infer_dtype(numbers)['suggested'] == 'numeric'
+    assert subset_verdict(infer_dtype(numbers), numbers, numbers.iloc[:2]) is None
+    assert subset_verdict(infer_dtype(numbers), numbers, numbers.iloc[1:]) == infer_dtype(numbers)
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import upload_frame
+from duplicate_index import DuplicateIndex
+
+
+def frame():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'a': rng.integers(0, 3, 300),
+        'b': rng.choice([0.0, -0.0, 1.5, np.nan], 300),
+        'c': rng.choice(['x', 'y', None], 300)
+    })
+    return df
+
+
+@pytest.mark.parametrize('keep', ['first', 'last', False])
+@pytest.mark.parametrize('columns', [None, ['a'], ['b', 'c'], ['c', 'a', 'b']])
+def test_duplicates_match_pandas(columns, keep):
+    df = frame()
+    index = DuplicateIndex(df)
+    expected = df.duplicated(subset=columns, keep=keep).to_numpy()
+    np.testing.assert_array_equal(index.duplicated(columns, keep), expected)
+    np.testing.assert_array_equal(index.positions(columns, keep), np.flatnonzero(expected))
+    assert index.count(columns) == df.duplicated(subset=columns).sum()
+
+
+def test_derived_index_reuses_unchanged_column_hashes():
+    df = frame()
+    index = DuplicateIndex(df)
+    index.row_hashes(['a', 'b'])
+    keep = (df['a'] != 0).to_numpy()
+    kept = df[keep].assign(c='z')
+    derived = index.derive(kept, keep, ['a', 'b'])
+
+    assert set(derived._column_hashes) == {'a', 'b'} and list(derived._row_hashes) == [('a', 'b')]
+    for columns in (None, ['a', 'b'], ['c']):
+        np.testing.assert_array_equal(derived.duplicated(columns), kept.duplicated(subset=columns).to_numpy())
+
+
+def test_hashes_beyond_the_budget_are_not_cached():
+    index = DuplicateIndex(frame(), max_bytes=0)
+    assert index.count() == frame().duplicated().sum()
+    assert index.nbytes == 0
+
+
+def test_duplicate_rows_are_paged_on_demand(client):
+    df = frame()
+    assert upload_frame(client, df).status_code == 200
+    assert client.get('/cleaning').get_json()['duplicates'] == df.duplicated().sum()
+
+    page = client.get('/cleaning/duplicates?columns=a&columns=c&keep=none&limit=5').get_json()
+    expected = df.index[df.duplicated(subset=['a', 'c'], keep=False)].tolist()
+    assert page['count'] == len(expected) and page['items'] == expected[:5] and page['has_more']
+    for query in ('keep=all', 'format=csv', 'columns=missing', 'offset=x'):
+        assert client.get(f'/cleaning/duplicates?{query}').status_code == 400, query
+
+
+def test_nans_hash_alike_whatever_their_sign_bit():
+    with np.errstate(invalid='ignore'):
+        negative_nan = np.float64(np.inf) - np.inf
+    assert np.signbit(negative_nan)
+    df = pd.DataFrame({'a': [np.nan, negative_nan, -0.0, 0.0], 'b': [1, 1, 2, 2]})
+    assert DuplicateIndex(df).count() == df.duplicated().sum() == 2
@@ -0,0 +1,33 @@
+import io
+
+import pandas as pd
+
+
+def workbook_bytes(sheets):
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    return buffer.getvalue()
+
+
+def test_select_sheet_with_mixed_type_column(client):
+    first = pd.DataFrame({'a': [1, 2, 3]})
+    mixed = pd.DataFrame({
+        'code': [101, 'A-7', 103, None, 'B-2'],  # Numbers and text in one column
+        'amount': [1.5, 2.0, None, 4.25, 5.0]
+    })
+    body = workbook_bytes({'First': first, 'Mixed': mixed})
+    response = client.post('/upload', data={'dataset': (io.BytesIO(body), 'book.xlsx')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+
+    response = client.post('/upload/sheet', json={'sheet': 'Mixed'})
+    assert response.status_code == 200, response.get_json()
+    assert client.get('/upload/sheets').get_json()['selected'] == 'Mixed'
+
+    report = client.get('/cleaning').get_json()
+    assert report['dataset_info']['rows'] == 5
+    assert report['nulls'] == {'code': 1, 'amount': 1}
+    page = client.get('/analysis/data?columns=code').get_json()
+    assert page['columns'][0]['values'] == ['101', 'A-7', '103', '', 'B-2']
@@ -0,0 +1,53 @@
+import os
+import re
+import threading
+import time
+
+import pandas as pd
+
+from conftest import DATASETS_DIR, upload_frame
+
+
+def rendered_count(html, label):
+    match = re.search(rf'data-type-label">{label}</div>\s*<div class="data-type-count">(\d+)<', html)
+    return int(match.group(1))
+
+
+def test_export_counts_compacted_text_columns_as_categorical(client):
+    df = pd.read_csv(os.path.join(DATASETS_DIR, 'titanic.csv'))
+    assert upload_frame(client, df, 'titanic.csv').status_code == 200
+    assert client.post('/clean-data', json={}).status_code == 200
+
+    response = client.post('/export', json={'reportFormat': 'html', 'includedSections': {'overview': True}})
+    assert response.status_code == 200
+    html = response.get_data(as_text=True)
+    assert rendered_count(html, 'Categorical') == 5  # Name, Sex, Ticket, Cabin, Embarked
+    assert rendered_count(html, 'Numerical') == 6
+
+
+def test_export_job_of_a_removed_dataset_is_cancelled(app_module, client, monkeypatch):
+    assert upload_frame(client, pd.DataFrame({'a': [1, 2, 3]})).status_code == 200
+    started, release, jobs = threading.Event(), threading.Event(), []
+    build_export = app_module.build_export
+
+    def blocking_build_export(record, data, progress=None):
+        jobs.append(progress.__self__)
+        started.set()
+        release.wait(30)
+        return build_export(record, data, progress)
+
+    monkeypatch.setattr(app_module, 'build_export', blocking_build_export)
+    response = client.post('/export/jobs', json={'reportFormat': 'html'})
+    assert response.status_code == 202
+    assert started.wait(30)
+    with client.session_transaction() as session:
+        record = app_module.dataset_registry.get(session['dataset_id'])
+    assert client.post('/reset').status_code == 200
+    release.set()
+
+    job = jobs[0]
+    deadline = time.monotonic() + 30
+    while job.status not in ('done', 'failed', 'cancelled') and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job.status == 'cancelled'
+    assert not os.path.exists(record.folder)
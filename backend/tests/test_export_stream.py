@@ -0,0 +1,54 @@
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+
+from conftest import upload_frame
+from export_stream import iter_csv_chunks, iter_file_chunks, stream_zip
+
+
+def frame(rows=10):
+    return pd.DataFrame({'a': range(rows), 'b': [f'text, "{i}"' for i in range(rows)], 'c': [i / 4 for i in range(rows)]})
+
+
+@pytest.mark.parametrize('rows', [0, 1, 10])
+def test_csv_chunks_join_to_the_full_csv(rows):
+    df = frame(rows)
+    chunks = list(iter_csv_chunks(df, 3))
+    assert len(chunks) == max(1, -(-rows // 3))
+    assert b''.join(chunks).decode('utf-8') == df.to_csv(index=False)
+
+
+def test_file_chunks_join_to_the_file(tmp_path):
+    path = tmp_path / 'data.bin'
+    path.write_bytes(bytes(range(256)) * 3)
+    chunks = list(iter_file_chunks(str(path), 100))
+    assert max(len(chunk) for chunk in chunks) == 100
+    assert b''.join(chunks) == path.read_bytes()
+
+
+def test_streamed_zip_is_a_valid_archive():
+    big = [bytes([i]) * 100000 for i in range(5)]
+    chunks = list(stream_zip([('report.html', b'<html></html>'), ('data.csv', iter(big))]))
+    assert len(chunks) > 2
+    with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as zf:
+        assert zf.namelist() == ['report.html', 'data.csv']
+        assert zf.read('report.html') == b'<html></html>'
+        assert zf.read('data.csv') == b''.join(big)
+        assert zf.getinfo('data.csv').compress_type == zipfile.ZIP_DEFLATED
+
+
+@pytest.mark.parametrize('filename', ['data.csv', 'data.json'])
+def test_export_zip_holds_the_cleaned_data_as_csv(app_module, client, monkeypatch, filename):
+    monkeypatch.setitem(app_module.app.config, 'EXPORT_CSV_CHUNK_ROWS', 3)
+    df = frame()
+    assert upload_frame(client, df, filename).status_code == 200
+    assert client.post('/clean-data', json={}).status_code == 200
+
+    response = client.post('/export', json={'reportFormat': 'html', 'downloadCleaned': True})
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as zf:
+        report, data = zf.namelist()
+        assert report.endswith('.html') and data.endswith('.csv')
+        pd.testing.assert_frame_equal(pd.read_csv(zf.open(data)), df)
@@ -0,0 +1,29 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from flask import Flask
+
+import http_encoding
+from http_encoding import FastJSONProvider
+
+pytestmark = pytest.mark.skipif(http_encoding.orjson is None, reason='orjson is not installed')
+
+PAYLOAD = {'b': np.int64(2), 'a': [np.float64('nan'), 1.5], 'when': pd.NaT, 'ok': np.bool_(True)}
+
+
+@pytest.mark.parametrize('debug', [False, True])
+def test_responses_are_encoded_with_orjson_in_debug_mode_too(monkeypatch, debug):
+    app = Flask(__name__)
+    app.debug = debug
+    app.json = FastJSONProvider(app)
+    encoded = []
+    dumps = http_encoding.orjson.dumps
+    monkeypatch.setattr(http_encoding.orjson, 'dumps', lambda *a, **kw: encoded.append(a) or dumps(*a, **kw))
+
+    with app.app_context():
+        body = app.json.response(PAYLOAD).get_data(as_text=True)
+    assert encoded
+    assert json.loads(body) == {'a': [None, 1.5], 'b': 2, 'ok': True, 'when': None}
+    assert body.startswith('{\n  "a"') == debug
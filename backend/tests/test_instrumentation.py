@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pandas as pd
+
+import instrumentation
+from conftest import upload_frame
+from instrumentation import Metrics, SamplingProfiler, Trace, server_timing, write_folded
+
+
+def test_nested_and_recorded_stages_are_named_after_the_open_stage():
+    trace = Trace()
+    token = instrumentation.activate(trace)
+    try:
+        with instrumentation.stage('clean_dataset'):
+            with instrumentation.stage('load') as stage:
+                stage.set_shape(pd.DataFrame({'a': [1, 2, 3]}))
+            instrumentation.record([{'name': 'write', 'seconds': 0.25, 'rows': None, 'columns': None}])
+    finally:
+        instrumentation.deactivate(token)
+
+    assert [stage.name for stage in trace.stages] == ['clean_dataset.load', 'clean_dataset.write', 'clean_dataset']
+    assert (trace.stages[0].rows, trace.stages[0].columns) == (3, 1)
+    header = server_timing(trace)
+    assert header.startswith('clean_dataset.load;dur=')
+    assert 'clean_dataset.load;dur=' in header and ';desc="3x1"' in header
+    assert 'clean_dataset.write;dur=250.0' in header and ', total;dur=' in header
+
+
+def test_stages_outside_a_trace_are_not_recorded():
+    assert instrumentation.current_trace() is None
+    with instrumentation.stage('load') as stage:
+        stage.set_shape(pd.DataFrame({'a': [1]}))
+    instrumentation.record([{'name': 'write', 'seconds': 1.0, 'rows': None, 'columns': None}])
+    assert stage.rows == 1
+
+
+def test_metrics_are_rendered_in_the_prometheus_text_format():
+    metrics = Metrics(prefix='test', buckets=(0.1, 1))
+    metrics.increment('events_total', 'Events', kind='a "quoted" \\ value')
+    metrics.increment('events_total', 'Events', 2, kind='b')
+    for seconds in (0.05, 0.5, 5):
+        metrics.observe('duration_seconds', 'Durations', seconds, endpoint='/x')
+    metrics.add_collector('cache', lambda: {'entries': 3, 'hit_ratio': 0.5, 'name': 'x', 'enabled': True},
+                          'Cache')
+    metrics.add_collector('broken', lambda: 1 / 0, 'Broken')
+
+    lines = metrics.render().splitlines()
+    assert '# TYPE test_events_total counter' in lines
+    assert 'test_events_total{kind="a \\"quoted\\" \\\\ value"} 1' in lines
+    assert 'test_events_total{kind="b"} 2' in lines
+    assert '# TYPE test_duration_seconds histogram' in lines
+    assert [line for line in lines if line.startswith('test_duration_seconds')] == [
+        'test_duration_seconds_bucket{endpoint="/x",le="0.1"} 1',
+        'test_duration_seconds_bucket{endpoint="/x",le="1.0"} 2',
+        'test_duration_seconds_bucket{endpoint="/x",le="+Inf"} 3',
+        'test_duration_seconds_sum{endpoint="/x"} 5.55',
+        'test_duration_seconds_count{endpoint="/x"} 3'
+    ]
+    assert 'test_cache_entries 3' in lines and 'test_cache_hit_ratio 0.5' in lines
+    assert not [line for line in lines if line.startswith(('test_cache_name', 'test_cache_enabled', 'test_broken'))]
+
+
+def busy_wait(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_profiler_samples_the_stacks_of_a_thread(tmp_path):
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_wait, args=(stop,))
+    thread.start()
+    profiler = SamplingProfiler(interval=0.001)
+    session = profiler.start(thread.ident)
+    time.sleep(0.2)
+    stacks = profiler.stop(session)
+    stop.set()
+    thread.join()
+
+    assert session.samples > 0 and sum(stacks.values()) == session.samples
+    assert all('busy_wait (test_instrumentation.py:' in stack for stack in stacks)
+    path = write_folded(stacks, str(tmp_path / 'profiles' / 'request.folded'))
+    lines = open(path).read().splitlines()
+    assert len(lines) == len(stacks) and all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+
+
+def test_requests_report_stage_timings_and_metrics(client):
+    assert upload_frame(client, pd.DataFrame({'a': [1, 2, 2, None]})).status_code == 200
+    response = client.post('/clean-data', json={'duplicates': 'delete'})
+    assert response.status_code == 200
+    timing = response.headers['Server-Timing']
+    assert 'clean_dataset.load;dur=' in timing and 'clean_dataset.clean;dur=' in timing
+
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'app_requests_total{endpoint="/clean-data",method="POST",status="200"}' in text
+    assert 'app_stage_duration_seconds_count{endpoint="/clean-data",stage="clean_dataset.clean"}' in text
+    assert 'app_dataset_cache_entries' in text and 'app_worker_pool_' in text
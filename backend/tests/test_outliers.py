@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from conftest import upload_frame
+from profiler import encode_ranges
+
+
+def outlier_frame():
+    rng = np.random.default_rng(0)
+    values = rng.normal(50, 5, 400)
+    values[[3, 4, 5, 90, 250]] = [150, 160, -80, 140, 155]
+    values[[10, 20]] = np.nan
+    return pd.DataFrame({'value': values, 'label': ['x'] * 400})
+
+
+def expected_outliers(series):
+    """Outlier row labels per method, computed with plain pandas as the original report did"""
+    col = series.dropna()
+    q05, q25, q75, q95 = col.quantile([0.05, 0.25, 0.75, 0.95])
+    iqr = q75 - q25
+    z = (col - col.mean()) / col.std()
+    return {
+        'winsorizing': col[(col < q05) | (col > q95)].index.tolist(),
+        'iqr': col[(col < q25 - 1.5 * iqr) | (col > q75 + 1.5 * iqr)].index.tolist(),
+        'zscore': col[z.abs() > 3].index.tolist()
+    }
+
+
+def test_ranges_are_runs_of_positions():
+    assert encode_ranges(np.array([], dtype=int)) == []
+    assert encode_ranges(np.array([3, 4, 5, 9, 11, 12])) == [[3, 6], [9, 10], [11, 13]]
+
+
+def test_report_counts_and_paged_rows_match_pandas(client):
+    df = outlier_frame()
+    assert upload_frame(client, df).status_code == 200
+    report = client.get('/cleaning').get_json()['outliers']['value']
+
+    for method, indices in expected_outliers(df['value']).items():
+        assert report[method]['count'] == len(indices), method
+        assert report[method]['lower'] is not None and report[method]['upper'] is not None
+        rows, offset = [], 0
+        while True:
+            page = client.get('/cleaning/outliers', query_string={
+                'column': 'value', 'method': method, 'offset': offset, 'limit': 3
+            }).get_json()
+            assert page['count'] == len(indices)
+            rows += page['items']
+            if not page['has_more']:
+                break
+            offset += 3
+        assert rows == indices, method
+
+    ranges = client.get('/cleaning/outliers?column=value&method=iqr&format=ranges').get_json()
+    assert ranges['items'] == encode_ranges(np.array(expected_outliers(df['value'])['iqr']))
+
+
+def test_bad_parameters_are_rejected(client):
+    assert upload_frame(client, outlier_frame()).status_code == 200
+    for query in ('column=value&method=other', 'column=value&method=iqr&format=csv',
+                  'column=label&method=iqr', 'column=missing&method=iqr', 'column=value&method=iqr&offset=x'):
+        assert client.get(f'/cleaning/outliers?{query}').status_code == 400, query
@@ -0,0 +1,189 @@
+import threading
+import time
+
+import pytest
+
+import pdf_renderer
+from pdf_renderer import PdfRenderer, RendererBusy
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+        self.routes = []
+
+    def route(self, url, handler):
+        self.routes.append((url, handler))
+
+    def set_content(self, html):
+        self.browser.rendering.set()
+        self.browser.gate.wait(10)
+        if html == 'fail':
+            raise RuntimeError('render failed')
+        self.html = html
+        # Chromium would request the page's assets now
+        for url, handler in self.routes:
+            for asset in ('http://assets.local/a.png', 'http://elsewhere.local/b.png'):
+                if url(asset):
+                    handler(FakeRoute(asset, self.browser.fetched))
+
+    def pdf(self, format, print_background):
+        return b'%PDF ' + self.html.encode()
+
+    def close(self):
+        pass
+
+
+class FakeRoute:
+    def __init__(self, url, fetched):
+        self.request = type('Request', (), {'url': url})
+        self.fetched = fetched
+
+    def fulfill(self, status, body, content_type):
+        self.fetched.append((self.request.url, status, body, content_type))
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+
+    def new_page(self):
+        return FakePage(self.browser)
+
+    def close(self):
+        self.browser.contexts_closed += 1
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts_closed = 0
+        self.fetched = []
+        self.rendering = threading.Event()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def is_connected(self):
+        return self.connected
+
+    def new_context(self):
+        return FakeContext(self)
+
+    def close(self):
+        self.connected = False
+
+
+class FakePlaywright:
+    """Stands in for sync_playwright(); Chromium isn't available to the tests"""
+
+    def __init__(self, launch_error=None, launch_delay=0):
+        self.launch_error = launch_error
+        self.launch_delay = launch_delay
+        self.browsers = []
+        self.chromium = self
+
+    def __call__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def launch(self):
+        if self.launch_error:
+            time.sleep(self.launch_delay)
+            raise self.launch_error
+        self.browsers.append(FakeBrowser())
+        return self.browsers[-1]
+
+
+@pytest.fixture
+def playwright(monkeypatch):
+    fake = FakePlaywright()
+    monkeypatch.setattr(pdf_renderer, 'sync_playwright', fake)
+    return fake
+
+
+@pytest.fixture
+def make_renderer():
+    renderers = []
+
+    def make(**options):
+        renderers.append(PdfRenderer(**dict({'workers': 1, 'render_timeout': 10}, **options)))
+        return renderers[-1]
+    yield make
+    for renderer in renderers:
+        renderer.shutdown()
+
+
+def test_contexts_are_recycled_in_one_warm_browser(playwright, make_renderer):
+    renderer = make_renderer(renders_per_context=2)
+    assert [renderer.render(f'page {i}') for i in range(5)] == [f'%PDF page {i}'.encode() for i in range(5)]
+    stats = renderer.stats()
+    assert stats['renders'] == 5 and stats['context_recycles'] == 2 and stats['workers_alive'] == 1
+    assert len(playwright.browsers) == 1
+
+
+def test_assets_are_served_from_memory(playwright, make_renderer):
+    renderer = make_renderer()
+    assets = {'http://assets.local/a.png': (b'png bytes', 'image/png')}
+    assert renderer.render('page', assets=assets) == b'%PDF page'
+    assert playwright.browsers[0].fetched == [('http://assets.local/a.png', 200, b'png bytes', 'image/png')]
+
+
+def test_failed_render_starts_over_with_a_fresh_context(playwright, make_renderer):
+    renderer = make_renderer()
+    assert renderer.render('before') == b'%PDF before'
+    with pytest.raises(RuntimeError, match='render failed'):
+        renderer.render('fail')
+    assert renderer.render('after') == b'%PDF after'
+    assert renderer.stats()['failures'] == 1
+    assert playwright.browsers[0].contexts_closed == 1
+
+
+def test_disconnected_browser_is_relaunched(playwright, make_renderer):
+    renderer = make_renderer(health_interval=0.01)
+    renderer.render('first')
+    playwright.browsers[0].connected = False
+    time.sleep(0.1)
+    assert renderer.render('second') == b'%PDF second'
+    assert renderer.stats()['browser_restarts'] >= 1
+    assert playwright.browsers[-1].is_connected()
+
+
+@pytest.mark.parametrize('launch_delay', [0, 0.2])
+def test_launch_failure_fails_jobs_with_the_error(monkeypatch, make_renderer, launch_delay):
+    # Without a delay the worker gives up before render() has queued its job
+    monkeypatch.setattr(pdf_renderer, 'sync_playwright', FakePlaywright(RuntimeError('no chromium'), launch_delay))
+    renderer = make_renderer()
+    started = time.monotonic()
+    for _ in range(3):
+        with pytest.raises(RuntimeError, match='no chromium'):
+            renderer.render('page')
+    assert time.monotonic() - started < 5
+    assert renderer.stats()['last_error'] == 'no chromium'
+
+
+def test_full_queue_raises_renderer_busy(playwright, make_renderer):
+    renderer = make_renderer(queue_size=1)
+    renderer.render('warm up')
+    browser = playwright.browsers[0]
+    browser.gate.clear()
+    browser.rendering.clear()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(renderer.render('page'))) for _ in range(2)]
+    threads[0].start()
+    assert browser.rendering.wait(10)
+    threads[1].start()
+    deadline = time.monotonic() + 10
+    while not renderer.stats()['queued']:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    with pytest.raises(RendererBusy):
+        renderer.render('page')
+    browser.gate.set()
+    for thread in threads:
+        thread.join(10)
+    assert results == [b'%PDF page'] * 2
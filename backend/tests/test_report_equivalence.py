@@ -0,0 +1,96 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+import baseline
+from conftest import BUNDLED_DATASETS, load_bundled, upload_bundled
+from dataset_store import read_dataset
+from test_cleaning_equivalence import messy_frame, random_config
+
+pytestmark = [pytest.mark.filterwarnings('ignore::UserWarning'),
+              pytest.mark.usefixtures('no_numeric_suggestion_for_datetimes')]
+
+# Compared as is; memory_usage reflects the compacted dtypes and outliers carry bounds instead of indices
+EXACT_KEYS = ('filename', 'preview', 'nulls', 'duplicates', 'suggested_dtypes', 'quality_metrics',
+              'data_quality_score')
+
+
+def outlier_indices(client, column, method):
+    indices, offset = [], 0
+    while True:
+        page = client.get('/cleaning/outliers', query_string={
+            'column': column, 'method': method, 'offset': offset, 'limit': 10000
+        }).get_json()
+        indices += page['items']
+        if not page['has_more']:
+            return indices
+        offset += page['limit']
+
+
+def check_report(client, report, expected):
+    """Compare a report with the baseline's for the same data; outlier rows are paged in from /cleaning/outliers"""
+    expected = json.loads(client.application.json.dumps(expected))
+    assert 'error' not in report
+    for key in EXACT_KEYS:
+        assert report[key] == expected[key], key
+    for key in ('rows', 'columns'):
+        assert report['dataset_info'][key] == expected['dataset_info'][key]
+
+    summary, expected_summary = report['statistical_summary'], expected['statistical_summary']
+    assert set(summary) == set(expected_summary)
+    for stat, columns in expected_summary.items():
+        assert set(summary[stat]) == set(columns), stat
+        for column, value in columns.items():
+            if value is None:
+                assert summary[stat][column] is None, (stat, column)
+            else:
+                assert np.isclose(summary[stat][column], value, rtol=1e-9, atol=1e-9), (stat, column)
+
+    assert set(report['outliers']) == set(expected['outliers'])
+    for column, methods in expected['outliers'].items():
+        for method, info in methods.items():
+            assert report['outliers'][column][method]['count'] == info['count'], (column, method)
+            assert outlier_indices(client, column, method) == info['indices'], (column, method)
+
+
+@pytest.mark.parametrize('chunked', [False, True])
+@pytest.mark.parametrize('name', BUNDLED_DATASETS)
+def test_report_matches_the_baseline(app_module, client, monkeypatch, name, chunked):
+    df = load_bundled(name)
+    if chunked:
+        if not name.endswith(('.csv', '.json')):
+            pytest.skip('Only CSV and JSON uploads are ingested in chunks')
+        monkeypatch.setitem(app_module.app.config, 'INGEST_CHUNKED_MIN_BYTES', 0)
+        monkeypatch.setitem(app_module.app.config, 'INGEST_CHUNK_ROWS', 700)
+    assert upload_bundled(client, name).status_code == 200
+    check_report(client, client.get('/cleaning').get_json(), baseline.data_quality_report(df, name))
+
+
+def test_messy_columns_report_matches_the_baseline(client, tmp_path):
+    path = str(tmp_path / 'messy.json')
+    messy_frame().to_json(path, orient='records')
+    with open(path, 'rb') as f:
+        response = client.post('/upload', data={'dataset': (f, 'messy.json')}, content_type='multipart/form-data')
+    assert response.status_code == 200
+    check_report(client, client.get('/cleaning').get_json(),
+                 baseline.data_quality_report(read_dataset(path), 'messy.json'))
+
+
+@pytest.mark.parametrize('name', BUNDLED_DATASETS)
+def test_cleaned_report_matches_the_baseline(client, name):
+    df = load_bundled(name)
+    rng = random.Random(name)
+    for _ in range(3):
+        config = random_config(df, rng)
+        assert client.post('/reset').status_code == 200
+        assert upload_bundled(client, name).status_code == 200
+        # Sent as is: the test client's encoder sorts keys, and steps run in configuration order
+        response = client.post('/clean-data', data=json.dumps(config), content_type='application/json')
+        assert response.status_code == 200
+        # The cleaned version's report was derived from the original's profile. Outlier rows
+        # are numbered from 0 again, as in the stored file.
+        cleaned = baseline.apply_cleaning_operations(df.copy(), config).reset_index(drop=True)
+        check_report(client, client.get('/cleaning').get_json(),
+                     baseline.data_quality_report(cleaned, f'cleaned_{name}'))
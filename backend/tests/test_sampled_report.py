@@ -0,0 +1,80 @@
+import json
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import baseline
+from conftest import BUNDLED_DATASETS, load_bundled, upload_bundled
+from profiler import _count_estimate, sample_profile
+
+pytestmark = pytest.mark.filterwarnings('ignore::UserWarning')
+
+SAMPLE_ROWS = 300
+
+
+def test_count_interval_of_an_unseen_value_starts_at_zero():
+    assert _count_estimate(0, SAMPLE_ROWS, 5000, 1.96)[:2] == (0, 0)
+    assert _count_estimate(SAMPLE_ROWS, SAMPLE_ROWS, 5000, 1.96)[::2] == (5000, 5000)
+    assert _count_estimate(7, SAMPLE_ROWS, SAMPLE_ROWS, 1.96) == (7, 7, 7)
+
+
+
+def test_duplicate_range_of_a_full_sample_is_exact():
+    # -0.0 repeats 0.0 for duplicated(), so the distinct-row estimate has to agree
+    df = pd.DataFrame({'a': [0.0, -0.0, np.nan, np.nan, 1.5] * 20, 'b': ['x', 'x', 'y', 'y', 'z'] * 20})
+    profile, bounds = sample_profile(df, len(df))
+    expected = int(df.duplicated().sum())
+    assert profile['duplicates'] == expected
+    assert bounds['duplicates'] == [expected, expected]
+
+def outside(value, bounds):
+    low, high = bounds
+    return (low is not None and value < low - 1e-9) or (high is not None and value > high + 1e-9)
+
+
+def test_sampled_report_bounds_cover_the_exact_values(app_module, client, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, 'QUALITY_SAMPLE_ROWS', SAMPLE_ROWS)
+    checked, missed = 0, []
+    for name in BUNDLED_DATASETS:
+        try:
+            df = load_bundled(name)
+        except pytest.skip.Exception:
+            continue
+        if len(df) <= SAMPLE_ROWS:
+            continue
+        expected = json.loads(app_module.app.json.dumps(baseline.data_quality_report(df, name)))
+        assert client.post('/reset').status_code == 200
+        assert upload_bundled(client, name).status_code == 200
+        report = client.get('/cleaning?mode=fast').get_json()
+        assert report['approximate'] and report['sample_rows'] == SAMPLE_ROWS
+        for key in ('filename', 'preview'):
+            assert report[key] == expected[key], (name, key)
+        assert report['dataset_info']['rows'] == expected['dataset_info']['rows']
+        assert report['dataset_info']['columns'] == expected['dataset_info']['columns']
+
+        bounds = report['error_bounds']
+        # Guaranteed ranges: duplicate rows, and extremes bounded by the sample's
+        assert not outside(expected['duplicates'], bounds['duplicates']), name
+        for stat in ('min', 'max'):
+            for column, value in expected['statistical_summary'][stat].items():
+                assert not outside(value, bounds['statistical_summary'][stat][column]), (name, stat, column)
+
+        # Confidence intervals: each may miss, but overall they should hold at their confidence
+        estimates = [(('nulls', column), expected['nulls'].get(column, 0), bounds['nulls'].get(column, [0, 0]))
+                     for column in df.columns]
+        for stat in ('mean', 'std', 'median'):
+            for column, value in expected['statistical_summary'][stat].items():
+                if value is not None and not math.isnan(value):
+                    estimates.append(((stat, column), value, bounds['statistical_summary'][stat][column]))
+        for column, methods in expected['outliers'].items():
+            for method, info in methods.items():
+                estimates.append(((method, column), info['count'], bounds['outliers'][column][method]))
+        for label, value, interval in estimates:
+            assert interval[0] is None or interval[1] is None or interval[0] <= interval[1], (name, label)
+            if outside(value, interval):
+                missed.append((name, label, value, interval))
+        checked += len(estimates)
+    assert checked > 100
+    assert len(missed) <= (1 - report['confidence']) * checked, missed
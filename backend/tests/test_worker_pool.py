@@ -0,0 +1,70 @@
+import os
+import threading
+import time
+
+import pytest
+
+import instrumentation
+import pool_tasks
+from test_dtype_compaction import frame_with_missing_text
+from worker_pool import JobCancelled, WorkerPool
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(workers=1, queue_size=4, job_timeout=30)
+    yield pool
+    pool.shutdown()
+
+
+def wait_for(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def test_cancelling_a_queued_job_raises_job_cancelled(pool):
+    running = pool.submit(time.sleep, 1, tag='busy')
+    wait_for(lambda: pool.stats()['busy'] == 1)
+    outcome = {}
+
+    def wait_for_queued_job():
+        try:
+            outcome['result'] = pool.run(time.sleep, 0, tag='replaced')
+        except Exception as e:
+            outcome['error'] = e
+
+    waiter = threading.Thread(target=wait_for_queued_job)
+    waiter.start()
+    wait_for(lambda: pool.stats()['queued'] == 1)
+    pool.cancel('replaced')
+    waiter.join(30)
+
+    assert isinstance(outcome.get('error'), JobCancelled)
+    assert pool.stats()['cancelled'] == 1
+    running.result(30)
+    assert pool.stats()['completed'] == 1
+
+
+def test_pool_task_runs_in_a_worker_process(tmp_path):
+    path = str(tmp_path / 'data.csv')
+    frame_with_missing_text().to_csv(path, index=False)
+    pool = WorkerPool(workers=1, queue_size=4, job_timeout=60, initializer=pool_tasks.init_worker,
+                      initargs=(1024 * 1024, 1000, 1024 * 1024), preload=['pool_tasks'])
+    try:
+        assert pool.run(os.getpid) != os.getpid()
+        trace = instrumentation.Trace()
+        token = instrumentation.activate(trace)
+        try:
+            result = pool.run(pool_tasks.profile_dataset, path, {})
+        finally:
+            instrumentation.deactivate(token)
+    finally:
+        pool.shutdown()
+
+    assert result == pool_tasks.profile_dataset(path, {})
+    # Stages timed in the worker are nested under the wait for the job
+    assert {'profile_dataset', 'profile_dataset.load', 'profile_dataset.profile'} <= {
+        stage['name'] for stage in trace.to_dicts()}
+    assert pool.stats()['processes_started'] == 1 and pool.stats()['completed'] == 2
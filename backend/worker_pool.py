@@ -0,0 +1,267 @@
+import multiprocessing
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import CancelledError, Future
+
+import instrumentation
+
+
+class PoolBusy(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+
+class JobTimeout(Exception):
+    """Raised when a job runs longer than its timeout; its worker process is replaced"""
+
+
+class JobCancelled(Exception):
+    """Raised for a cancelled job; if it was running, its worker process is replaced"""
+
+
+class WorkerCrashed(Exception):
+    """Raised when a worker process dies mid-job (e.g. killed for using too much memory)"""
+
+
+class RemoteTraceback(Exception):
+    """Attached as __cause__ of an exception raised in a worker, carrying its traceback"""
+
+    def __str__(self):
+        return self.args[0]
+
+
+class _Job:
+    def __init__(self, fn, args, kwargs, tag, timeout):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.tag = tag
+        self.timeout = timeout
+        self.future = Future()
+        self.cancel_requested = threading.Event()
+
+
+def _worker_main(conn, initializer, initargs):
+    """Loop of a worker process: receive (fn, args, kwargs), send back the outcome
+    (with the stages the job timed, see instrumentation)"""
+    if initializer is not None:
+        initializer(*initargs)
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return  # The pool went away
+        if message is None:
+            return
+        fn, args, kwargs = message
+        trace = instrumentation.Trace()
+        token = instrumentation.activate(trace)
+        try:
+            outcome = ('ok', fn(*args, **kwargs), trace.to_dicts())
+        except BaseException as e:
+            outcome = ('error', e, traceback.format_exc())
+        finally:
+            instrumentation.deactivate(token)
+        try:
+            conn.send(outcome)
+        except Exception as e:
+            # The result or exception couldn't be pickled; report that instead
+            conn.send(('error', RuntimeError(f'Unpicklable job outcome: {e}'), traceback.format_exc()))
+
+
+class WorkerPool:
+    """Bounded pool of worker processes for CPU-heavy pandas work.
+
+    Each worker slot is a supervisor thread owning one child process and a
+    pipe to it; supervisors pull jobs from a shared queue. Jobs are a
+    module-level function and its arguments, so they should pass file paths
+    and small values rather than DataFrames. A job that runs past its
+    timeout, or is cancelled while running, gets its process terminated and
+    replaced; a crashed process is replaced too. At most `queue_size` jobs
+    wait for a worker; beyond that submit() raises PoolBusy. Processes are
+    started lazily and kept warm. With workers=0 jobs run inline in the
+    calling thread.
+    """
+
+    def __init__(self, workers=2, queue_size=16, job_timeout=300, initializer=None, initargs=(), preload=()):
+        self.workers = workers
+        self.job_timeout = job_timeout
+        self.initializer = initializer
+        self.initargs = initargs
+        self._jobs = queue.Queue(maxsize=queue_size)
+        self._running = set()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        # forkserver forks workers from a server process that imports the preload modules
+        # once. Like spawn, each worker still runs the parent's __main__ module as
+        # __mp_main__ (app.py when it is run as a script), so that module must not start
+        # threads or processes at import time.
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            self._context = multiprocessing.get_context('forkserver')
+            self._context.set_forkserver_preload(list(preload))
+        else:
+            self._context = multiprocessing.get_context('spawn')
+        self.stats_counters = {
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+            'timeouts': 0,
+            'cancelled': 0,
+            'crashes': 0,
+            'processes_started': 0
+        }
+
+    def submit(self, fn, *args, tag=None, timeout=None, **kwargs):
+        """Queue fn(*args, **kwargs) and return a Future. tag groups jobs for cancel()."""
+        job = _Job(fn, args, kwargs, tag, timeout or self.job_timeout)
+        if self.workers <= 0:
+            job.future.set_running_or_notify_cancel()
+            try:
+                job.future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                job.future.set_exception(e)
+            return job.future
+        self._ensure_started()
+        try:
+            self._jobs.put_nowait(job)
+        except queue.Full:
+            self._count('rejected')
+            raise PoolBusy('The server is busy processing other datasets, please try again shortly')
+        return job.future
+
+    def run(self, fn, *args, tag=None, timeout=None, **kwargs):
+        """submit() and wait for the result, re-raising the job's exception (JobCancelled
+        for a job cancelled before it started).
+        The wait is timed as a stage named after fn, with the stages the job timed inside it."""
+        with instrumentation.stage(fn.__name__):
+            future = self.submit(fn, *args, tag=tag, timeout=timeout, **kwargs)
+            try:
+                result = future.result()
+            except CancelledError:
+                raise JobCancelled('The job was cancelled before it started') from None
+            instrumentation.record(getattr(future, 'stages', None))
+            return result
+
+    def cancel(self, tag):
+        """Cancel every queued or running job with this tag"""
+        with self._lock:
+            running = [job for job in self._running if job.tag == tag]
+        for job in running:
+            job.cancel_requested.set()
+        with self._jobs.mutex:
+            queued = [job for job in self._jobs.queue if job is not None and job.tag == tag]
+        for job in queued:
+            if job.future.cancel():  # The supervisor skips it when dequeued
+                self._count('cancelled')
+
+    def stats(self):
+        with self._lock:
+            busy = len(self._running)
+        return dict(
+            self.stats_counters,
+            workers=self.workers,
+            busy=busy,
+            queued=self._jobs.qsize()
+        )
+
+    def shutdown(self):
+        self._stopping.set()
+        for _ in self._threads:
+            try:
+                self._jobs.put_nowait(None)
+            except queue.Full:
+                break
+
+    def _ensure_started(self):
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._supervise, name='worker-pool', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats_counters[name] += 1
+
+    def _spawn(self):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.initializer, self.initargs),
+            name='pool-worker',
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        self._count('processes_started')
+        return process, parent_conn
+
+    def _stop(self, process, conn):
+        conn.close()
+        process.terminate()
+        process.join(5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def _supervise(self):
+        process, conn = None, None
+        while not self._stopping.is_set():
+            job = self._jobs.get()
+            if job is None:
+                break
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            with self._lock:
+                self._running.add(job)
+            try:
+                if process is None or not process.is_alive():
+                    process, conn = self._spawn()
+                outcome = self._execute(job, process, conn)
+            except Exception as e:
+                outcome = ('error', e, None)
+            finally:
+                with self._lock:
+                    self._running.discard(job)
+
+            if outcome[0] == 'ok':
+                self._count('completed')
+                job.future.stages = outcome[2]
+                job.future.set_result(outcome[1])
+                continue
+            error, remote_tb = outcome[1], outcome[2]
+            if isinstance(error, (JobTimeout, JobCancelled, WorkerCrashed)):
+                self._stop(process, conn)
+                process, conn = None, None
+            self._count({JobTimeout: 'timeouts', JobCancelled: 'cancelled',
+                         WorkerCrashed: 'crashes'}.get(type(error), 'failed'))
+            if remote_tb:
+                error.__cause__ = RemoteTraceback(remote_tb)
+            job.future.set_exception(error)
+        if process is not None:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+            self._stop(process, conn)
+
+    def _execute(self, job, process, conn):
+        """Run one job on a worker and return its outcome, enforcing timeout and cancellation"""
+        conn.send((job.fn, job.args, job.kwargs))
+        deadline = time.monotonic() + job.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return ('error', JobTimeout(f'The job did not finish within {job.timeout} seconds'), None)
+            if job.cancel_requested.is_set():
+                return ('error', JobCancelled('The job was cancelled'), None)
+            try:
+                if conn.poll(min(remaining, 0.1)):
+                    return conn.recv()
+            except (EOFError, OSError):
+                return ('error', WorkerCrashed('The worker process exited unexpectedly'), None)
+            if not process.is_alive():
+                return ('error', WorkerCrashed(f'The worker process exited with code {process.exitcode}'), None)
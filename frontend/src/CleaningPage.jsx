@@ -142,7 +142,8 @@ function CleaningPage() {
   const fetchReport = async () => {
     try {
       setLoading(true);
-      const response = await fetch('http://localhost:5001/cleaning', { 
+      // Fast mode answers from a sample on large datasets; the exact report follows in the background
+      const response = await fetch('http://localhost:5001/cleaning?mode=fast&refine=1', { 
         credentials: 'include' 
       });
       
@@ -152,6 +153,9 @@ function CleaningPage() {
       
       const data = await response.json();
       setReport(data);
+      if (data.approximate) {
+        pollRefinedReport();
+      }
       // setCleaningSummary([]); // <-- Only do this after upload, not on every report fetch
       
       // Initialize cleaning actions
@@ -194,6 +198,24 @@ function CleaningPage() {
     }
   };
 
+  // Swap the sampled report for the exact one once the backend has finished it
+  const pollRefinedReport = async () => {
+    try {
+      const res = await fetch('http://localhost:5001/cleaning/refinement', { credentials: 'include' });
+      const status = await res.json();
+      if (status.status === 'queued' || status.status === 'running') {
+        setTimeout(pollRefinedReport, 2000);
+      } else if (status.status === 'done') {
+        const response = await fetch('http://localhost:5001/cleaning', { credentials: 'include' });
+        if (response.ok) {
+          setReport(await response.json());
+        }
+      }
+    } catch (err) {
+      console.error('Error refining report:', err);
+    }
+  };
+
   const handleCleaningAction = (type, column, action) => {
     setCleaningActions(prev => ({
       ...prev,
@@ -25,6 +25,43 @@ const SECTION_OPTIONS = [
   { key: 'insights', label: 'Final Insights' },
 ];
 
+// Chart images the backend has already stored, by content hash
+const storedImageIds = new Set();
+
+async function chartImageId(imageBase64) {
+  const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(imageBase64));
+  return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+}
+
+// POST /export, sending each chart image only the first time; known images go by ID.
+// If the backend has dropped an image it answers 409 and we resend everything.
+async function postExport(payload) {
+  const send = async (useStoredIds) => {
+    const charts = await Promise.all(payload.charts.map(async chart => {
+      if (!chart.image_base64) return chart;
+      const imageId = await chartImageId(chart.image_base64);
+      if (useStoredIds && storedImageIds.has(imageId)) {
+        const { image_base64, ...rest } = chart;
+        return { ...rest, image_id: imageId };
+      }
+      storedImageIds.add(imageId);
+      return chart;
+    }));
+    return fetch('http://localhost:5001/export', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      credentials: 'include',
+      body: JSON.stringify({ ...payload, charts })
+    });
+  };
+  let response = await send(true);
+  if (response.status === 409) {
+    storedImageIds.clear();
+    response = await send(false);
+  }
+  return response;
+}
+
 function parseChartKey(key) {
   const parts = key.split(':');
   const type = parts[0] || '';
@@ -236,11 +273,7 @@ const ExportPage = ({
     // Log the payload for debugging
     console.log('Export payload:', payload);
     try {
-      const response = await fetch('http://localhost:5001/export', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(payload)
-      });
+      const response = await postExport(payload);
       const html = await response.text();
       setPreviewHtml(html);
     } catch (err) {
@@ -267,11 +300,7 @@ const ExportPage = ({
       cleaning_table: cleaningTable
     };
     try {
-      const response = await fetch('http://localhost:5001/export', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(payload)
-      });
+      const response = await postExport(payload);
       const blob = await response.blob();
       const url = window.URL.createObjectURL(blob);
       const a = document.createElement('a');
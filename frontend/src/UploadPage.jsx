@@ -21,6 +21,7 @@ function UploadPage() {
   const [uploading, setUploading] = useState(false);
   const [googleDrivePickerOpen, setGoogleDrivePickerOpen] = useState(false);
   const [fileSource, setFileSource] = useState('local'); // 'local' or 'googledrive'
+  const [sheets, setSheets] = useState(null); // Sheets of an uploaded workbook, when there is a choice
   const navigate = useNavigate();
   const { setCleaningSummary } = useContext(CleaningSummaryContext);
   const { setChartsToReport } = useChartsToReport();
@@ -29,6 +30,7 @@ function UploadPage() {
     const selectedFile = e.target.files[0];
     setFile(selectedFile);
     setFileSource('local');
+    setSheets(null);
   };
 
   const handleGoogleDriveOpen = () => {
@@ -42,6 +44,7 @@ function UploadPage() {
   const handleGoogleDriveFileSelect = (selectedFile) => {
     setFile(selectedFile);
     setFileSource('googledrive');
+    setSheets(null);
     setGoogleDrivePickerOpen(false);
   };
 
@@ -53,19 +56,27 @@ function UploadPage() {
     localStorage.removeItem('cleaningSession');
     // (Do NOT clear cleaningSummary here)
 
-    const formData = new FormData();
-    formData.append('dataset', file);
-
     try {
-      const res = await fetch('http://localhost:5001/upload', {
-        method: 'POST',
-        body: formData,
+      // Send the file as the raw request body so the backend can write it to disk as it arrives
+      const res = await fetch(`http://localhost:5001/upload/stream?filename=${encodeURIComponent(file.name)}`, {
+        method: 'PUT',
+        headers: { 'Content-Type': 'application/octet-stream' },
+        body: file,
         credentials: 'include',
       });
       if (res.ok) {
         localStorage.removeItem('cleaningSession'); // Reset localStorage
         localStorage.removeItem('chartsToReport'); // Clear charts added to report
         setChartsToReport({}); // Reset chartsToReport context state
+        // Workbooks with several sheets let the user pick one before continuing (the first is used by default)
+        if (/\.xlsx?$/i.test(file.name)) {
+          const sheetsRes = await fetch('http://localhost:5001/upload/sheets', { credentials: 'include' });
+          const workbook = sheetsRes.ok ? await sheetsRes.json() : null;
+          if (workbook && workbook.sheets.length > 1) {
+            setSheets(workbook.sheets);
+            return;
+          }
+        }
         navigate('/report'); // Redirect to the report page after successful upload
       } else {
         alert('Upload failed');
@@ -77,6 +88,29 @@ function UploadPage() {
     }
   };
 
+  const handleSheetSelect = async (sheetName) => {
+    setUploading(true);
+    try {
+      const res = await fetch('http://localhost:5001/upload/sheet', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ sheet: sheetName }),
+        credentials: 'include',
+      });
+      if (res.ok) {
+        setSheets(null);
+        navigate('/report');
+      } else {
+        const data = await res.json().catch(() => ({}));
+        alert(data.error || 'Could not load that sheet');
+      }
+    } catch (err) {
+      alert('Sheet selection error');
+    } finally {
+      setUploading(false);
+    }
+  };
+
   // Reset handler
   const handleReset = useCallback(async () => {
     if (!window.confirm('Are you sure you want to reset? This will remove the current dataset and all progress.')) return;
@@ -247,6 +281,29 @@ function UploadPage() {
             </Box>
           )}
 
+          {/* Sheet Picker */}
+          {sheets && (
+            <Box sx={{ mb: 3 }}>
+              <Typography variant="subtitle1" sx={{ mb: 1, fontWeight: 600 }}>
+                This workbook has {sheets.length} sheets. Which one should be analyzed?
+              </Typography>
+              <Box sx={{ display: 'flex', flexWrap: 'wrap', gap: 1 }}>
+                {sheets.map((sheet) => (
+                  <Button
+                    key={sheet.name}
+                    variant="outlined"
+                    onClick={() => handleSheetSelect(sheet.name)}
+                    disabled={uploading}
+                    sx={{ borderRadius: 2, textTransform: 'none' }}
+                  >
+                    {sheet.name}
+                    {sheet.rows != null && ` (${sheet.rows} × ${sheet.columns})`}
+                  </Button>
+                ))}
+              </Box>
+            </Box>
+          )}
+
           {/* Upload Button */}
           <Button
             variant="contained"